@@ -0,0 +1,188 @@
+import json
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import openai
+
+from catalog_generator import CatalogGenerator, CatalogGeneratorConfig
+from prompt_builder import PromptBuilder, PromptBuilderConfig
+from translator import Translator, TranslatorConfig
+from util.logger import Logger, cast_logging_level
+from util.atomic_write import atomic_write_text
+from xcstrings import XCStrings
+
+BASELINE_PATH = Path(__file__).parent / "benchmark_baseline.json"
+
+@dataclass
+class BenchmarkSize:
+    keys: int
+    locales: int
+
+SIZES = {
+    "small": BenchmarkSize(1000, 5),
+    "medium": BenchmarkSize(20000, 10),
+    "large": BenchmarkSize(100000, 20),
+    "huge": BenchmarkSize(500000, 50)
+}
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    seconds: float
+    baseline: float | None
+
+    def ratio(self) -> float | None:
+        if self.baseline is None or self.baseline <= 0:
+            return None
+        return self.seconds / self.baseline
+
+class BenchmarkSuite:
+    """
+    Times the hot paths of a run on a generated catalog. Each benchmark reports the best of its repeats.
+    """
+    xcstrings: XCStrings
+    path: Path
+    target_locale: str
+    repeat: int
+
+    def __init__(self, xcstrings: XCStrings, path: Path, target_locale: str, repeat: int = 3):
+        self.xcstrings = xcstrings
+        self.path = path
+        self.target_locale = target_locale
+        self.repeat = repeat
+
+        self._source_keys = [
+            keypath for key, entry in xcstrings.strings.items() if xcstrings.source_language in entry.localizations
+            for keypath in xcstrings.list_keys(key=key, locale=xcstrings.source_language)
+        ]
+        self._response = "\n".join(f"- {xcstrings.get(keypath)}" for keypath in self._source_keys)
+
+        self._client = openai.OpenAI(api_key="benchmark")
+        self._translator = Translator(
+            config=TranslatorConfig(api_key="benchmark", model="benchmark", source_locale=xcstrings.source_language, target_locale=target_locale, batch_char_limit=1000),
+            logger=Logger(logging_level="error"),
+            client=self._client
+        )
+
+    def close(self):
+        self._client.close()
+
+    def benchmarks(self) -> dict[str, Callable[[], object]]:
+        return {
+            "from_path": lambda: XCStrings.from_path(self.path),
+            "list_keys": lambda: sum(1 for _ in self.xcstrings.list_keys()),
+            "has_entry": self._has_entry,
+            "plan_prompts": self._plan_prompts,
+            "parse_translation_content": lambda: self._translator.parse_translation_content(self._response),
+            "to_json": self.xcstrings.to_json
+        }
+
+    def run(self, names: list[str] | None = None) -> dict[str, float]:
+        timings: dict[str, float] = {}
+        for name, benchmark in self.benchmarks().items():
+            if names is not None and name not in names:
+                continue
+            best = float("inf")
+            for _ in range(self.repeat):
+                start = time.perf_counter()
+                benchmark()
+                best = min(best, time.perf_counter() - start)
+            timings[name] = best
+        return timings
+
+    def _has_entry(self):
+        return sum(1 for keypath in self._source_keys if self.xcstrings.has_entry(keypath.with_locale(self.target_locale)))
+
+    def _plan_prompts(self):
+        prompt_builder = PromptBuilder(self.xcstrings, PromptBuilderConfig(
+            system_prompt="System Prompt",
+            source_locale=self.xcstrings.source_language,
+            source_device=None,
+            target_locale=self.target_locale,
+            batch_char_limit=1000,
+            separator="\n",
+            prefix="- "
+        ))
+        return sum(1 for _ in prompt_builder)
+
+class Benchmark:
+    def __init__(self):
+        parser = ArgumentParser(description="Micro-benchmarks on generated catalogs")
+
+        parser.add_argument("-s", "--size", default="small", choices=list(SIZES.keys()), help="Catalog size")
+        parser.add_argument("--keys", default=None, type=int, help="Number of keys (overrides the size)")
+        parser.add_argument("--locales", default=None, type=int, help="Number of locales (overrides the size)")
+        parser.add_argument("-r", "--repeat", default=3, type=int, help="Runs per benchmark; the fastest counts")
+        parser.add_argument("-k", "--only", default=[], action="append", type=str, help="Run only this benchmark (repeatable)")
+        parser.add_argument("--threshold", default=1.5, type=float, help="Slowdown against the baseline that counts as a regression")
+        parser.add_argument("--baseline", default=str(BASELINE_PATH), type=str, help="Baseline file")
+        parser.add_argument("--update-baseline", default=False, action="store_true", help="Store the timings as the new baseline for the size")
+        parser.add_argument("-l", "--log", default="info", type=str, help="Log level")
+
+        self.parser = parser
+
+    def run(self, varg: list[str]) -> int:
+        logger = Logger(prefix="benchmark")
+        args = self.parser.parse_args(varg)
+
+        log = cast_logging_level(args.log)
+        if log is None:
+            raise ValueError("Log level must be a string")
+        logger.logging_level = log
+
+        size = SIZES[args.size]
+        keys = args.keys if args.keys is not None else size.keys
+        locales = args.locales if args.locales is not None else size.locales
+        # Custom shapes get their own baseline
+        name = args.size if args.keys is None and args.locales is None else f"{keys}x{locales}"
+
+        generator = CatalogGenerator(CatalogGeneratorConfig(keys=keys, locales=locales))
+        xcstrings = generator.generate()
+        target_locale = generator.locales[1] if len(generator.locales) > 1 else "ja"
+        logger.info(f"Generated {keys} keys in {len(generator.locales)} locale(s), benchmarking {generator.locales[0]} to {target_locale}.")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "Benchmark.xcstrings"
+            path.write_text(xcstrings.to_json(), encoding="utf-8")
+
+            suite = BenchmarkSuite(xcstrings, path, target_locale, repeat=args.repeat)
+            try:
+                timings = suite.run(args.only if len(args.only) > 0 else None)
+            finally:
+                suite.close()
+
+        baseline_path = Path(args.baseline)
+        baselines = json.loads(baseline_path.read_text(encoding="utf-8")) if baseline_path.exists() else {}
+        baseline = baselines.get(name, {})
+
+        results = [BenchmarkResult(benchmark, seconds, baseline.get(benchmark, None)) for benchmark, seconds in timings.items()]
+        regressions = [result for result in results if (result.ratio() or 0) > args.threshold]
+
+        for result in results:
+            ratio = result.ratio()
+            comparison = f" ({ratio:.2f}x baseline)" if ratio is not None else " (no baseline)"
+            message = f"{result.name:<28}{result.seconds * 1000:>10.2f} ms{comparison}"
+            if result in regressions:
+                logger.error(message)
+            else:
+                logger.info(message)
+
+        if args.update_baseline:
+            baselines[name] = { **baseline, **{ benchmark: round(seconds, 6) for benchmark, seconds in timings.items() } }
+            atomic_write_text(baseline_path, json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+            logger.info(f"Updated the {name} baseline in {baseline_path}.")
+            return 0
+
+        if len(regressions) > 0:
+            logger.error(f"{len(regressions)} benchmark(s) slower than {args.threshold}x their baseline.")
+            return 1
+
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(Benchmark().run(sys.argv[1:]))
@@ -0,0 +1,160 @@
+import json
+import re
+import threading
+from dataclasses import dataclass
+from os import PathLike
+
+@dataclass
+class ModelPrice:
+    # USD per million tokens
+    input: float
+    output: float
+
+    def cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        return (prompt_tokens * self.input + completion_tokens * self.output) / 1_000_000
+
+# List prices; dated snapshots (e.g. gpt-4o-2024-08-06) use the price of their model
+PRICES: dict[str, ModelPrice] = {
+    "gpt-4": ModelPrice(30.0, 60.0),
+    "gpt-4-turbo": ModelPrice(10.0, 30.0),
+    "gpt-4o": ModelPrice(2.5, 10.0),
+    "gpt-4o-mini": ModelPrice(0.15, 0.6),
+    "gpt-4.1": ModelPrice(2.0, 8.0),
+    "gpt-4.1-mini": ModelPrice(0.4, 1.6),
+    "gpt-4.1-nano": ModelPrice(0.1, 0.4),
+    "gpt-3.5-turbo": ModelPrice(0.5, 1.5),
+    "o1": ModelPrice(15.0, 60.0),
+    "o1-mini": ModelPrice(1.1, 4.4),
+    "o3-mini": ModelPrice(1.1, 4.4),
+}
+
+# About one token per short word, number, symbol or CJK character
+ESTIMATED_TOKEN = re.compile(r" ?[A-Za-z]{1,6}| ?\d{1,3}|\n|[^\sA-Za-z\d]")
+
+def estimate_tokens(text: str) -> int:
+    return len(ESTIMATED_TOKEN.findall(text))
+
+def find_price(model: str, prices: dict[str, ModelPrice]) -> ModelPrice | None:
+    """
+    Looks the model up by name, then by the longest known name it starts with.
+    """
+    if model in prices:
+        return prices[model]
+
+    matches = [name for name in prices if model.startswith(name + "-")]
+    if len(matches) == 0:
+        return None
+    return prices[max(matches, key=len)]
+
+def load_prices(path: PathLike) -> dict[str, ModelPrice]:
+    """
+    Reads `{ "model": { "input": 2.5, "output": 10.0 } }`, prices in USD per million tokens.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f'Price table {path} must be a dictionary')
+
+    prices: dict[str, ModelPrice] = {}
+    for model, price in data.items():
+        if not isinstance(price, dict) or not isinstance(price.get("input", None), (int, float)) or not isinstance(price.get("output", None), (int, float)):
+            raise ValueError(f'Price of {model} in {path} must have numeric input and output prices')
+        prices[model] = ModelPrice(float(price["input"]), float(price["output"]))
+    return prices
+
+@dataclass
+class ModelUsage:
+    requests: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    # Requests whose usage was not reported (e.g. a stream cut short) and had to be estimated
+    estimated: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+class Budget:
+    """
+    Token and cost usage of all requests, shared by the workers. Once a limit is reached the budget is
+    exhausted: no new request should start, while the ones in flight finish and are still counted.
+    """
+    max_tokens_total: int | None
+    max_cost: float | None
+    prices: dict[str, ModelPrice]
+    usage: dict[str, ModelUsage]
+
+    def __init__(self, max_tokens_total: int | None = None, max_cost: float | None = None, prices: dict[str, ModelPrice] | None = None):
+        if max_tokens_total is not None and max_tokens_total <= 0:
+            raise ValueError('Token limit must be positive')
+        if max_cost is not None and max_cost <= 0:
+            raise ValueError('Cost limit must be positive')
+
+        self.max_tokens_total = max_tokens_total
+        self.max_cost = max_cost
+        self.prices = { **PRICES, **(prices or {}) }
+        self.usage = {}
+        self._lock = threading.Lock()
+
+    def check_models(self, models: list[str]) -> None:
+        if self.max_cost is None:
+            return
+        unknown = [model for model in models if find_price(model, self.prices) is None]
+        if len(unknown) > 0:
+            raise ValueError(f'No price for {", ".join(unknown)}, which a cost limit needs. Add it to a price table (--prices).')
+
+    def record(self, model: str, prompt_tokens: int, completion_tokens: int, estimated: bool = False) -> None:
+        with self._lock:
+            usage = self.usage.setdefault(model, ModelUsage())
+            usage.requests += 1
+            usage.prompt_tokens += prompt_tokens
+            usage.completion_tokens += completion_tokens
+            if estimated:
+                usage.estimated += 1
+
+    def total_tokens(self) -> int:
+        with self._lock:
+            return sum(usage.total_tokens for usage in self.usage.values())
+
+    def cost(self) -> float | None:
+        """
+        Returns None when a model that was used has no price.
+        """
+        with self._lock:
+            cost = 0.0
+            for model, usage in self.usage.items():
+                price = find_price(model, self.prices)
+                if price is None:
+                    return None
+                cost += price.cost(usage.prompt_tokens, usage.completion_tokens)
+            return cost
+
+    def exhausted(self) -> bool:
+        if self.max_tokens_total is not None and self.total_tokens() >= self.max_tokens_total:
+            return True
+        if self.max_cost is not None:
+            cost = self.cost()
+            if cost is not None and cost >= self.max_cost:
+                return True
+        return False
+
+    def report(self) -> str:
+        with self._lock:
+            usages = list(self.usage.items())
+            prompt_tokens = sum(usage.prompt_tokens for _, usage in usages)
+            completion_tokens = sum(usage.completion_tokens for _, usage in usages)
+            estimated = sum(usage.estimated for _, usage in usages)
+
+        tokens = f"{prompt_tokens + completion_tokens:,} tokens ({prompt_tokens:,} prompt, {completion_tokens:,} completion)"
+        if self.max_tokens_total is not None:
+            tokens += f" of {self.max_tokens_total:,}"
+
+        cost = self.cost()
+        spent = f"${cost:.4f}" if cost is not None else "an unknown cost"
+        if self.max_cost is not None:
+            spent += f" of ${self.max_cost:.2f}"
+
+        report = f"Used {tokens} for {spent}."
+        if estimated > 0:
+            report += f" Usage of {estimated} request(s) was estimated."
+        return report
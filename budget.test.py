@@ -0,0 +1,79 @@
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from budget import Budget, ModelPrice, PRICES, estimate_tokens, find_price, load_prices
+
+class TestBudget(unittest.TestCase):
+    def test_find_price(self):
+        self.assertEqual(find_price("gpt-4o", PRICES), PRICES["gpt-4o"])
+        # Snapshots take the price of the longest matching model
+        self.assertEqual(find_price("gpt-4o-2024-08-06", PRICES), PRICES["gpt-4o"])
+        self.assertEqual(find_price("gpt-4o-mini-2024-07-18", PRICES), PRICES["gpt-4o-mini"])
+        self.assertIsNone(find_price("gpt-4oo", PRICES))
+        self.assertIsNone(find_price("llama-3", PRICES))
+
+    def test_limits(self):
+        budget = Budget(max_tokens_total=1000)
+        budget.record("gpt-4o", 600, 300)
+        self.assertFalse(budget.exhausted())
+        budget.record("gpt-4o", 50, 50)
+        self.assertTrue(budget.exhausted())
+
+        budget = Budget(max_cost=1.0, prices={ "model": ModelPrice(1.0, 2.0) })
+        budget.record("model", 400_000, 200_000)
+        self.assertAlmostEqual(budget.cost() or 0, 0.8)
+        self.assertFalse(budget.exhausted())
+        budget.record("model", 0, 100_000)
+        self.assertTrue(budget.exhausted())
+
+    def test_unknown_price(self):
+        budget = Budget()
+        budget.record("llama-3", 10, 10)
+        self.assertIsNone(budget.cost())
+        self.assertIn("unknown cost", budget.report())
+
+        budget.check_models(["llama-3"])
+        with self.assertRaises(ValueError):
+            Budget(max_cost=1.0).check_models(["gpt-4o", "llama-3"])
+        with self.assertRaises(ValueError):
+            Budget(max_tokens_total=0)
+
+    def test_concurrent_record(self):
+        budget = Budget()
+        threads = [threading.Thread(target=lambda: [budget.record("gpt-4o", 1, 1) for _ in range(1000)]) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(budget.total_tokens(), 16000)
+        self.assertEqual(budget.usage["gpt-4o"].requests, 8000)
+
+    def test_report(self):
+        budget = Budget(max_tokens_total=10_000, max_cost=5.0)
+        budget.record("gpt-4o", 1000, 400)
+        budget.record("gpt-4o", 200, 0, estimated=True)
+        report = budget.report()
+        self.assertIn("1,600 tokens (1,200 prompt, 400 completion) of 10,000", report)
+        self.assertIn("$0.0070 of $5.00", report)
+        self.assertIn("1 request(s) was estimated", report)
+
+    def test_load_prices(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "prices.json"
+            path.write_text(json.dumps({ "custom": { "input": 3, "output": 12.5 } }))
+            self.assertEqual(load_prices(path), { "custom": ModelPrice(3.0, 12.5) })
+
+            path.write_text(json.dumps({ "custom": { "input": 3 } }))
+            with self.assertRaises(ValueError):
+                load_prices(path)
+
+    def test_estimate_tokens(self):
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("Hello world"), 2)
+        self.assertEqual(estimate_tokens("こんにちは"), 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import random
+from dataclasses import dataclass, field
+
+from xcstrings import XCStrings
+
+LOCALES = [
+    "en", "ja", "zh-Hans", "zh-Hant", "ko", "de", "fr", "es", "it", "pt-BR",
+    "ru", "ar", "nl", "sv", "da", "fi", "nb", "pl", "tr", "cs",
+    "el", "he", "hi", "th", "vi", "id", "ms", "uk", "hu", "ro",
+    "sk", "hr", "ca", "pt-PT", "es-419", "fr-CA", "en-GB", "en-AU", "zh-HK", "bn",
+    "ta", "te", "mr", "gu", "kn", "ml", "ur", "fa", "sl", "lt"
+]
+
+WORDS = [
+    "account", "add", "album", "all", "allow", "app", "back", "battery", "cancel", "change",
+    "choose", "close", "connect", "continue", "copy", "create", "data", "delete", "device", "done",
+    "download", "edit", "email", "enable", "error", "file", "folder", "help", "home", "item",
+    "language", "library", "list", "location", "message", "more", "name", "network", "new", "next",
+    "notification", "open", "password", "photo", "please", "privacy", "profile", "recent", "remove", "restore",
+    "save", "search", "select", "send", "settings", "share", "show", "sign", "storage", "sync",
+    "the", "this", "to", "try", "update", "upload", "use", "view", "your", "workspace"
+]
+
+FORMAT_SPECIFIERS = ["%@", "%lld", "%d", "%.1f", "%1$@", "%2$lld"]
+
+DEVICES = ["iphone", "ipad", "mac", "applewatch", "appletv", "applevision"]
+
+# Unicode ranges the text of each CJK locale is drawn from
+CJK_RANGES = {
+    "ja": [(0x3041, 0x3096), (0x30A1, 0x30FA), (0x4E00, 0x9FFF)],
+    "zh-Hans": [(0x4E00, 0x9FFF)],
+    "zh-Hant": [(0x4E00, 0x9FFF)],
+    "zh-HK": [(0x4E00, 0x9FFF)],
+    "ko": [(0xAC00, 0xD7A3)]
+}
+
+@dataclass
+class CatalogGeneratorConfig:
+    keys: int = 1000
+    locales: int = 5
+    source_locale: str = "en"
+    # Share of target localizations that already exist, the rest is left to translate
+    translated_ratio: float = 0.7
+    device_ratio: float = 0.05
+    plural_ratio: float = 0.05
+    long_ratio: float = 0.02
+    format_ratio: float = 0.2
+    comment_ratio: float = 0.3
+    stale_ratio: float = 0.02
+    seed: int = 0
+    locale_list: list[str] = field(default_factory=lambda: list(LOCALES))
+
+class CatalogGenerator:
+    """
+    Deterministic catalogs shaped like real apps: mostly short UI strings, some long paragraphs,
+    format specifiers, device and plural variations, and partially translated target locales.
+    """
+    config: CatalogGeneratorConfig
+
+    def __init__(self, config: CatalogGeneratorConfig):
+        if not 1 <= config.locales <= len(config.locale_list):
+            raise ValueError(f'Locale count must be between 1 and {len(config.locale_list)}')
+        if config.keys < 0:
+            raise ValueError('Key count must not be negative')
+
+        self.config = config
+        self._random = random.Random(config.seed)
+
+        targets = [locale for locale in config.locale_list if locale != config.source_locale]
+        self.locales = [config.source_locale] + targets[:config.locales - 1]
+
+    def generate_dict(self) -> dict:
+        strings: dict[str, dict] = {}
+
+        for index in range(self.config.keys):
+            source = self._sentence()
+            key = f"{source[:40]} {index}"
+
+            kind = self._random.random()
+            if kind < self.config.device_ratio:
+                shape = "device"
+            elif kind < self.config.device_ratio + self.config.plural_ratio:
+                shape = "plural"
+            else:
+                shape = "unit"
+
+            localizations: dict[str, dict] = {}
+            for locale in self.locales:
+                if locale != self.config.source_locale and self._random.random() >= self.config.translated_ratio:
+                    continue
+                localizations[locale] = self._localization(shape, locale, source)
+
+            entry: dict = { "localizations": localizations }
+            if self._random.random() < self.config.comment_ratio:
+                entry["comment"] = self._words(4, 12)
+            if self._random.random() < self.config.stale_ratio:
+                entry["extractionState"] = "stale"
+
+            strings[key] = entry
+
+        return {
+            "sourceLanguage": self.config.source_locale,
+            "strings": strings,
+            "version": "1.0"
+        }
+
+    def generate(self) -> XCStrings:
+        return XCStrings.from_dict(self.generate_dict())
+
+    def _localization(self, shape: str, locale: str, source: str) -> dict:
+        if shape == "device":
+            devices = self._random.sample(DEVICES, self._random.randint(2, 3))
+            return { "variations": { "device": { device: self._unit(locale, source) for device in devices } } }
+        if shape == "plural":
+            return { "variations": { "plural": {
+                "one": self._unit(locale, f"%lld {source}"),
+                "other": self._unit(locale, f"%lld {source}s")
+            } } }
+        return self._unit(locale, source)
+
+    def _unit(self, locale: str, source: str) -> dict:
+        if locale == self.config.source_locale:
+            value = source
+        elif locale in CJK_RANGES:
+            value = self._cjk(locale, max(2, len(source) // 2))
+        else:
+            value = f"[{locale}] {source}"
+        return { "stringUnit": { "state": "translated", "value": value } }
+
+    def _sentence(self) -> str:
+        if self._random.random() < self.config.long_ratio:
+            text = ". ".join(self._words(8, 20).capitalize() for _ in range(self._random.randint(5, 30))) + "."
+        else:
+            text = self._words(1, 6).capitalize()
+
+        if self._random.random() < self.config.format_ratio:
+            words = text.split(" ")
+            words.insert(self._random.randint(0, len(words)), self._random.choice(FORMAT_SPECIFIERS))
+            text = " ".join(words)
+
+        return text
+
+    def _words(self, minimum: int, maximum: int) -> str:
+        return " ".join(self._random.choices(WORDS, k=self._random.randint(minimum, maximum)))
+
+    def _cjk(self, locale: str, length: int) -> str:
+        ranges = CJK_RANGES[locale]
+        return "".join(chr(self._random.randint(*self._random.choice(ranges))) for _ in range(length))
@@ -0,0 +1,41 @@
+import unittest
+
+from catalog_generator import CatalogGenerator, CatalogGeneratorConfig
+from xcstrings import XCStringDeviceVariation, XCStringPluralVariation
+
+class TestCatalogGenerator(unittest.TestCase):
+    def test_deterministic(self):
+        config = CatalogGeneratorConfig(keys=200, locales=4, seed=7)
+        self.assertEqual(CatalogGenerator(config).generate_dict(), CatalogGenerator(config).generate_dict())
+        self.assertNotEqual(CatalogGenerator(config).generate_dict(), CatalogGenerator(CatalogGeneratorConfig(keys=200, locales=4, seed=8)).generate_dict())
+
+    def test_shape(self):
+        generator = CatalogGenerator(CatalogGeneratorConfig(keys=2000, locales=6, device_ratio=0.1, plural_ratio=0.1, long_ratio=0.05))
+        xcstrings = generator.generate()
+
+        self.assertEqual(len(xcstrings.strings), 2000)
+        self.assertEqual(generator.locales, ["en", "ja", "zh-Hans", "zh-Hant", "ko", "de"])
+
+        localizations = [localization for entry in xcstrings.strings.values() for localization in entry.localizations.values()]
+        self.assertTrue(any(isinstance(localization, XCStringDeviceVariation) for localization in localizations))
+        self.assertTrue(any(isinstance(localization, XCStringPluralVariation) for localization in localizations))
+
+        # Every key has its source, targets are partially translated
+        self.assertTrue(all("en" in entry.localizations for entry in xcstrings.strings.values()))
+        self.assertTrue(any("ja" not in entry.localizations for entry in xcstrings.strings.values()))
+
+        sources = [xcstrings.get(keypath) or "" for keypath in xcstrings.list_keys(locale="en")]
+        self.assertTrue(any(len(source) > 500 for source in sources))
+        self.assertTrue(any("%" in source for source in sources))
+
+        ja = [xcstrings.get(keypath) or "" for keypath in xcstrings.list_keys(locale="ja")]
+        self.assertTrue(all(not value.isascii() for value in ja))
+
+    def test_locale_count(self):
+        with self.assertRaises(ValueError):
+            CatalogGenerator(CatalogGeneratorConfig(locales=0))
+        with self.assertRaises(ValueError):
+            CatalogGenerator(CatalogGeneratorConfig(locales=51))
+
+if __name__ == '__main__':
+    unittest.main()
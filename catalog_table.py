@@ -0,0 +1,212 @@
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Literal, TypeAlias
+
+import pandas as pd
+
+from util.logger import Logger, cast_logging_level
+from xcstrings import XCStringDeviceVariation, XCStringEntry, XCStringPluralVariation, XCStringUnit, XCStrings
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+COLUMNS = ["key", "locale", "device", "plural", "state", "value", "extraction_state", "comment"]
+CATEGORICAL_COLUMNS = ["catalog", "locale", "device", "plural", "state", "extraction_state"]
+
+# Key states from best to worst; a key is as translated as its least translated unit
+KEY_STATES = ["translated", "needs_review", "new", "missing"]
+
+TableFormat: TypeAlias = Literal['csv', 'parquet', 'arrow']
+
+TABLE_SUFFIXES: dict[str, TableFormat] = {
+    ".csv": 'csv',
+    ".parquet": 'parquet',
+    ".arrow": 'arrow',
+    ".feather": 'arrow'
+}
+
+def catalog_table(xcstrings: XCStrings, catalog: str | None = None) -> pd.DataFrame:
+    """
+    Flattens the catalog into one row per string unit, with device and plural variations
+    spread over the device and plural columns. A catalog name adds a leading catalog column.
+    """
+    columns: dict[str, list] = { column: [] for column in COLUMNS }
+
+    def add(key: str, entry: XCStringEntry, locale: str, device: str | None, plural: str | None, unit: XCStringUnit):
+        columns["key"].append(key)
+        columns["locale"].append(locale)
+        columns["device"].append(device)
+        columns["plural"].append(plural)
+        columns["state"].append(unit.state)
+        columns["value"].append(unit.value)
+        columns["extraction_state"].append(entry.extraction_state)
+        columns["comment"].append(entry.comment)
+
+    for key, entry in xcstrings.strings.items():
+        for locale, localization in entry.localizations.items():
+            if isinstance(localization, XCStringUnit):
+                add(key, entry, locale, None, None, localization)
+            elif isinstance(localization, XCStringPluralVariation):
+                for category, unit in localization.plurals.items():
+                    add(key, entry, locale, None, category, unit)
+            elif isinstance(localization, XCStringDeviceVariation):
+                for device, variation in localization.devices.items():
+                    if isinstance(variation, XCStringUnit):
+                        add(key, entry, locale, device, None, variation)
+                    else:
+                        for category, unit in variation.plurals.items():
+                            add(key, entry, locale, device, category, unit)
+
+    table = pd.DataFrame(columns)
+    if catalog is not None:
+        table.insert(0, "catalog", catalog)
+    return _categorize(table)
+
+def concat_tables(tables: list[pd.DataFrame]) -> pd.DataFrame:
+    if len(tables) == 0:
+        return _categorize(pd.DataFrame({ column: [] for column in COLUMNS }))
+    return _categorize(pd.concat(tables, ignore_index=True))
+
+def _categorize(table: pd.DataFrame) -> pd.DataFrame:
+    # Repeated labels take a fraction of the memory as categories, and group much faster
+    for column in CATEGORICAL_COLUMNS:
+        if column in table.columns:
+            table[column] = table[column].astype("category")
+    return table
+
+def key_states(table: pd.DataFrame, source_locale: str) -> pd.DataFrame:
+    """
+    A matrix of every source key (rows) by target locale (columns), holding the worst state
+    of the key's units in the locale, or 'missing'.
+    """
+    keys = ["catalog", "key"] if "catalog" in table.columns else ["key"]
+
+    ranks = table["state"].cat.rename_categories(lambda state: KEY_STATES.index(state)).astype(int)
+    worst = ranks.groupby([table[column] for column in keys + ["locale"]], observed=True).max().unstack("locale")
+
+    source_keys = table.loc[table["locale"] == source_locale, keys].drop_duplicates()
+    index = pd.MultiIndex.from_frame(source_keys) if len(keys) > 1 else pd.Index(source_keys["key"], name="key")
+    worst = worst.reindex(index=index).drop(columns=[source_locale], errors="ignore")
+
+    missing = KEY_STATES.index("missing")
+    codes = worst.fillna(missing).astype(int)
+    # Built column by column: apply() turns a frame without rows or columns into a Series
+    states = pd.DataFrame({ locale: pd.Categorical.from_codes(codes[locale], KEY_STATES) for locale in codes.columns }, index=codes.index)
+    states.columns = codes.columns
+    return states
+
+def coverage_matrix(table: pd.DataFrame, source_locale: str) -> pd.DataFrame:
+    """
+    The share (0-1) of source keys fully translated per target locale, per catalog if the table has several.
+    """
+    translated = (key_states(table, source_locale) == "translated").astype(float)
+    if "catalog" in table.columns:
+        return translated.groupby(level="catalog", observed=True).mean()
+    if len(translated) == 0:
+        # Without source keys there is nothing to cover
+        return pd.DataFrame(columns=translated.columns, dtype=float)
+    return translated.mean().to_frame("coverage").T
+
+def state_matrix(table: pd.DataFrame) -> pd.DataFrame:
+    """
+    The number of string units in each state (columns) per locale (rows).
+    """
+    return pd.crosstab(table["locale"], table["state"])
+
+def table_format(path: Path) -> TableFormat:
+    table_format = TABLE_SUFFIXES.get(path.suffix.lower(), None)
+    if table_format is None:
+        raise ValueError(f'Unknown table format of {path} (use {", ".join(TABLE_SUFFIXES.keys())})')
+    return table_format
+
+def write_table(table: pd.DataFrame, path: Path, format: TableFormat | None = None):
+    format = format if format is not None else table_format(path)
+    if format == 'csv':
+        table.to_csv(path, index=False)
+        return
+
+    if pyarrow is None:
+        raise ValueError('Parquet and Arrow tables need pyarrow (pip install pyarrow)')
+    if format == 'parquet':
+        table.to_parquet(path, index=False)
+    else:
+        table.to_feather(path)
+
+def read_table(path: Path, format: TableFormat | None = None) -> pd.DataFrame:
+    format = format if format is not None else table_format(path)
+    if format == 'csv':
+        # Empty strings stay values; only the optional columns turn them back into nulls
+        table = pd.read_csv(path, dtype=str, keep_default_na=False)
+        for column in ["device", "plural", "extraction_state", "comment"]:
+            table[column] = table[column].replace("", None)
+        return _categorize(table)
+
+    if pyarrow is None:
+        raise ValueError('Parquet and Arrow tables need pyarrow (pip install pyarrow)')
+    return _categorize(pd.read_parquet(path) if format == 'parquet' else pd.read_feather(path))
+
+class CatalogTableTool:
+    def __init__(self):
+        parser = ArgumentParser(description="Export catalogs to one flat table and report their translation coverage")
+
+        parser.add_argument("input", nargs="+", type=str, help="Catalog files, or directories searched for .xcstrings files")
+        parser.add_argument("-o", "--output", default=None, type=str, help="Table file (.csv, .parquet, .arrow or .feather)")
+        parser.add_argument("-f", "--format", default=None, choices=["csv", "parquet", "arrow"], help="Table format (default: from the output suffix)")
+        parser.add_argument("-s", "--source", default=None, type=str, help="Source locale of the coverage (default: the catalogs' source language)")
+        parser.add_argument("--coverage", default=False, action="store_true", help="Log the share of keys translated per catalog and locale")
+        parser.add_argument("--states", default=False, action="store_true", help="Log the number of string units per locale and state")
+        parser.add_argument("-l", "--log", default="info", type=str, help="Log level")
+
+        self.parser = parser
+
+    def run(self, varg: list[str]) -> int:
+        logger = Logger(prefix="catalog-table")
+        args = self.parser.parse_args(varg)
+
+        log = cast_logging_level(args.log)
+        if log is None:
+            raise ValueError("Log level must be a string")
+        logger.logging_level = log
+
+        tables: list[pd.DataFrame] = []
+        source_languages: set[str] = set()
+        for input in args.input:
+            root = Path(input)
+            if root.is_dir():
+                paths = sorted(path for path in root.rglob("*.xcstrings") if not path.name.endswith(".translated.xcstrings"))
+            elif root.exists():
+                paths = [root]
+            else:
+                raise FileNotFoundError(f"File not found: {root}")
+
+            for path in paths:
+                xcstrings = XCStrings.from_path(path, logger=logger)
+                source_languages.add(xcstrings.source_language)
+                tables.append(catalog_table(xcstrings, catalog=str(path.relative_to(root)) if root.is_dir() else path.name))
+
+        table = concat_tables(tables)
+        logger.info(f"Read {len(table)} string unit(s) from {len(tables)} catalog(s).")
+
+        if args.output is not None:
+            output = Path(args.output)
+            write_table(table, output, args.format)
+            logger.info(f"Wrote {output}")
+
+        if args.states:
+            logger.info(f"String units per state:\n{state_matrix(table).to_string()}")
+
+        if args.coverage:
+            source_locale = args.source
+            if source_locale is None:
+                if len(source_languages) > 1:
+                    raise ValueError(f"The catalogs have different source languages ({', '.join(sorted(source_languages))}), choose one with --source")
+                source_locale = next(iter(source_languages), "en")
+            logger.info(f"Keys translated from {source_locale}:\n{coverage_matrix(table, source_locale).to_string(float_format=lambda share: f'{share:.1%}')}")
+
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(CatalogTableTool().run(sys.argv[1:]))
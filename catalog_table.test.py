@@ -0,0 +1,109 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from catalog_table import catalog_table, concat_tables, coverage_matrix, key_states, read_table, state_matrix, write_table, pyarrow
+from xcstrings import XCStrings
+
+def unit(value: str, state: str = "translated") -> dict:
+    return { "stringUnit": { "state": state, "value": value } }
+
+def sample_catalog() -> XCStrings:
+    return XCStrings.from_dict({ "sourceLanguage": "en", "version": "1.0", "strings": {
+        "hello": { "comment": "Greeting", "extractionState": "manual", "localizations": {
+            "en": unit("Hello"),
+            "ja": unit("こんにちは"),
+            "de": unit("Hallo", "needs_review")
+        } },
+        "items": { "localizations": {
+            "en": { "variations": { "plural": { "one": unit("%lld item"), "other": unit("%lld items") } } },
+            "ja": { "variations": { "plural": { "other": unit("%lld 個") } } },
+            "de": { "variations": { "plural": { "one": unit("%lld Element"), "other": unit("", "new") } } }
+        } },
+        "tap": { "extractionState": "stale", "localizations": {
+            "en": { "variations": { "device": { "iphone": unit("Tap"), "mac": unit("Click") } } }
+        } }
+    } })
+
+class TestCatalogTable(unittest.TestCase):
+    def test_rows(self):
+        table = catalog_table(sample_catalog())
+
+        self.assertEqual(len(table), 10)
+        self.assertEqual(list(table.columns), ["key", "locale", "device", "plural", "state", "value", "extraction_state", "comment"])
+
+        rows = table.set_index(["key", "locale", "device", "plural"], drop=False)
+        self.assertEqual(rows.loc[("items", "de", None, "one"), "value"], "%lld Element")
+        self.assertEqual(rows.loc[("tap", "en", "mac", None), "extraction_state"], "stale")
+        self.assertEqual(rows.loc[("hello", "ja", None, None), "comment"], "Greeting")
+
+        self.assertIn("catalog", catalog_table(sample_catalog(), catalog="App").columns)
+
+    def test_key_states(self):
+        states = key_states(catalog_table(sample_catalog()), "en")
+
+        self.assertEqual(list(states.index), ["hello", "items", "tap"])
+        self.assertEqual(sorted(states.columns), ["de", "ja"])
+        self.assertEqual(list(states["ja"]), ["translated", "translated", "missing"])
+        # The worst unit counts
+        self.assertEqual(list(states["de"]), ["needs_review", "new", "missing"])
+
+    def test_coverage(self):
+        coverage = coverage_matrix(catalog_table(sample_catalog()), "en")
+        self.assertAlmostEqual(coverage.loc["coverage", "ja"], 2 / 3)
+        self.assertAlmostEqual(coverage.loc["coverage", "de"], 0)
+
+        table = concat_tables([catalog_table(sample_catalog(), catalog="A"), catalog_table(XCStrings.from_dict({ "sourceLanguage": "en", "version": "1.0", "strings": {
+            "hello": { "localizations": { "en": unit("Hello"), "de": unit("Hallo") } }
+        } }), catalog="B")])
+        coverage = coverage_matrix(table, "en")
+        self.assertAlmostEqual(coverage.loc["A", "ja"], 2 / 3)
+        self.assertAlmostEqual(coverage.loc["B", "ja"], 0)
+        self.assertAlmostEqual(coverage.loc["B", "de"], 1)
+
+    def test_without_translations(self):
+        def table(strings: dict, catalog: str | None = None):
+            return catalog_table(XCStrings.from_dict({ "sourceLanguage": "en", "version": "1.0", "strings": strings }), catalog=catalog)
+
+        empty = { }
+        fresh = { "hello": { "localizations": { "en": unit("Hello") } } }
+        without_source = { "hello": { "localizations": { "ja": unit("こんにちは") } } }
+
+        for catalog in [None, "App"]:
+            self.assertEqual(key_states(table(empty, catalog), "en").shape, (0, 0))
+            self.assertEqual(coverage_matrix(table(empty, catalog), "en").shape, (0, 0))
+
+            # Only the source locale: one key, no target locale
+            self.assertEqual(key_states(table(fresh, catalog), "en").shape, (1, 0))
+            self.assertEqual(coverage_matrix(table(fresh, catalog), "en").shape, (1, 0))
+
+            self.assertEqual(key_states(table(without_source, catalog), "en").shape, (0, 1))
+            self.assertEqual(coverage_matrix(table(without_source, catalog), "en").shape, (0, 1))
+
+    def test_state_matrix(self):
+        states = state_matrix(catalog_table(sample_catalog()))
+        self.assertEqual(states.loc["de", "needs_review"], 1)
+        self.assertEqual(states.loc["de", "new"], 1)
+        self.assertEqual(states.loc["en", "translated"], 5)
+
+    def test_csv_round_trip(self):
+        table = catalog_table(sample_catalog(), catalog="App")
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "catalog.csv"
+            write_table(table, path)
+            read = read_table(path)
+
+        self.assertEqual(read.astype(object).where(read.notna(), None).values.tolist(), table.astype(object).where(table.notna(), None).values.tolist())
+
+    @unittest.skipIf(pyarrow is not None, "pyarrow is installed")
+    def test_columnar_needs_pyarrow(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(ValueError):
+                write_table(catalog_table(sample_catalog()), Path(directory) / "catalog.parquet")
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            write_table(catalog_table(sample_catalog()), Path("catalog.xlsx"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import openai
+import httpx
+from dataclasses import dataclass
+
+@dataclass
+class ClientConfig:
+    timeout: float = 120.0
+    connect_timeout: float = 10.0
+    max_connections: int = 8
+    max_keepalive_connections: int | None = None
+    keepalive_expiry: float = 60.0
+    http2: bool = False
+    max_retries: int = 2
+
+def create_client(api_key: str, config: ClientConfig) -> openai.OpenAI:
+    """
+    Creates an OpenAI client on top of a single pooled keep-alive connection pool.
+    The client is thread safe and meant to be shared by every worker and file of a run.
+    """
+    if config.http2:
+        try:
+            import h2 # noqa: F401
+        except ImportError:
+            raise ValueError("HTTP/2 requires the 'h2' package (pip install 'httpx[http2]')")
+
+    max_keepalive_connections = config.max_keepalive_connections
+    if max_keepalive_connections is None:
+        max_keepalive_connections = config.max_connections
+
+    timeout = httpx.Timeout(config.timeout, connect=config.connect_timeout)
+
+    http_client = openai.DefaultHttpxClient(
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry
+        ),
+        timeout=timeout,
+        http2=config.http2
+    )
+
+    return openai.OpenAI(
+        api_key=api_key,
+        http_client=http_client,
+        timeout=timeout,
+        max_retries=config.max_retries
+    )
@@ -0,0 +1,58 @@
+import unittest
+from unittest import mock
+
+import httpx
+import openai
+
+from client import ClientConfig, create_client
+
+try:
+    import h2
+except ImportError:
+    h2 = None
+
+class RecordingHttpxClient(openai.DefaultHttpxClient):
+    """
+    Keeps the arguments the client was created with.
+    """
+    created: list[dict] = []
+
+    def __init__(self, **kwargs):
+        RecordingHttpxClient.created.append(kwargs)
+        super().__init__(**kwargs)
+
+class TestCreateClient(unittest.TestCase):
+    def setUp(self):
+        RecordingHttpxClient.created = []
+        patcher = mock.patch.object(openai, "DefaultHttpxClient", RecordingHttpxClient)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_pool_and_timeouts(self):
+        client = create_client("test", ClientConfig(timeout=30.0, connect_timeout=4.0, max_connections=3, max_keepalive_connections=2, keepalive_expiry=5.0, max_retries=1))
+        kwargs = RecordingHttpxClient.created[-1]
+
+        self.assertEqual(kwargs["limits"], httpx.Limits(max_connections=3, max_keepalive_connections=2, keepalive_expiry=5.0))
+        self.assertEqual(kwargs["timeout"], httpx.Timeout(30.0, connect=4.0))
+        self.assertFalse(kwargs["http2"])
+        self.assertEqual(client.timeout, httpx.Timeout(30.0, connect=4.0))
+        self.assertEqual(client.max_retries, 1)
+        client.close()
+
+    def test_keepalive_defaults_to_max_connections(self):
+        create_client("test", ClientConfig(max_connections=12)).close()
+        self.assertEqual(RecordingHttpxClient.created[-1]["limits"].max_keepalive_connections, 12)
+
+    @unittest.skipIf(h2 is None, "h2 is not installed")
+    def test_http2(self):
+        create_client("test", ClientConfig(http2=True)).close()
+        self.assertTrue(RecordingHttpxClient.created[-1]["http2"])
+
+    @unittest.skipIf(h2 is not None, "h2 is installed")
+    def test_http2_needs_h2(self):
+        with self.assertRaises(ValueError):
+            create_client("test", ClientConfig(http2=True))
+        self.assertEqual(RecordingHttpxClient.created, [])
+
+if __name__ == '__main__':
+    unittest.main()
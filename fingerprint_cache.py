@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+# Only the standard library and util are imported here, so that the build gate
+# answers from the cache before the translator and its dependencies are loaded
+from util.atomic_write import atomic_write_text
+from util.filemanager import FileManager
+from util.logger import Logger, cast_logging_level
+
+CACHE_VERSION = 1
+COMMAND_NAME = "xcllmtool"
+
+# A file written this close to when it was hashed can change again without changing its size or mtime
+RACY_WINDOW_NS = 2_000_000_000
+
+# Exit status of --check when keys need translating; 1 is an error
+PENDING_STATUS = 3
+
+def default_cache_root() -> Path:
+    return Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+
+def pending_scope(source_locale: str, target_locale: str, stale_policy: str) -> str:
+    return f"{source_locale}>{target_locale}:{stale_policy}"
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+class FingerprintCache:
+    """
+    Remembers the pending keypaths of catalogs per source/target locale and stale policy,
+    keyed by the catalog's size, mtime and content hash. Every catalog and scope has its own
+    small file, so a check reads nothing but its own entry.
+    """
+    directory: Path
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._entries: dict[tuple[str, str], dict] = {}
+        self._dirty: set[tuple[str, str]] = set()
+
+    @staticmethod
+    def default(root: Path | None = None) -> 'FingerprintCache':
+        file_manager = FileManager(COMMAND_NAME, root if root is not None else default_cache_root())
+        return FingerprintCache(file_manager.command_directory() / "fingerprints")
+
+    def pending(self, catalog: Path, scope: str) -> list[dict] | None:
+        """
+        Returns the cached pending keypaths, or None when the catalog changed or was never checked for the scope.
+        The content is only hashed when the mtime changed (e.g. a checkout) or is too recent to be trusted.
+        """
+        key = (str(catalog.resolve()), scope)
+        entry = self._entry(key)
+        if entry is None:
+            return None
+
+        stat = os.stat(catalog)
+        if stat.st_size != entry["size"]:
+            return None
+
+        if stat.st_mtime_ns != entry["mtime_ns"] or stat.st_mtime_ns + RACY_WINDOW_NS > entry["hashed_ns"]:
+            hashed_ns = time.time_ns()
+            if content_hash(catalog.read_bytes()) != entry["sha256"]:
+                return None
+            entry["mtime_ns"] = stat.st_mtime_ns
+            entry["hashed_ns"] = hashed_ns
+            self._dirty.add(key)
+
+        return entry["pending"]
+
+    def store(self, catalog: Path, stat: os.stat_result, content: bytes, scope: str, pending: list[dict]):
+        """
+        Records the pending keypaths listed from the content, read after the catalog was stat'ed:
+        if it changed in between, the hash no longer matches the next time.
+        """
+        key = (str(catalog.resolve()), scope)
+        self._entries[key] = {
+            "version": CACHE_VERSION,
+            "path": key[0],
+            "scope": scope,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": content_hash(content),
+            "hashed_ns": time.time_ns(),
+            "pending": pending
+        }
+        self._dirty.add(key)
+
+    def save(self):
+        if len(self._dirty) == 0:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for key in self._dirty:
+            atomic_write_text(self._entry_path(key), json.dumps(self._entries[key], ensure_ascii=False))
+        self._dirty.clear()
+
+    def _entry_path(self, key: tuple[str, str]) -> Path:
+        return self.directory / f"{hashlib.sha1(chr(0).join(key).encode('utf-8')).hexdigest()}.json"
+
+    def _entry(self, key: tuple[str, str]) -> dict | None:
+        if key in self._entries:
+            return self._entries[key]
+
+        # A missing, corrupt or outdated entry is rebuilt
+        try:
+            entry = json.loads(self._entry_path(key).read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("version", None) != CACHE_VERSION or (entry.get("path", None), entry.get("scope", None)) != key:
+            return None
+
+        self._entries[key] = entry
+        return entry
+
+def check_catalog(catalog: Path, source_locale: str, target_locale: str, stale_policy: str, cache: FingerprintCache, logger: Logger) -> list[dict]:
+    """
+    Lists the keypaths a translation run would send, from the cache when the catalog is unchanged.
+    """
+    scope = pending_scope(source_locale, target_locale, stale_policy)
+    pending = cache.pending(catalog, scope)
+
+    if pending is None:
+        logger.debug(f"{catalog.name} changed since it was last checked, listing pending keys...")
+        # Loaded only when the catalog has to be parsed
+        from prompt_builder import cast_StalePolicy
+        from sharding import pending_keys
+        from xcstrings import XCStrings
+
+        stat = os.stat(catalog)
+        content = catalog.read_bytes()
+        xcstrings = XCStrings.from_json(content.decode("utf-8"), logger)
+        pending = [keypath.to_dict() for keypath in pending_keys(xcstrings, source_locale, target_locale, cast_StalePolicy(stale_policy))]
+        cache.store(catalog, stat, content, scope, pending)
+
+    cache.save()
+    return pending
+
+class CheckTool:
+    """
+    The --check mode of main.py. It accepts the whole translation command line and ignores the options it does not need.
+    """
+    def __init__(self):
+        parser = ArgumentParser(description="Check whether a catalog has keys to translate")
+
+        parser.add_argument("input", type=str, help="Source file")
+        parser.add_argument("-s", "--source", required=True, type=str, help="Source locale")
+        parser.add_argument("-t", "--target", required=True, type=str, help="Target locale")
+        parser.add_argument("--stale", default="skip", choices=["skip", "defer", "include"], help="Stale keys (no longer in code): skip them, translate them last, or treat them like other keys")
+        parser.add_argument("--check", default=False, action="store_true", help="Exit with status 3 if keys need translating, 0 otherwise")
+        parser.add_argument("--cache-dir", default=None, type=str, help="Directory of the fingerprint cache (default: $XDG_CACHE_HOME or ~/.cache)")
+        parser.add_argument("-l", "--log", default="info", type=str, help="Log level")
+
+        self.parser = parser
+
+    def run(self, varg: list[str]) -> int:
+        logger = Logger(prefix="xcllmtool")
+        try:
+            args, _ = self.parser.parse_known_args(varg)
+
+            log = cast_logging_level(args.log)
+            if log is None:
+                raise ValueError("Log level must be a string")
+            logger.logging_level = log
+
+            source_path = Path(args.input)
+            if not source_path.is_file():
+                raise FileNotFoundError(f"File not found: {source_path}")
+
+            cache = FingerprintCache.default(Path(args.cache_dir) if args.cache_dir is not None else None)
+            pending = check_catalog(source_path, args.source, args.target, args.stale, cache, logger)
+        except Exception as e:
+            logger.exception(e)
+            return 1
+
+        if len(pending) == 0:
+            logger.debug(f"{source_path.name} has nothing to translate to {args.target}.")
+            return 0
+
+        logger.info(f"{source_path.name} has {len(pending)} key(s) to translate to {args.target}.")
+        return PENDING_STATUS
+
+if __name__ == "__main__":
+    sys.exit(CheckTool().run(sys.argv[1:]))
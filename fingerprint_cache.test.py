@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from fingerprint_cache import FingerprintCache, check_catalog
+from util.logger import Logger
+
+def write_catalog(path: Path, ja: str | None):
+    localizations = { "en": { "stringUnit": { "state": "translated", "value": "Hello" } } }
+    if ja is not None:
+        localizations["ja"] = { "stringUnit": { "state": "translated", "value": ja } }
+    path.write_text(json.dumps({ "sourceLanguage": "en", "version": "1.0", "strings": { "hello": { "localizations": localizations } } }))
+
+class TestFingerprintCache(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = Path(self._directory.name)
+        self.catalog = self.directory / "Localizable.xcstrings"
+        self.logger = Logger(prefix="test")
+        self.logger.logging_level = "error"
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def check(self, target: str = "ja") -> list[dict]:
+        return check_catalog(self.catalog, "en", target, "skip", FingerprintCache(self.directory / "cache"), self.logger)
+
+    def test_pending(self):
+        write_catalog(self.catalog, None)
+        self.assertEqual(self.check(), [{ "key": "hello", "locale": "en", "device": None, "plural": None }])
+
+        write_catalog(self.catalog, "こんにちは")
+        self.assertEqual(self.check(), [])
+        self.assertEqual(len(self.check("ko")), 1)
+
+    def test_answers_from_cache(self):
+        write_catalog(self.catalog, None)
+        self.check()
+
+        stat = os.stat(self.catalog)
+        cache = FingerprintCache(self.directory / "cache")
+        self.assertIsNotNone(cache.pending(self.catalog, "en>ja:skip"))
+        self.assertIsNone(cache.pending(self.catalog, "en>ko:skip"))
+
+        # Touched without changing the content, e.g. by a checkout
+        os.utime(self.catalog, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000_000))
+        self.assertIsNotNone(FingerprintCache(self.directory / "cache").pending(self.catalog, "en>ja:skip"))
+
+    def test_same_size_and_mtime(self):
+        write_catalog(self.catalog, "ab")
+        self.check()
+        stat = os.stat(self.catalog)
+
+        # Rewritten within the mtime resolution: only the content hash tells
+        write_catalog(self.catalog, "cd")
+        os.utime(self.catalog, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(os.stat(self.catalog).st_size, stat.st_size)
+        self.assertIsNone(FingerprintCache(self.directory / "cache").pending(self.catalog, "en>ja:skip"))
+
+    def test_corrupt_cache(self):
+        write_catalog(self.catalog, None)
+        self.check()
+        for path in (self.directory / "cache").iterdir():
+            path.write_text("{")
+        self.assertEqual(len(self.check()), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+import random
+import sys
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from typing import Callable
+
+from budget import estimate_tokens
+from catalog_generator import CatalogGenerator, CatalogGeneratorConfig
+from prompt_format import PROMPT_FORMATS, PromptFormat
+from util.logger import Logger, cast_logging_level
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Values that break naive line protocols
+TRICKY_VALUES = [
+    "- Starts like a bullet",
+    "1. Starts like a number",
+    "First line\nSecond line",
+    'Say "hello"',
+    "<b>Bold</b> & more",
+    "C:\\Users\\new",
+    "[{1}] {2}",
+    "50% off"
+]
+
+# Stands in for a line break the model writes as is instead of escaping it
+RAW_LINE_BREAK = "\ue000"
+
+def response(prompt_format: PromptFormat, values: list[str], separator: str | None = None, raw_line_breaks: bool = False) -> str:
+    items: list[str] = []
+    for index, value in enumerate(values):
+        if raw_line_breaks:
+            items.append(prompt_format.encode_item(index + 1, value.replace("\n", RAW_LINE_BREAK)).replace(RAW_LINE_BREAK, "\n"))
+        else:
+            items.append(prompt_format.encode_item(index + 1, value))
+    return prompt_format.wrap((separator if separator is not None else prompt_format.separator).join(items))
+
+# Ways a model's response deviates from the requested format
+Perturbation = Callable[[PromptFormat, list[str]], str]
+
+PERTURBATIONS: dict[str, Perturbation] = {
+    "exact": lambda prompt_format, values: response(prompt_format, values),
+    "fenced": lambda prompt_format, values: f"```\n{response(prompt_format, values)}\n```",
+    "preamble": lambda prompt_format, values: f"Here are the translations:\n\n{response(prompt_format, values)}",
+    "blank_lines": lambda prompt_format, values: response(prompt_format, values, separator=prompt_format.separator + "\n"),
+    "trailing_spaces": lambda prompt_format, values: response(prompt_format, values, separator=" " + prompt_format.separator) + " ",
+    "raw_line_breaks": lambda prompt_format, values: response(prompt_format, values, raw_line_breaks=True)
+}
+
+class TokenCounter:
+    """
+    Counts tokens with tiktoken when it is installed, otherwise estimates them:
+    about one token per short word, number, symbol or CJK character.
+    """
+    exact: bool
+
+    def __init__(self, encoding: str = "o200k_base"):
+        self._encoding = tiktoken.get_encoding(encoding) if tiktoken is not None else None
+        self.exact = self._encoding is not None
+
+    def count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return estimate_tokens(text)
+
+@dataclass
+class FormatResult:
+    locale: str
+    format: str
+    items: int
+    content_tokens: int
+    encoded_tokens: int
+    attempts: int
+    failures: int
+
+    def overhead_per_item(self) -> float:
+        return (self.encoded_tokens - self.content_tokens) / max(self.items, 1)
+
+    def overhead_ratio(self) -> float:
+        return (self.encoded_tokens - self.content_tokens) / max(self.content_tokens, 1)
+
+    def failure_rate(self) -> float:
+        return self.failures / max(self.attempts, 1)
+
+class FormatBenchmark:
+    """
+    Compares the prompt formats on strings of each locale: how many tokens the format adds around
+    the strings, and how often a response that deviates from the format in a typical way
+    is still parsed back into exactly the same strings when streamed in random chunks.
+    """
+    counter: TokenCounter
+    batch_size: int
+    seed: int
+
+    def __init__(self, counter: TokenCounter, batch_size: int = 20, seed: int = 0):
+        self.counter = counter
+        self.batch_size = batch_size
+        self.seed = seed
+
+    def run(self, locale: str, values: list[str], formats: list[PromptFormat]) -> list[FormatResult]:
+        batches = [values[start:start + self.batch_size] for start in range(0, len(values), self.batch_size)]
+        content_tokens = sum(self.counter.count(value) for value in values)
+
+        results: list[FormatResult] = []
+        for prompt_format in formats:
+            chunks = random.Random(self.seed)
+            result = FormatResult(locale, prompt_format.name, len(values), content_tokens, 0, 0, 0)
+
+            for batch in batches:
+                result.encoded_tokens += self.counter.count(prompt_format.encode(batch))
+
+                for perturbation in PERTURBATIONS.values():
+                    result.attempts += 1
+                    if self._parse(prompt_format, perturbation(prompt_format, batch), chunks) != batch:
+                        result.failures += 1
+
+            results.append(result)
+
+        return results
+
+    def _parse(self, prompt_format: PromptFormat, response: str, chunks: random.Random) -> list[str] | None:
+        parser = prompt_format.parser()
+        items: list[str] = []
+        position = 0
+        try:
+            while position < len(response):
+                size = chunks.randint(1, 24)
+                items += parser.feed(response[position:position + size])
+                position += size
+            return items + parser.finish()
+        except ValueError:
+            return None
+
+class FormatBenchmarkTool:
+    def __init__(self):
+        parser = ArgumentParser(description="Compare the token overhead and robustness of prompt formats")
+
+        parser.add_argument("-t", "--target", default=["ja", "de", "ko", "ru", "ar"], nargs="+", type=str, help="Locales to compare the formats on")
+        parser.add_argument("--keys", default=2000, type=int, help="Strings per locale")
+        parser.add_argument("-f", "--format", default=[], action="append", type=str, help="Format to compare (repeatable, default: all)")
+        parser.add_argument("--batch-size", default=20, type=int, help="Strings per simulated request")
+        parser.add_argument("--max-failure-rate", default=0.0, type=float, help="Highest parse failure rate a recommended format may have")
+        parser.add_argument("-l", "--log", default="info", type=str, help="Log level")
+
+        self.parser = parser
+
+    def run(self, varg: list[str]) -> int:
+        logger = Logger(prefix="format-benchmark")
+        args = self.parser.parse_args(varg)
+
+        log = cast_logging_level(args.log)
+        if log is None:
+            raise ValueError("Log level must be a string")
+        logger.logging_level = log
+
+        for name in args.format:
+            if name not in PROMPT_FORMATS:
+                raise ValueError(f"Unknown prompt format: {name}")
+        formats = [PROMPT_FORMATS[name] for name in args.format] if len(args.format) > 0 else list(PROMPT_FORMATS.values())
+
+        counter = TokenCounter()
+        if not counter.exact:
+            logger.warn("tiktoken is not installed, token counts are estimates.")
+
+        benchmark = FormatBenchmark(counter, batch_size=args.batch_size)
+
+        for locale in args.target:
+            # The same seed gives every locale the same strings, written in its own script
+            generator = CatalogGenerator(CatalogGeneratorConfig(keys=args.keys, locales=2, translated_ratio=1.0, device_ratio=0, plural_ratio=0, locale_list=["en", locale]))
+            xcstrings = generator.generate()
+
+            values = [value for value in (xcstrings.get(keypath) for keypath in xcstrings.list_keys(locale=locale)) if value]
+            for index, value in enumerate(TRICKY_VALUES):
+                values.insert(index * len(values) // len(TRICKY_VALUES), value)
+
+            results = benchmark.run(locale, values, formats)
+            for result in results:
+                logger.info(f"{locale:<8}{result.format:<10}{result.overhead_per_item():>6.2f} tokens/string ({result.overhead_ratio() * 100:>5.1f}% overhead), {result.failure_rate() * 100:>5.1f}% parse failures")
+
+            reliable = [result for result in results if result.failure_rate() <= args.max_failure_rate]
+            if len(reliable) == 0:
+                logger.warn(f"{locale}: no format parses reliably.")
+            else:
+                best = min(reliable, key=lambda result: result.encoded_tokens)
+                logger.info(f"{locale}: cheapest reliable format is {best.format}.")
+
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(FormatBenchmarkTool().run(sys.argv[1:]))
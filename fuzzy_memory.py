@@ -0,0 +1,106 @@
+import numpy as np
+from dataclasses import dataclass
+
+from translation_memory import TranslationMemory
+from xcstrings import XCStrings, XCStringUnit
+
+@dataclass
+class FuzzyMatch:
+    source: str
+    target: str
+    score: float
+
+class FuzzyIndex:
+    """
+    Character n-gram index over source/target pairs.
+    Similarity is the Dice coefficient of the n-gram sets, scored for all pairs at once
+    by counting shared n-grams over the posting lists.
+    """
+    n: int
+
+    sources: list[str]
+    targets: list[str]
+
+    def __init__(self, n: int = 3):
+        self.n = n
+        self.sources = []
+        self.targets = []
+
+        self._ids: dict[str, int] = {}
+        self._grams: dict[str, int] = {}
+        self._postings: list[list[int]] = []
+        self._sizes: list[int] = []
+        self._arrays: list[np.ndarray] | None = None
+        self._size_array: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def add(self, source: str, target: str) -> None:
+        if source in self._ids:
+            self.targets[self._ids[source]] = target
+            return
+
+        doc = len(self.sources)
+        self._ids[source] = doc
+        self.sources.append(source)
+        self.targets.append(target)
+
+        grams = self._ngrams(source)
+        self._sizes.append(len(grams))
+        for gram in grams:
+            gram_id = self._grams.get(gram, None)
+            if gram_id is None:
+                gram_id = len(self._postings)
+                self._grams[gram] = gram_id
+                self._postings.append([])
+            self._postings[gram_id].append(doc)
+
+        self._arrays = None
+        self._size_array = None
+
+    def add_memory(self, memory: TranslationMemory, source_locale: str, target_locale: str) -> None:
+        for (entry_source_locale, entry_target_locale, source), target in memory.entries.items():
+            if entry_source_locale == source_locale and entry_target_locale == target_locale:
+                self.add(source, target)
+
+    def add_catalog(self, xcstrings: XCStrings, source_locale: str, target_locale: str) -> None:
+        for entry in xcstrings.strings.values():
+            source = entry.localizations.get(source_locale, None)
+            target = entry.localizations.get(target_locale, None)
+            if isinstance(source, XCStringUnit) and isinstance(target, XCStringUnit) and target.state == 'translated':
+                self.add(source.value, target.value)
+
+    def search(self, query: str, limit: int = 3, threshold: float = 0.0) -> list[FuzzyMatch]:
+        if len(self.sources) == 0 or limit <= 0:
+            return []
+
+        query_grams = self._ngrams(query)
+        gram_ids = [self._grams[gram] for gram in query_grams if gram in self._grams]
+        if len(gram_ids) == 0:
+            return []
+
+        query_size = len(query_grams)
+        arrays, sizes = self._posting_arrays()
+
+        shared = np.bincount(np.concatenate([arrays[gram_id] for gram_id in gram_ids]), minlength=len(self.sources))
+        scores = 2.0 * shared / (sizes + query_size)
+
+        candidates = np.flatnonzero(scores >= max(threshold, np.finfo(np.float64).tiny))
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        return [FuzzyMatch(self.sources[doc], self.targets[doc], float(scores[doc])) for doc in candidates]
+
+    def _posting_arrays(self) -> tuple[list[np.ndarray], np.ndarray]:
+        if self._arrays is None or self._size_array is None:
+            self._arrays = [np.asarray(posting, dtype=np.int64) for posting in self._postings]
+            self._size_array = np.asarray(self._sizes, dtype=np.float64)
+        return self._arrays, self._size_array
+
+    def _ngrams(self, text: str) -> set[str]:
+        text = f" {' '.join(text.lower().split())} "
+        if len(text) <= self.n:
+            return {text}
+        return {text[i:i + self.n] for i in range(len(text) - self.n + 1)}
@@ -0,0 +1,58 @@
+import unittest
+
+from fuzzy_memory import FuzzyIndex
+from translation_memory import TranslationMemory
+from xcstrings import XCStrings
+
+class TestFuzzyIndex(unittest.TestCase):
+    def test_search_orders_by_similarity(self):
+        index = FuzzyIndex()
+        index.add("Delete all items", "すべての項目を削除")
+        index.add("Delete 1 item", "1項目を削除")
+        index.add("Settings", "設定")
+
+        matches = index.search("Delete 2 items", limit=2)
+
+        self.assertEqual([match.source for match in matches], ["Delete all items", "Delete 1 item"])
+        self.assertGreater(matches[0].score, matches[1].score)
+
+    def test_threshold_and_exact_match(self):
+        index = FuzzyIndex()
+        index.add("Settings", "設定")
+        index.add("Delete all items", "すべての項目を削除")
+
+        matches = index.search("settings", threshold=0.9)
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0].target, "設定")
+        self.assertAlmostEqual(matches[0].score, 1.0)
+
+        self.assertEqual(index.search("Zebra", threshold=0.5), [])
+
+    def test_sources_from_catalog_and_memory(self):
+        xcstrings = XCStrings.from_dict({
+            "sourceLanguage": "en",
+            "version": "1.0",
+            "strings": {
+                "title": { "localizations": {
+                    "en": { "stringUnit": { "state": "translated", "value": "Title" } },
+                    "ja": { "stringUnit": { "state": "translated", "value": "タイトル" } }
+                } },
+                "draft": { "localizations": {
+                    "en": { "stringUnit": { "state": "translated", "value": "Draft" } },
+                    "ja": { "stringUnit": { "state": "new", "value": "下書き" } }
+                } }
+            }
+        })
+        memory = TranslationMemory()
+        memory.insert("en", "ja", "Open File", "ファイルを開く")
+        memory.insert("en", "fr", "Open File", "Ouvrir le fichier")
+
+        index = FuzzyIndex()
+        index.add_catalog(xcstrings, "en", "ja")
+        index.add_memory(memory, "en", "ja")
+
+        self.assertEqual(sorted(index.sources), ["Open File", "Title"])
+        self.assertEqual(index.search("Open Files")[0].target, "ファイルを開く")
+
+if __name__ == '__main__':
+    unittest.main()
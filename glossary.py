@@ -0,0 +1,125 @@
+import csv
+import json
+from dataclasses import dataclass
+from os import PathLike
+from pathlib import Path
+
+from util.aho_corasick import AhoCorasick
+
+@dataclass
+class GlossaryTerm:
+    source: str
+    targets: dict[str, str]
+
+class Glossary:
+    """
+    Product terms and their required translations.
+
+    JSON files map a source term to its translations (`{ "Workspace": { "ja": "ワークスペース" } }`).
+    CSV files have a `source` column followed by one column per locale.
+    """
+    terms: list[GlossaryTerm]
+
+    def __init__(self, terms: list[GlossaryTerm]):
+        self.terms = terms
+        self._matcher: AhoCorasick | None = None
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def find(self, text: str) -> list[GlossaryTerm]:
+        """
+        Returns the terms occurring in the text as whole words, case insensitively, in order of appearance.
+        """
+        matcher = self._compiled()
+        text = text.casefold()
+
+        found: dict[int, GlossaryTerm] = {}
+        for start, index in matcher.find(text):
+            end = start + len(matcher.patterns[index])
+            if not self._is_word_boundary(text, start) or not self._is_word_boundary(text, end):
+                continue
+            if index not in found:
+                found[index] = self.terms[index]
+
+        return list(found.values())
+
+    def find_targets(self, texts: list[str], target_locale: str) -> dict[str, str]:
+        """
+        Returns the source/target pairs of the terms used in any of the texts that have a translation for the locale.
+        """
+        pairs: dict[str, str] = {}
+        for text in texts:
+            for term in self.find(text):
+                target = term.targets.get(target_locale, None)
+                if target is not None:
+                    pairs[term.source] = target
+        return pairs
+
+    def missing_targets(self, source: str, translation: str, target_locale: str) -> list[GlossaryTerm]:
+        """
+        Returns the terms of the source whose required translation does not appear in the translation.
+        """
+        translation = translation.casefold()
+        missing: list[GlossaryTerm] = []
+
+        for term in self.find(source):
+            target = term.targets.get(target_locale, None)
+            if target is not None and target.casefold() not in translation:
+                missing.append(term)
+
+        return missing
+
+    def _compiled(self) -> AhoCorasick:
+        if self._matcher is None:
+            self._matcher = AhoCorasick(term.source.casefold() for term in self.terms)
+        return self._matcher
+
+    def _is_word_boundary(self, text: str, position: int) -> bool:
+        # Only letters and digits on both sides join words; CJK terms match anywhere
+        if position <= 0 or position >= len(text):
+            return True
+        before, after = text[position - 1], text[position]
+        return not (self._is_word_char(before) and self._is_word_char(after))
+
+    def _is_word_char(self, char: str) -> bool:
+        return char.isascii() and (char.isalnum() or char == "_")
+
+    @staticmethod
+    def from_dict(data: dict) -> 'Glossary':
+        terms: list[GlossaryTerm] = []
+
+        for source, targets in data.items():
+            if not isinstance(targets, dict):
+                raise ValueError(f'Glossary translations of {source} must be a dictionary')
+            for locale, target in targets.items():
+                if not isinstance(target, str):
+                    raise ValueError(f'Glossary translation of {source} for {locale} must be a string')
+            terms.append(GlossaryTerm(source, dict(targets)))
+
+        return Glossary(terms)
+
+    @staticmethod
+    def from_path(path: PathLike) -> 'Glossary':
+        path = Path(path)
+
+        if path.suffix.lower() == ".csv":
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                reader = csv.DictReader(f)
+                if reader.fieldnames is None or "source" not in reader.fieldnames:
+                    raise ValueError(f'Glossary {path} must have a source column')
+
+                terms: list[GlossaryTerm] = []
+                for row in reader:
+                    source = row.pop("source")
+                    if not source:
+                        continue
+                    targets = { locale: target for locale, target in row.items() if locale is not None and target }
+                    terms.append(GlossaryTerm(source, targets))
+                return Glossary(terms)
+
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f'Glossary {path} must be a dictionary')
+        return Glossary.from_dict(data)
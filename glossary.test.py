@@ -0,0 +1,45 @@
+import unittest
+import tempfile
+from pathlib import Path
+
+from glossary import Glossary
+
+class TestGlossary(unittest.TestCase):
+    def setUp(self):
+        self.glossary = Glossary.from_dict({
+            "Workspace": { "ja": "ワークスペース" },
+            "App": { "ja": "アプリ" },
+            "App Store": { "ja": "App Store" },
+            "Item": { "fr": "Élément" }
+        })
+
+    def test_find_whole_words(self):
+        found = [term.source for term in self.glossary.find("Open the app store from your workspace")]
+        self.assertEqual(found, ["App", "App Store", "Workspace"])
+
+        self.assertEqual(self.glossary.find("Apple Workspaces"), [])
+
+    def test_find_targets(self):
+        terms = self.glossary.find_targets(["New Workspace", "Delete item", "Settings"], "ja")
+        self.assertEqual(terms, { "Workspace": "ワークスペース" })
+
+    def test_missing_targets(self):
+        missing = self.glossary.missing_targets("Open Workspace in App", "アプリでワークスペースを開く", "ja")
+        self.assertEqual(missing, [])
+
+        missing = self.glossary.missing_targets("Open Workspace in App", "アプリで作業スペースを開く", "ja")
+        self.assertEqual([term.source for term in missing], ["Workspace"])
+
+    def test_from_csv(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "glossary.csv"
+            path.write_text("source,ja,fr\nWorkspace,ワークスペース,\nItem,,Élément\n", encoding="utf-8")
+
+            glossary = Glossary.from_path(path)
+
+            self.assertEqual(len(glossary), 2)
+            self.assertEqual(glossary.terms[0].targets, { "ja": "ワークスペース" })
+            self.assertEqual(glossary.find_targets(["an item"], "fr"), { "Item": "Élément" })
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import threading
+from collections import deque
+
+class LatencyTracker:
+    """
+    Latencies of the most recent successful requests, for the hedging threshold.
+    """
+    percentile: float
+    min_samples: int
+
+    def __init__(self, percentile: float, min_samples: int = 5, window: int = 200):
+        if not 0 < percentile < 1:
+            raise ValueError('Hedge percentile must be between 0 and 1')
+
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def threshold(self) -> float | None:
+        """
+        Returns the latency at the percentile, or None until enough requests have finished.
+        """
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            samples = sorted(self._samples)
+
+        index = min(len(samples) - 1, int(self.percentile * len(samples)))
+        return samples[index]
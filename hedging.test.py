@@ -0,0 +1,33 @@
+import unittest
+
+from hedging import LatencyTracker
+
+class TestLatencyTracker(unittest.TestCase):
+    def test_threshold(self):
+        tracker = LatencyTracker(0.9, min_samples=3)
+        tracker.record(1.0)
+        tracker.record(2.0)
+        self.assertIsNone(tracker.threshold())
+
+        for seconds in [3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0]:
+            tracker.record(seconds)
+        self.assertEqual(tracker.threshold(), 10.0)
+
+        tracker = LatencyTracker(0.5, min_samples=1)
+        for seconds in [4.0, 1.0, 3.0, 2.0]:
+            tracker.record(seconds)
+        self.assertEqual(tracker.threshold(), 3.0)
+
+    def test_window(self):
+        tracker = LatencyTracker(0.5, min_samples=1, window=3)
+        for seconds in [100.0, 100.0, 100.0, 1.0, 1.0, 1.0]:
+            tracker.record(seconds)
+        self.assertEqual(tracker.threshold(), 1.0)
+
+    def test_invalid_percentile(self):
+        for percentile in [0, 1, 1.5]:
+            with self.assertRaises(ValueError):
+                LatencyTracker(percentile)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+from xcstrings import XCStringKeyPath
+
+class TranslationJournal:
+    """
+    Append-only JSON lines log of finished translations, written as soon as each one is accepted.
+    A run that is interrupted resumes from it instead of translating the same keys again.
+    """
+    path: Path
+    entries: dict[XCStringKeyPath, str]
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries = TranslationJournal.load(path) if path.exists() else {}
+
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def record(self, keypath: XCStringKeyPath, translation: str) -> None:
+        line = json.dumps({ **keypath.to_dict(), "translation": translation }, ensure_ascii=False)
+
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.entries[keypath] = translation
+
+    def discard(self, keypaths: list[XCStringKeyPath]) -> None:
+        """
+        Withdraws recorded translations that turned out to be unusable.
+        """
+        lines = [json.dumps({ **keypath.to_dict(), "translation": None }) for keypath in keypaths]
+
+        with self._lock:
+            for line in lines:
+                self._file.write(line + "\n")
+            self._file.flush()
+            for keypath in keypaths:
+                self.entries.pop(keypath, None)
+
+    def close(self, remove: bool = False) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        if remove and self.path.exists():
+            os.remove(self.path)
+
+    @staticmethod
+    def load(path: Path) -> dict[XCStringKeyPath, str]:
+        entries: dict[XCStringKeyPath, str] = {}
+
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line may be cut off by a crash
+                    continue
+
+                keypath = XCStringKeyPath.from_dict(data)
+                translation = data.get("translation", None)
+                if translation is None:
+                    entries.pop(keypath, None)
+                else:
+                    entries[keypath] = translation
+
+        return entries
@@ -0,0 +1,80 @@
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+DEFAULT_LOCALE_SUPPORT_DIRECTORY = Path(__file__).resolve().parent / "locale_support"
+
+@dataclass
+class LocaleSupport:
+    locale: str
+    language: str
+    sample: str
+
+    @staticmethod
+    def from_dict(locale: str, data: dict) -> 'LocaleSupport':
+        language = data.get("language", None)
+        if not isinstance(language, str):
+            raise ValueError('language must be a string')
+
+        sample = data.get("sample", None)
+        if not isinstance(sample, str):
+            raise ValueError('sample must be a string')
+
+        return LocaleSupport(locale, language, sample)
+
+    @staticmethod
+    def from_path(path: Path) -> 'LocaleSupport':
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return LocaleSupport.from_dict(path.stem, json.load(f))
+        except (OSError, ValueError) as e:
+            raise ValueError(f'Invalid locale support file {path}: {e}')
+
+class LocaleRegistry:
+    directories: list[Path]
+    locales: dict[str, LocaleSupport]
+
+    _shared: dict[tuple[Path, ...], 'LocaleRegistry'] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, directories: list[Path] | None = None):
+        """
+        Loads the bundled locale definitions, then each override directory in order.
+        A later directory replaces the definitions of the same locale.
+        """
+        self.directories = [DEFAULT_LOCALE_SUPPORT_DIRECTORY] + [Path(directory) for directory in directories or []]
+        self.locales = {}
+
+        for directory in self.directories:
+            self.load_directory(directory)
+
+    def load_directory(self, directory: Path) -> None:
+        if not directory.is_dir():
+            raise FileNotFoundError(f"Locale support directory not found: {directory}")
+
+        for path in sorted(directory.glob("*.json")):
+            self.locales[path.stem] = LocaleSupport.from_path(path)
+
+    def get(self, locale: str) -> LocaleSupport | None:
+        """
+        Looks up the locale, falling back to less specific tags ('zh-Hant-HK' -> 'zh-Hant' -> 'zh').
+        """
+        components = locale.replace("_", "-").split("-")
+        while len(components) > 0:
+            support = self.locales.get("-".join(components), None)
+            if support is not None:
+                return support
+            components.pop()
+        return None
+
+    @staticmethod
+    def shared(directories: list[Path] | None = None) -> 'LocaleRegistry':
+        """
+        Returns a registry loaded once per process for the given override directories.
+        """
+        key = tuple(Path(directory).resolve() for directory in directories or [])
+        with LocaleRegistry._shared_lock:
+            if key not in LocaleRegistry._shared:
+                LocaleRegistry._shared[key] = LocaleRegistry(list(key))
+            return LocaleRegistry._shared[key]
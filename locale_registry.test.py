@@ -0,0 +1,40 @@
+import unittest
+import json
+import tempfile
+from pathlib import Path
+
+from locale_registry import LocaleRegistry
+
+class TestLocaleRegistry(unittest.TestCase):
+    def test_bundled_locale(self):
+        registry = LocaleRegistry()
+
+        ja = registry.get("ja")
+        self.assertIsNotNone(ja)
+        self.assertEqual(ja.language, "Japanese") # type: ignore
+
+        self.assertEqual(registry.get("ja-JP"), ja)
+        self.assertIsNone(registry.get("xx"))
+
+    def test_override_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(Path(directory) / "ja.json", "w") as f:
+                json.dump({ "language": "Japanese (Polite)", "sample": "- ようこそ" }, f)
+
+            registry = LocaleRegistry([Path(directory)])
+
+            self.assertEqual(registry.get("ja").language, "Japanese (Polite)") # type: ignore
+
+    def test_invalid_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(Path(directory) / "fr.json", "w") as f:
+                f.write("{ broken")
+
+            with self.assertRaises(ValueError):
+                LocaleRegistry([Path(directory)])
+
+    def test_shared(self):
+        self.assertIs(LocaleRegistry.shared(), LocaleRegistry.shared())
+
+if __name__ == '__main__':
+    unittest.main()
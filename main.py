@@ -1,6 +1,11 @@
 import sys
-from xcllmtool import XCLLMTool
-  
+
 if __name__ == "__main__":
+    # The build gate answers from the fingerprint cache without loading the translator
+    if "--check" in sys.argv[1:]:
+        from fingerprint_cache import CheckTool
+        sys.exit(CheckTool().run(sys.argv[1:]))
+
+    from xcllmtool import XCLLMTool
     tool = XCLLMTool()
     tool.run(sys.argv[1:])
\ No newline at end of file
@@ -0,0 +1,387 @@
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from argparse import ArgumentParser
+from typing import BinaryIO, TypeAlias
+
+from translation_memory import TranslationMemory
+from util.logger import Logger, cast_logging_level
+
+# A Unix socket path, or a (host, port) pair
+MemoryAddress: TypeAlias = str | tuple[str, int]
+
+# Strings per request, so that one catalog does not turn into a single huge message
+REQUEST_BATCH_SIZE = 1000
+
+def parse_address(spec: str) -> MemoryAddress:
+    """
+    Reads `unix:/path/to.sock` (or any path) as a Unix socket, and `host:port` as TCP.
+    """
+    if spec.startswith("unix:"):
+        return spec[len("unix:"):]
+    if "/" in spec:
+        return spec
+
+    host, _, port = spec.rpartition(":")
+    if host == "" or not port.isdigit():
+        raise ValueError(f"Memory server address must be unix:/path/to.sock or host:port, not {spec}")
+    return (host, int(port))
+
+def format_address(address: MemoryAddress) -> str:
+    return f"unix:{address}" if isinstance(address, str) else f"{address[0]}:{address[1]}"
+
+def _connect(address: MemoryAddress, timeout: float) -> socket.socket:
+    if isinstance(address, str):
+        if not hasattr(socket, "AF_UNIX"):
+            raise ValueError("Unix sockets are not supported on this platform, use host:port")
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(timeout)
+        try:
+            connection.connect(address)
+        except OSError:
+            connection.close()
+            raise
+        return connection
+    return socket.create_connection(address, timeout=timeout)
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """
+    Answers one JSON request per line until the client disconnects.
+    """
+    def handle(self):
+        memory_server: MemoryServer = self.server.memory_server # type: ignore
+        memory_server._track(self.connection)
+        try:
+            self._answer(memory_server)
+        finally:
+            memory_server._untrack(self.connection)
+
+    def _answer(self, memory_server: 'MemoryServer'):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("Request must be a dictionary")
+                response = memory_server.handle(request)
+            except (ValueError, KeyError, TypeError) as e:
+                response = { "error": str(e) }
+            try:
+                self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            except ConnectionError:
+                # The client went away; its job may have been cancelled
+                return
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+else:
+    _UnixServer = None
+
+class MemoryServer:
+    """
+    Serves one translation memory to every job on the machine, over a Unix socket or localhost.
+    It has no authentication, so it must not listen on an address other machines can reach.
+    """
+    address: MemoryAddress
+    memory: TranslationMemory
+    lookups: int
+    hits: int
+
+    def __init__(self, address: MemoryAddress, memory: TranslationMemory | None = None):
+        self.memory = memory if memory is not None else TranslationMemory()
+        self.lookups = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._connections: set[socket.socket] = set()
+
+        if isinstance(address, str):
+            if _UnixServer is None:
+                raise ValueError("Unix sockets are not supported on this platform, use host:port")
+            self._remove_stale_socket(address)
+            self._server: socketserver.BaseServer = _UnixServer(address, _RequestHandler)
+            self.address = address
+        else:
+            self._server = _TCPServer(address, _RequestHandler)
+            # Port 0 picks a free port
+            self.address = (address[0], self._server.server_address[1]) # type: ignore
+        self._server.memory_server = self # type: ignore
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def start(self) -> 'MemoryServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MemoryServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def shutdown(self):
+        # shutdown() waits for serve_forever, which only runs in a thread of start()
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+        self._server.server_close()
+
+        # Open connections would otherwise go on being answered by their handler threads
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)
+
+    def handle(self, request: dict) -> dict:
+        operation = request["op"]
+        if operation == "stats":
+            with self._lock:
+                return { "entries": len(self.memory), "lookups": self.lookups, "hits": self.hits }
+
+        source_locale = request["source_locale"]
+        target_locale = request["target_locale"]
+        if not isinstance(source_locale, str) or not isinstance(target_locale, str):
+            raise ValueError("Locales must be strings")
+
+        with self._lock:
+            if operation == "lookup":
+                translations = [self.memory.lookup(source_locale, target_locale, source) for source in request["sources"]]
+                self.lookups += len(translations)
+                self.hits += len([translation for translation in translations if translation is not None])
+                return { "translations": translations }
+
+            if operation == "insert":
+                for source, target in request["entries"]:
+                    self.memory.insert(source_locale, target_locale, source, target)
+                return { "inserted": len(request["entries"]) }
+
+            if operation == "remove":
+                for source in request["sources"]:
+                    self.memory.remove(source_locale, target_locale, source)
+                return { "removed": len(request["sources"]) }
+
+        raise ValueError(f"Unknown operation: {operation}")
+
+    def _track(self, connection: socket.socket):
+        with self._lock:
+            self._connections.add(connection)
+
+    def _untrack(self, connection: socket.socket):
+        with self._lock:
+            self._connections.discard(connection)
+
+    def _remove_stale_socket(self, path: str):
+        if not os.path.exists(path):
+            return
+        try:
+            _connect(path, timeout=1.0).close()
+        except OSError:
+            # Left behind by a server that did not shut down
+            os.remove(path)
+            return
+        raise ValueError(f"A memory server is already listening on {path}")
+
+class MemoryClient:
+    """
+    Sends batched requests to a memory server. Connections are kept open and reused by the
+    threads of a run; up to pool_size idle ones are kept.
+    """
+    address: MemoryAddress
+    pool_size: int
+    timeout: float
+
+    def __init__(self, address: MemoryAddress, pool_size: int = 4, timeout: float = 5.0):
+        self.address = address
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._idle: queue.LifoQueue[tuple[socket.socket, BinaryIO]] = queue.LifoQueue()
+
+    def lookup(self, source_locale: str, target_locale: str, sources: list[str]) -> list[str | None]:
+        translations: list[str | None] = []
+        for start in range(0, len(sources), REQUEST_BATCH_SIZE):
+            batch = sources[start:start + REQUEST_BATCH_SIZE]
+            response = self._request({ "op": "lookup", "source_locale": source_locale, "target_locale": target_locale, "sources": batch })
+            if not isinstance(response.get("translations", None), list) or len(response["translations"]) != len(batch):
+                raise ValueError("Memory server returned a malformed lookup")
+            translations.extend(response["translations"])
+        return translations
+
+    def insert(self, source_locale: str, target_locale: str, entries: list[tuple[str, str]]):
+        for start in range(0, len(entries), REQUEST_BATCH_SIZE):
+            self._request({ "op": "insert", "source_locale": source_locale, "target_locale": target_locale, "entries": entries[start:start + REQUEST_BATCH_SIZE] })
+
+    def remove(self, source_locale: str, target_locale: str, sources: list[str]):
+        for start in range(0, len(sources), REQUEST_BATCH_SIZE):
+            self._request({ "op": "remove", "source_locale": source_locale, "target_locale": target_locale, "sources": sources[start:start + REQUEST_BATCH_SIZE] })
+
+    def stats(self) -> dict:
+        return self._request({ "op": "stats" })
+
+    def close(self):
+        while True:
+            try:
+                connection, reader = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            reader.close()
+            connection.close()
+
+    def _request(self, request: dict) -> dict:
+        message = json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n"
+
+        # A pooled connection may have been closed by a restarted server; requests are idempotent, so one is retried on a new connection
+        pooled = self._acquire()
+        if pooled is not None:
+            try:
+                return self._send(pooled, message)
+            except OSError:
+                pass
+
+        return self._send(self._open(), message)
+
+    def _send(self, connection: tuple[socket.socket, BinaryIO], message: bytes) -> dict:
+        sock, reader = connection
+        try:
+            sock.sendall(message)
+            line = reader.readline()
+            if not line:
+                raise ConnectionError("Memory server closed the connection")
+        except BaseException:
+            reader.close()
+            sock.close()
+            raise
+
+        self._release(connection)
+        response = json.loads(line)
+        if not isinstance(response, dict):
+            raise ValueError("Memory server returned a malformed response")
+        if "error" in response:
+            raise ValueError(f"Memory server error: {response['error']}")
+        return response
+
+    def _open(self) -> tuple[socket.socket, BinaryIO]:
+        sock = _connect(self.address, self.timeout)
+        return (sock, sock.makefile("rb"))
+
+    def _acquire(self) -> tuple[socket.socket, BinaryIO] | None:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _release(self, connection: tuple[socket.socket, BinaryIO]):
+        if self._idle.qsize() < self.pool_size:
+            self._idle.put(connection)
+        else:
+            connection[1].close()
+            connection[0].close()
+
+class RemoteTranslationMemory(TranslationMemory):
+    """
+    A local translation memory backed by a memory server. prefetch() fetches the translations of a
+    run in bulk, so lookups stay local; inserts are queued and sent by flush(). Removals stay local,
+    since another job may have stored a good translation of the same string.
+    When the server cannot be reached, it goes on as a local memory.
+    """
+    client: MemoryClient
+    logger: Logger
+
+    def __init__(self, client: MemoryClient, logger: Logger):
+        super().__init__()
+        self.client = client
+        self.logger = logger
+        self.available = True
+        self._pending: dict[tuple[str, str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, source_locale: str, target_locale: str, sources: list[str]) -> None:
+        missing = [source for source in dict.fromkeys(sources) if (source_locale, target_locale, source) not in self.entries]
+        if len(missing) == 0 or not self.available:
+            return
+
+        try:
+            translations = self.client.lookup(source_locale, target_locale, missing)
+        except (OSError, ValueError) as e:
+            self._disconnect(e)
+            return
+
+        found = 0
+        for source, translation in zip(missing, translations):
+            if translation is not None:
+                self.entries[(source_locale, target_locale, source)] = translation
+                found += 1
+        self.logger.debug(f"Found {found} of {len(missing)} string(s) in the memory server.")
+
+    def insert(self, source_locale: str, target_locale: str, source: str, target: str) -> None:
+        super().insert(source_locale, target_locale, source, target)
+        with self._lock:
+            self._pending[(source_locale, target_locale, source)] = target
+
+    def remove(self, source_locale: str, target_locale: str, source: str) -> None:
+        super().remove(source_locale, target_locale, source)
+        with self._lock:
+            self._pending.pop((source_locale, target_locale, source), None)
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if len(pending) == 0 or not self.available:
+            return
+
+        inserts: dict[tuple[str, str], list[tuple[str, str]]] = {}
+        for (source_locale, target_locale, source), target in pending.items():
+            inserts.setdefault((source_locale, target_locale), []).append((source, target))
+
+        try:
+            for (source_locale, target_locale), entries in inserts.items():
+                self.client.insert(source_locale, target_locale, entries)
+        except (OSError, ValueError) as e:
+            self._disconnect(e)
+
+    def _disconnect(self, error: Exception):
+        self.available = False
+        self.logger.warn(f"Memory server {format_address(self.client.address)} is not available ({error}), continuing with a local memory.")
+
+class MemoryServerTool:
+    def __init__(self):
+        parser = ArgumentParser(description="Serve a translation memory shared by the translation jobs on this machine")
+
+        parser.add_argument("--listen", default="127.0.0.1:7700", type=str, help="unix:/path/to.sock or host:port (default: 127.0.0.1:7700)")
+        parser.add_argument("-l", "--log", default="info", type=str, help="Log level")
+
+        self.parser = parser
+
+    def run(self, varg: list[str]) -> int:
+        logger = Logger(prefix="memory-server")
+        args = self.parser.parse_args(varg)
+
+        log = cast_logging_level(args.log)
+        if log is None:
+            raise ValueError("Log level must be a string")
+        logger.logging_level = log
+
+        server = MemoryServer(parse_address(args.listen))
+        # Stopped like an interrupt, so that the socket is removed
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        logger.info(f"Listening on {format_address(server.address)}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.shutdown()
+            logger.info(f"Served {server.lookups} lookup(s), {server.hits} hit(s), {len(server.memory)} entries.")
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(MemoryServerTool().run(sys.argv[1:]))
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from memory_server import MemoryClient, MemoryServer, RemoteTranslationMemory, parse_address
+from util.logger import Logger
+
+class TestMemoryServer(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self._directory.name, "memory.sock")
+        self.server = MemoryServer(self.socket_path).start()
+        self.logger = Logger(logging_level="fatal")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self._directory.cleanup()
+
+    def test_parse_address(self):
+        self.assertEqual(parse_address("unix:/tmp/memory.sock"), "/tmp/memory.sock")
+        self.assertEqual(parse_address("/tmp/memory.sock"), "/tmp/memory.sock")
+        self.assertEqual(parse_address("127.0.0.1:7700"), ("127.0.0.1", 7700))
+        with self.assertRaises(ValueError):
+            parse_address("localhost")
+
+    def test_batched_requests(self):
+        client = MemoryClient(self.socket_path)
+        sources = [f"String {index}\nwith a line break" for index in range(2500)]
+
+        client.insert("en", "ja", [(source, f"ja {source}") for source in sources[::2]])
+        translations = client.lookup("en", "ja", sources)
+        self.assertEqual(translations[0], f"ja {sources[0]}")
+        self.assertIsNone(translations[1])
+        self.assertEqual(len([translation for translation in translations if translation is not None]), 1250)
+        self.assertEqual(client.lookup("en", "de", sources[:1]), [None])
+
+        client.remove("en", "ja", sources[:1])
+        self.assertEqual(client.lookup("en", "ja", sources[:1]), [None])
+        self.assertEqual(client.stats()["entries"], 1249)
+
+        with self.assertRaises(ValueError):
+            client._request({ "op": "unknown", "source_locale": "en", "target_locale": "ja" })
+        client.close()
+
+    def test_tcp(self):
+        server = MemoryServer(("127.0.0.1", 0)).start()
+        try:
+            client = MemoryClient(server.address)
+            client.insert("en", "ja", [("Hello", "こんにちは")])
+            self.assertEqual(client.lookup("en", "ja", ["Hello"]), ["こんにちは"])
+            client.close()
+        finally:
+            server.shutdown()
+
+    def test_pooled_connections(self):
+        client = MemoryClient(self.socket_path, pool_size=2)
+
+        def work(index: int):
+            for count in range(50):
+                client.insert("en", "ja", [(f"{index}-{count}", "x")])
+
+        threads = [threading.Thread(target=work, args=(index,)) for index in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(client.stats()["entries"], 300)
+        self.assertLessEqual(client._idle.qsize(), 2)
+        client.close()
+
+    def test_server_restart(self):
+        client = MemoryClient(self.socket_path)
+        client.insert("en", "ja", [("Hello", "こんにちは")])
+
+        # The pooled connection is dead; the request goes through on a new one
+        self.server.shutdown()
+        self.server = MemoryServer(self.socket_path).start()
+        self.assertEqual(client.lookup("en", "ja", ["Hello"]), [None])
+        client.close()
+
+    def test_shared_memory(self):
+        first = RemoteTranslationMemory(MemoryClient(self.socket_path), self.logger)
+        second = RemoteTranslationMemory(MemoryClient(self.socket_path), self.logger)
+
+        first.insert("en", "ja", "Hello", "こんにちは")
+        first.insert("en", "ja", "Broken", "壊れた")
+        first.remove("en", "ja", "Broken")
+        second.prefetch("en", "ja", ["Hello", "Broken"])
+        self.assertIsNone(second.lookup("en", "ja", "Hello"))
+
+        first.flush()
+        second.prefetch("en", "ja", ["Hello", "Broken"])
+        self.assertEqual(second.lookup("en", "ja", "Hello"), "こんにちは")
+        self.assertIsNone(second.lookup("en", "ja", "Broken"))
+
+        # A removal only withdraws the local copy, the server keeps what another job stored
+        second.remove("en", "ja", "Hello")
+        second.flush()
+        self.assertIsNone(second.lookup("en", "ja", "Hello"))
+        self.assertEqual(first.client.lookup("en", "ja", ["Hello"]), ["こんにちは"])
+
+    def test_unavailable_server(self):
+        memory = RemoteTranslationMemory(MemoryClient(os.path.join(self._directory.name, "missing.sock"), timeout=0.5), self.logger)
+        memory.prefetch("en", "ja", ["Hello"])
+        self.assertFalse(memory.available)
+
+        # Still works as a local memory
+        memory.insert("en", "ja", "Hello", "こんにちは")
+        memory.flush()
+        self.assertEqual(memory.lookup("en", "ja", "Hello"), "こんにちは")
+
+    def test_socket_in_use(self):
+        with self.assertRaises(ValueError):
+            MemoryServer(self.socket_path)
+
+if __name__ == '__main__':
+    unittest.main()
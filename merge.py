@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+
+from xcstrings import XCStrings, XCStringKeyPath, XCStringUnit, XCStringDeviceVariation, XCStringPluralVariation
+
+@dataclass
+class MergeConflict:
+    keypath: XCStringKeyPath
+    reason: str
+    ours: str | None
+    theirs: str | None
+
+    def describe(self) -> str:
+        variant = "/".join(part for part in [self.keypath.device, self.keypath.plural] if part is not None)
+        name = f"{self.keypath.key} ({self.keypath.locale}{'/' + variant if variant else ''})"
+        return f"{name}: {self.reason}"
+
+@dataclass
+class MergeResult:
+    merged: XCStrings
+    applied: list[XCStringKeyPath]
+    conflicts: list[MergeConflict]
+
+def changed_units(base: XCStrings, ours: XCStrings) -> list[tuple[XCStringKeyPath, XCStringUnit]]:
+    """
+    Lists the string units ours added or modified relative to base. Unchanged entries are skipped without being walked.
+    """
+    changes: list[tuple[XCStringKeyPath, XCStringUnit]] = []
+
+    for key, entry in ours.strings.items():
+        base_entry = base.strings.get(key, None)
+        if base_entry is entry or base_entry == entry:
+            continue
+        for keypath in ours.list_keys(key=key):
+            unit = ours.get_unit(keypath)
+            if unit is not None and unit != base.get_unit(keypath):
+                changes.append((keypath, unit))
+
+    return changes
+
+def three_way_merge(base: XCStrings, ours: XCStrings, theirs: XCStrings, source_locale: str | None = None) -> MergeResult:
+    """
+    Applies the changes ours made to base onto theirs, keypath by keypath, and returns theirs as the merge.
+    Only added and modified string units are carried over. A change conflicts, and theirs is kept, when theirs
+    changed the same keypath differently, removed the key, or changed the source string it was translated from.
+    """
+    return _apply_changes(base, changed_units(base, ours), theirs, source_locale)
+
+def merge_translations(base: XCStrings, translations: list[tuple[XCStringKeyPath, str]], theirs: XCStrings, source_locale: str | None = None) -> MergeResult:
+    """
+    Three-way merge of translations made on base into theirs, a newer version of the same file.
+    Same as setting them on a copy of base and merging that, without copying the catalog.
+    """
+    changes: list[tuple[XCStringKeyPath, XCStringUnit]] = []
+    for keypath, translation in translations:
+        base_unit = base.get_unit(keypath)
+        unit = XCStringUnit(translation, base_unit.state if base_unit is not None else 'needs_review')
+        if unit != base_unit:
+            changes.append((keypath, unit))
+
+    return _apply_changes(base, changes, theirs, source_locale)
+
+def _apply_changes(base: XCStrings, changes: list[tuple[XCStringKeyPath, XCStringUnit]], theirs: XCStrings, source_locale: str | None) -> MergeResult:
+    applied: list[XCStringKeyPath] = []
+    conflicts: list[MergeConflict] = []
+    source_changed: dict[XCStringKeyPath, bool] = {}
+
+    for keypath, unit in changes:
+        base_unit = base.get_unit(keypath)
+        their_unit = theirs.get_unit(keypath)
+
+        if their_unit == unit:
+            continue
+
+        if keypath.key not in theirs.strings and keypath.key in base.strings:
+            conflicts.append(MergeConflict(keypath, "removed from the file", unit.value, None))
+            continue
+
+        if their_unit != base_unit:
+            conflicts.append(MergeConflict(keypath, "edited in the file", unit.value, their_unit.value if their_unit is not None else None))
+            continue
+
+        if source_locale is not None and keypath.locale != source_locale:
+            source_keypath = keypath.with_locale(source_locale)
+            if source_keypath not in source_changed:
+                source_changed[source_keypath] = _source_value(base, source_keypath) != _source_value(theirs, source_keypath)
+            if source_changed[source_keypath]:
+                conflicts.append(MergeConflict(keypath, "source changed in the file", unit.value, _source_value(theirs, source_keypath)))
+                continue
+
+        if _shape_changed(theirs, keypath):
+            # The file turned the string into (or out of) a variation; set() would replace it
+            conflicts.append(MergeConflict(keypath, "variations changed in the file", unit.value, None))
+            continue
+
+        theirs.set(keypath, unit.value, unit.state)
+        applied.append(keypath)
+
+    return MergeResult(theirs, applied, conflicts)
+
+def _shape_changed(xcstrings: XCStrings, keypath: XCStringKeyPath) -> bool:
+    entry = xcstrings.strings.get(keypath.key, None)
+    localization = entry.localizations.get(keypath.locale, None) if entry is not None else None
+    if localization is None:
+        return False
+
+    if keypath.device is not None:
+        if not isinstance(localization, XCStringDeviceVariation):
+            return True
+        localization = localization.devices.get(keypath.device, None)
+        if localization is None:
+            return False
+
+    if keypath.plural is not None:
+        return not isinstance(localization, XCStringPluralVariation)
+    return not isinstance(localization, XCStringUnit)
+
+def _source_value(xcstrings: XCStrings, keypath: XCStringKeyPath) -> str | None:
+    try:
+        return xcstrings.get(keypath)
+    except ValueError:
+        return None
@@ -0,0 +1,89 @@
+import unittest
+
+from merge import merge_translations, three_way_merge
+from xcstrings import XCStrings, XCStringKeyPath, XCStringPluralVariation, XCStringUnit
+
+def catalog(strings: dict) -> XCStrings:
+    return XCStrings.from_dict({
+        "sourceLanguage": "en",
+        "version": "1.0",
+        "strings": {
+            key: { "localizations": {
+                locale: { "stringUnit": { "state": "translated", "value": value } } for locale, value in localizations.items()
+            } } for key, localizations in strings.items()
+        }
+    })
+
+class TestThreeWayMerge(unittest.TestCase):
+    def setUp(self):
+        self.base = catalog({
+            "hello": { "en": "Hello" },
+            "bye": { "en": "Bye" },
+            "edited": { "en": "Edited" },
+            "removed": { "en": "Removed" }
+        })
+        self.translations = [
+            (XCStringKeyPath("hello", "ja"), "こんにちは"),
+            (XCStringKeyPath("bye", "ja"), "さようなら"),
+            (XCStringKeyPath("edited", "ja"), "編集済み"),
+            (XCStringKeyPath("removed", "ja"), "削除済み")
+        ]
+
+    def test_merge(self):
+        # Meanwhile in Xcode: a key was added, one source changed, one target written by hand, one key removed
+        theirs = catalog({
+            "hello": { "en": "Hello" },
+            "bye": { "en": "Goodbye" },
+            "edited": { "en": "Edited", "ja": "手動" },
+            "new": { "en": "New" }
+        })
+
+        result = merge_translations(self.base, self.translations, theirs, "en")
+
+        self.assertEqual(result.applied, [XCStringKeyPath("hello", "ja")])
+        self.assertEqual([(conflict.keypath.key, conflict.reason) for conflict in result.conflicts], [
+            ("bye", "source changed in the file"),
+            ("edited", "edited in the file"),
+            ("removed", "removed from the file")
+        ])
+
+        merged = result.merged
+        self.assertEqual(merged.get(XCStringKeyPath("hello", "ja")), "こんにちは")
+        self.assertFalse(merged.has_entry(XCStringKeyPath("bye", "ja")))
+        self.assertEqual(merged.get(XCStringKeyPath("edited", "ja")), "手動")
+        self.assertNotIn("removed", merged.strings)
+        self.assertIn("new", merged.strings)
+
+    def test_variations_changed(self):
+        theirs = catalog({ "hello": { "en": "Hello" }, "bye": { "en": "Bye" }, "edited": { "en": "Edited" }, "removed": { "en": "Removed" } })
+        theirs.strings["hello"].localizations["ja"] = XCStringPluralVariation({ "other": XCStringUnit("%lld こんにちは", "translated") })
+
+        result = merge_translations(self.base, self.translations[:1], theirs, "en")
+
+        self.assertEqual([(conflict.keypath.key, conflict.reason) for conflict in result.conflicts], [("hello", "variations changed in the file")])
+        self.assertEqual(result.merged.get(XCStringKeyPath("hello", "ja", plural="other")), "%lld こんにちは")
+
+    def test_same_change_is_not_a_conflict(self):
+        theirs = catalog({
+            "hello": { "en": "Hello", "ja": "こんにちは" },
+            "bye": { "en": "Bye" },
+            "edited": { "en": "Edited" },
+            "removed": { "en": "Removed" }
+        })
+        theirs.set(XCStringKeyPath("hello", "ja"), state="needs_review")
+
+        result = merge_translations(self.base, self.translations, theirs, "en")
+
+        self.assertEqual(len(result.conflicts), 0)
+        self.assertEqual(len(result.applied), 3)
+
+    def test_unchanged_file(self):
+        ours = catalog({ "hello": { "en": "Hello", "ja": "こんにちは" } })
+        theirs = catalog({ "hello": { "en": "Hello" } })
+
+        result = three_way_merge(catalog({ "hello": { "en": "Hello" } }), ours, theirs, "en")
+
+        self.assertEqual(result.merged.to_dict(), ours.to_dict())
+
+if __name__ == '__main__':
+    unittest.main()
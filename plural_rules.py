@@ -0,0 +1,42 @@
+# CLDR plural categories used by String Catalogs, per language
+PLURAL_CATEGORIES: dict[str, list[str]] = {
+    "ja": ["other"],
+    "zh": ["other"],
+    "ko": ["other"],
+    "th": ["other"],
+    "vi": ["other"],
+    "id": ["other"],
+    "ms": ["other"],
+    "tr": ["one", "other"],
+    "en": ["one", "other"],
+    "de": ["one", "other"],
+    "nl": ["one", "other"],
+    "sv": ["one", "other"],
+    "da": ["one", "other"],
+    "nb": ["one", "other"],
+    "fi": ["one", "other"],
+    "el": ["one", "other"],
+    "hu": ["one", "other"],
+    "hi": ["one", "other"],
+    "fr": ["one", "many", "other"],
+    "es": ["one", "many", "other"],
+    "it": ["one", "many", "other"],
+    "pt": ["one", "many", "other"],
+    "ca": ["one", "many", "other"],
+    "ro": ["one", "few", "other"],
+    "ru": ["one", "few", "many", "other"],
+    "uk": ["one", "few", "many", "other"],
+    "pl": ["one", "few", "many", "other"],
+    "cs": ["one", "few", "many", "other"],
+    "sk": ["one", "few", "many", "other"],
+    "hr": ["one", "few", "other"],
+    "he": ["one", "two", "other"],
+    "ar": ["zero", "one", "two", "few", "many", "other"],
+}
+
+def plural_categories(locale: str) -> list[str] | None:
+    """
+    Returns the plural categories of the locale's language, or None if unknown.
+    """
+    language = locale.replace("_", "-").split("-")[0]
+    return PLURAL_CATEGORIES.get(language, None)
@@ -1,8 +1,20 @@
 from dataclasses import dataclass
 from collections import deque
+from typing import Callable, Literal, TypeAlias
 from xcstrings import XCStrings, XCStringKeyPath
+from plural_rules import plural_categories
+from prompt_format import PromptFormat
 from openai.types.chat import ChatCompletionMessageParam
 
+# What to do with keys whose extraction state is 'stale' (no longer used in code)
+StalePolicy: TypeAlias = Literal['skip', 'defer', 'include']
+
+def cast_StalePolicy(value: str) -> StalePolicy:
+    if value in ['skip', 'defer', 'include']:
+        return value # type: ignore
+    else:
+        raise ValueError(f'Invalid value for StalePolicy: {value}')
+
 @dataclass
 class PromptBuilderConfig:
     system_prompt: str
@@ -12,12 +24,42 @@ class PromptBuilderConfig:
     batch_char_limit: int
     separator: str
     prefix: str | None = None
+    value_transform: Callable[[str], str] | None = None
+    stale_policy: StalePolicy = 'skip'
+    # Replaces prefix and separator when set
+    prompt_format: PromptFormat | None = None
 
 @dataclass
 class PromptBatch:
     keys: list[XCStringKeyPath]
     messages: list[ChatCompletionMessageParam]
 
+def list_source_keys(xcstrings: XCStrings, source_locale: str, target_locale: str, source_device: str | None = None) -> list[XCStringKeyPath]:
+    """
+    Lists every source string unit, including device and plural variations.
+    Plural variations are listed with the target language's categories; a category
+    the source does not have is translated from its 'other' form.
+    """
+    target_categories = plural_categories(target_locale)
+    keys: list[XCStringKeyPath] = []
+
+    for key, entry in xcstrings.strings.items():
+        if source_locale not in entry.localizations:
+            continue
+
+        for keypath in xcstrings.list_keys(key=key, locale=source_locale, device=source_device):
+            if keypath.plural is None:
+                keys.append(keypath)
+            elif keypath.plural == "other" and target_categories is not None:
+                for category in target_categories:
+                    category_keypath = XCStringKeyPath(keypath.key, keypath.locale, keypath.device, category)
+                    if category == "other" or not xcstrings.has_entry(category_keypath):
+                        keys.append(category_keypath)
+            elif target_categories is None or (keypath.plural in target_categories and keypath.plural != "other"):
+                keys.append(keypath)
+
+    return keys
+
 class PromptBulderIterator:
     xcstrings: XCStrings
     keys: deque[XCStringKeyPath]
@@ -25,7 +67,8 @@ class PromptBulderIterator:
 
     def __init__(self, xcstrings: XCStrings, keys: list[XCStringKeyPath], config: PromptBuilderConfig):
         self.xcstrings = xcstrings
-        self.keys = deque(keys)
+        # Keys are popped from the right, so the highest priority goes last
+        self.keys = deque(reversed(keys))
         self.config = config
 
     def __next__(self) -> PromptBatch:
@@ -38,13 +81,26 @@ class PromptBulderIterator:
         char_count = len(self.config.system_prompt)
         user_message = ""
         is_first = True
+        items: list[str] = []
+        if self.config.prompt_format is not None:
+            char_count += len(self.config.prompt_format.wrap(""))
 
         keys: list[XCStringKeyPath] = []
-        while char_count < self.config.batch_char_limit and len(self.keys) > 0:
+        # A batch always takes at least one key, even if the system prompt alone exceeds the limit,
+        # and sibling variants of one key always travel in the same request
+        while len(self.keys) > 0:
+            if len(keys) > 0 and char_count >= self.config.batch_char_limit and not self._is_sibling(keys[-1], self.keys[-1]):
+                break
             key = self.keys.pop()
             keys.append(key)
             value = self.xcstrings.get(key)
-            if value is not None:
+            if value is not None and self.config.value_transform is not None:
+                value = self.config.value_transform(value)
+            if value is not None and self.config.prompt_format is not None:
+                item = self.config.prompt_format.encode_item(len(items) + 1, value)
+                char_count += len(item) + (len(self.config.prompt_format.separator) if len(items) > 0 else 0)
+                items.append(item)
+            elif value is not None:
                 if not is_first:
                     user_message += self.config.separator
                     char_count += len(self.config.separator)
@@ -56,21 +112,62 @@ class PromptBulderIterator:
                 user_message += value
                 char_count += len(value)
         
+        variation_context = self._variation_context(keys)
+        if variation_context is not None:
+            chats.append({ "role": "system", "content": variation_context })
+
+        if self.config.prompt_format is not None:
+            user_message = self.config.prompt_format.wrap(self.config.prompt_format.separator.join(items))
+
         chats.append({ "role": "user", "content": user_message })
 
         return PromptBatch(keys=keys, messages=chats)
 
+    def _is_sibling(self, a: XCStringKeyPath, b: XCStringKeyPath) -> bool:
+        return a.key == b.key and (a.device is not None or a.plural is not None)
+
+    def _variation_context(self, keys: list[XCStringKeyPath]) -> str | None:
+        """
+        Describes which items are device or plural variants of the same string.
+        """
+        lines: list[str] = []
+        start = 0
+        while start < len(keys):
+            end = start + 1
+            while end < len(keys) and self._is_sibling(keys[start], keys[end]):
+                end += 1
+
+            group = keys[start:end]
+            if group[0].device is not None or group[0].plural is not None:
+                variants = ", ".join("/".join(part for part in [key.device, key.plural] if part is not None) for key in group)
+                lines.append(f"- items {start + 1}-{end}: {variants}" if end - start > 1 else f"- item {start + 1}: {variants}")
+            start = end
+
+        if len(lines) == 0:
+            return None
+
+        return "Some items are variants of the same string, for a device (iphone, ipad, mac...) and/or a plural category (zero, one, two, few, many, other) of the target language. Translate each item for its variant.\n" + "\n".join(lines)
+
 class PromptBuilder:
     xcstrings: XCStrings
     keys: list[XCStringKeyPath]
     config: PromptBuilderConfig
 
-    def __init__(self, xcstrings: XCStrings, config: PromptBuilderConfig):
+    def __init__(self, xcstrings: XCStrings, config: PromptBuilderConfig, keys: list[XCStringKeyPath] | None = None):
         self.xcstrings = xcstrings
-        self.keys = list(xcstrings.list_keys(locale=config.source_locale, device=config.source_device))
         self.config = config
-        
-        self.keys = self._filter_keys(self.keys)
+
+        if keys is not None:
+            # Explicit keys are translated even if the target already exists (e.g. changed sources)
+            self.keys = list(keys)
+        else:
+            self.keys = self._list_source_keys()
+            self.keys = self._filter_keys(self.keys)
+
+        self.keys = self._prioritize_keys(self.keys)
+
+    def _list_source_keys(self) -> list[XCStringKeyPath]:
+        return list_source_keys(self.xcstrings, self.config.source_locale, self.config.target_locale, self.config.source_device)
 
     def _filter_keys(self, keys: list[XCStringKeyPath]) -> list[XCStringKeyPath]:
         new_keys = []
@@ -82,5 +179,35 @@ class PromptBuilder:
 
         return new_keys
 
+    def _prioritize_keys(self, keys: list[XCStringKeyPath]) -> list[XCStringKeyPath]:
+        """
+        Orders keys so that a run cut short still covers the strings that ship:
+        manual and extracted_with_value keys first, then other live keys, then deferred stale keys,
+        each group shortest string first.
+        """
+        ranked: list[tuple[int, int, XCStringKeyPath]] = []
+
+        # Variants of one key share the length of the longest, so they stay next to each other
+        lengths: dict[str, int] = {}
+        for key in keys:
+            value = self.xcstrings.get(key)
+            lengths[key.key] = max(lengths.get(key.key, 0), len(value) if value is not None else 0)
+
+        for key in keys:
+            extraction_state = self.xcstrings.strings[key.key].extraction_state if key.key in self.xcstrings.strings else None
+            if extraction_state == 'stale':
+                if self.config.stale_policy == 'skip':
+                    continue
+                tier = 2 if self.config.stale_policy == 'defer' else 1
+            elif extraction_state in ('manual', 'extracted_with_value'):
+                tier = 0
+            else:
+                tier = 1
+
+            ranked.append((tier, lengths[key.key], key))
+
+        ranked.sort(key=lambda item: (item[0], item[1]))
+        return [key for _, _, key in ranked]
+
     def __iter__(self) -> PromptBulderIterator:
         return PromptBulderIterator(self.xcstrings, self.keys, self.config)
\ No newline at end of file
@@ -11,21 +11,27 @@ class TestPromptBuilder(unittest.TestCase):
         sample_json = """
         {
             "sourceLanguage": "en",
+            "version": "1.0",
             "strings" : {
                 "title" : {
                     "localizations" : {
                         "en" : { "stringUnit" : { "state" : "translated", "value" : "Title" } },
                         "ja" : { "variations" : { "device" : { 
-                            "iPhone" : { "state" : "translated", "value" : "タイトル 1" },
-                            "iPad" : { "state" : "translated", "value" : "タイトル 2" }
+                            "iphone" : { "stringUnit" : { "state" : "translated", "value" : "タイトル 1" } },
+                            "ipad" : { "stringUnit" : { "state" : "translated", "value" : "タイトル 2" } }
                         } } }
                     }
+                },
+                "subtitle" : {
+                    "localizations" : {
+                        "en" : { "stringUnit" : { "state" : "translated", "value" : "Subtitle" } }
+                    }
                 }
             }
         }
         """
 
-        xcstrings = XCStrings.from_json(json.loads(sample_json), logger=Logger())
+        xcstrings = XCStrings.from_json(sample_json, logger=Logger())
 
         config = PromptBuilderConfig(
             system_prompt="System Prompt", 
@@ -39,8 +45,85 @@ class TestPromptBuilder(unittest.TestCase):
 
         prompt_builder = PromptBuilder(xcstrings, config) 
 
-        for batch in prompt_builder:
-            print(batch)
+        # title already has a ja localization
+        batches = list(prompt_builder)
+        self.assertEqual(len(batches), 1)
+        self.assertEqual([key.key for key in batches[0].keys], ["subtitle"])
+        self.assertEqual(batches[0].messages, [
+            { "role": "system", "content": "System Prompt" },
+            { "role": "user", "content": "- Subtitle" }
+        ])
+
+    def test_prioritize_keys(self):
+        xcstrings = XCStrings.from_dict({
+            "sourceLanguage": "en",
+            "version": "1.0",
+            "strings": {
+                "stale": { "extractionState": "stale", "localizations": { "en": { "stringUnit": { "state": "translated", "value": "Old" } } } },
+                "long": { "localizations": { "en": { "stringUnit": { "state": "translated", "value": "A much longer sentence" } } } },
+                "short": { "localizations": { "en": { "stringUnit": { "state": "translated", "value": "OK" } } } },
+                "manual": { "extractionState": "manual", "localizations": { "en": { "stringUnit": { "state": "translated", "value": "Manual string" } } } }
+            }
+        })
+
+        def config(stale_policy):
+            return PromptBuilderConfig(
+                system_prompt="System Prompt",
+                batch_char_limit=1000,
+                source_locale="en",
+                target_locale="ja",
+                source_device=None,
+                separator="\n",
+                prefix="- ",
+                stale_policy=stale_policy
+            )
+
+        prompt_builder = PromptBuilder(xcstrings, config("skip"))
+        self.assertEqual([key.key for key in prompt_builder.keys], ["manual", "short", "long"])
+
+        prompt_builder = PromptBuilder(xcstrings, config("defer"))
+        self.assertEqual([key.key for key in prompt_builder.keys], ["manual", "short", "long", "stale"])
+
+        batch = next(iter(prompt_builder))
+        self.assertEqual([key.key for key in batch.keys], ["manual", "short", "long", "stale"])
+        self.assertEqual(batch.messages[-1]["content"], "- Manual string\n- OK\n- A much longer sentence\n- Old")
+
+    def test_variations(self):
+        xcstrings = XCStrings.from_dict({
+            "sourceLanguage": "en",
+            "version": "1.0",
+            "strings": {
+                "items": { "localizations": { "en": { "variations": { "plural": {
+                    "one": { "stringUnit": { "state": "translated", "value": "%lld item" } },
+                    "other": { "stringUnit": { "state": "translated", "value": "%lld items" } }
+                } } } } },
+                "tap": { "localizations": { "en": { "variations": { "device": {
+                    "iphone": { "stringUnit": { "state": "translated", "value": "Tap" } },
+                    "mac": { "stringUnit": { "state": "translated", "value": "Click" } }
+                } } } } }
+            }
+        })
+
+        config = PromptBuilderConfig(
+            system_prompt="System Prompt",
+            batch_char_limit=10,
+            source_locale="en",
+            target_locale="ru",
+            source_device=None,
+            separator="\n",
+            prefix="- "
+        )
+
+        prompt_builder = PromptBuilder(xcstrings, config)
+        self.assertEqual([(key.key, key.device, key.plural) for key in prompt_builder.keys], [
+            ("tap", "iphone", None), ("tap", "mac", None),
+            ("items", None, "one"), ("items", None, "few"), ("items", None, "many"), ("items", None, "other")
+        ])
+
+        # Siblings stay in one batch even beyond the character limit
+        batch = next(iter(prompt_builder))
+        self.assertEqual(len(batch.keys), 2)
+        self.assertIn("items 1-2: iphone, mac", batch.messages[1]["content"])
 
 
 if __name__ == '__main__':
@@ -0,0 +1,140 @@
+import json
+import re
+from abc import ABC, abstractmethod
+from typing import Protocol
+from xml.sax.saxutils import escape, unescape
+
+from stream_parser import BulletStreamParser, JSONArrayStreamParser, NumberedStreamParser, XMLStreamParser
+
+ESCAPED_LINE_BREAK = re.compile(r"\\([\\n])")
+
+class StreamParser(Protocol):
+    def feed(self, chunk: str) -> list[str]: ...
+    def finish(self) -> list[str]: ...
+
+class DecodingStreamParser:
+    """
+    Wraps the parser of a format, decoding each item it completes. Until the format's
+    escape character shows up in the response, the items are returned as they are.
+    """
+    def __init__(self, parser: StreamParser, format: 'PromptFormat'):
+        self._parser = parser
+        self._format = format
+        self._escaped = False
+
+    def feed(self, chunk: str) -> list[str]:
+        self._escaped = self._escaped or self._format.escape_character in chunk
+        return self._decode(self._parser.feed(chunk))
+
+    def finish(self) -> list[str]:
+        return self._decode(self._parser.finish())
+
+    def _decode(self, items: list[str]) -> list[str]:
+        if not self._escaped:
+            return items
+        return [self._format.decode_item(item) for item in items]
+
+class PromptFormat(ABC):
+    """
+    How the strings of a batch are written into the user message and read back from the response.
+    Parsers raise ValueError when the response cannot be matched to the strings.
+    """
+    name: str = ""
+    # Tells the model what the input looks like and that the output must look the same
+    description: str = ""
+    separator: str = "\n"
+    # Items are only decoded once it shows up in the response; empty decodes every item
+    escape_character: str = ""
+
+    @abstractmethod
+    def encode_item(self, index: int, value: str) -> str: ...
+
+    def wrap(self, body: str) -> str:
+        return body
+
+    def encode(self, values: list[str]) -> str:
+        return self.wrap(self.separator.join(self.encode_item(index + 1, value) for index, value in enumerate(values)))
+
+    def decode_item(self, item: str) -> str:
+        return item
+
+    @abstractmethod
+    def parser(self) -> StreamParser: ...
+
+    def decode(self, content: str) -> list[str]:
+        parser = self.parser()
+        return parser.feed(content) + parser.finish()
+
+def escape_line_breaks(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+def unescape_line_breaks(value: str) -> str:
+    if "\\" not in value:
+        return value
+    return ESCAPED_LINE_BREAK.sub(lambda match: "\n" if match.group(1) == "n" else "\\", value)
+
+class BulletPromptFormat(PromptFormat):
+    name = "bullets"
+    description = "The input is given in bullet point format, one string per line starting with \"- \". Line breaks inside a string are written as \\n. The output should be in the same bullet point format, one translated string per line, in the same order."
+    escape_character = "\\"
+
+    def encode_item(self, index: int, value: str) -> str:
+        return f"- {escape_line_breaks(value)}"
+
+    def decode_item(self, item: str) -> str:
+        return unescape_line_breaks(item)
+
+    def parser(self) -> StreamParser:
+        return DecodingStreamParser(BulletStreamParser(), self)
+
+class NumberedPromptFormat(PromptFormat):
+    name = "numbered"
+    description = "The input is given as numbered lines (\"1. \", \"2. \"...), one string per line. Line breaks inside a string are written as \\n. The output should be numbered the same way, one translated string per line, keeping each number."
+    escape_character = "\\"
+
+    def encode_item(self, index: int, value: str) -> str:
+        return f"{index}. {escape_line_breaks(value)}"
+
+    def decode_item(self, item: str) -> str:
+        return unescape_line_breaks(item)
+
+    def parser(self) -> StreamParser:
+        return DecodingStreamParser(NumberedStreamParser(), self)
+
+class JSONArrayPromptFormat(PromptFormat):
+    name = "json"
+    description = "The input is given as a JSON array of strings. The output should be a JSON array of the translated strings, in the same order."
+    separator = ",\n"
+
+    def encode_item(self, index: int, value: str) -> str:
+        return json.dumps(value, ensure_ascii=False)
+
+    def wrap(self, body: str) -> str:
+        return f"[\n{body}\n]"
+
+    def parser(self) -> StreamParser:
+        return JSONArrayStreamParser()
+
+class XMLPromptFormat(PromptFormat):
+    name = "xml"
+    description = "The input is given as XML elements <s i=\"1\">...</s>, one per string, with &, < and > escaped. The output should be the same elements with the translated strings, keeping each index."
+    escape_character = "&"
+
+    def encode_item(self, index: int, value: str) -> str:
+        return f'<s i="{index}">{escape(value)}</s>'
+
+    def decode_item(self, item: str) -> str:
+        return unescape(item, { "&quot;": '"', "&apos;": "'" })
+
+    def parser(self) -> StreamParser:
+        return DecodingStreamParser(XMLStreamParser(), self)
+
+PROMPT_FORMATS: dict[str, PromptFormat] = {
+    prompt_format.name: prompt_format for prompt_format in [BulletPromptFormat(), NumberedPromptFormat(), JSONArrayPromptFormat(), XMLPromptFormat()]
+}
+
+def get_prompt_format(name: str) -> PromptFormat:
+    prompt_format = PROMPT_FORMATS.get(name, None)
+    if prompt_format is None:
+        raise ValueError(f'Unknown prompt format: {name} (available: {", ".join(PROMPT_FORMATS.keys())})')
+    return prompt_format
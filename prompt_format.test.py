@@ -0,0 +1,50 @@
+import unittest
+
+from prompt_format import PROMPT_FORMATS, PromptFormat, get_prompt_format, escape_line_breaks, unescape_line_breaks
+
+VALUES = ["Hello", "- Starts like a bullet", "1. Starts like a number", "Two\nlines", 'Say "hi"', "<b>Bold</b> & more", "C:\\temp\\new", "[{1} files]", "こんにちは"]
+
+class TestPromptFormat(unittest.TestCase):
+    def test_round_trip(self):
+        for name, prompt_format in PROMPT_FORMATS.items():
+            with self.subTest(name):
+                encoded = prompt_format.encode(VALUES)
+                self.assertEqual(prompt_format.decode(encoded), VALUES)
+                # Models like to fence their output
+                self.assertEqual(prompt_format.decode(f"```\n{encoded}\n```"), VALUES)
+
+    def test_one_line_per_item(self):
+        # Line breaks in values are escaped, so they cannot start a new item
+        for name in ["bullets", "numbered"]:
+            with self.subTest(name):
+                self.assertEqual(len(get_prompt_format(name).encode(VALUES).split("\n")), len(VALUES))
+
+    def test_line_break_escaping(self):
+        self.assertEqual(escape_line_breaks("a\\nb\nc"), "a\\\\nb\\nc")
+        self.assertEqual(unescape_line_breaks(escape_line_breaks("a\\nb\nc")), "a\\nb\nc")
+        # Unknown escapes are kept
+        self.assertEqual(unescape_line_breaks("50\\%"), "50\\%")
+
+    def test_streamed_per_character(self):
+        # Escapes are split across chunks, and show up after items that are returned undecoded
+        values = ["Plain", "Two\nlines & more", "Last"]
+        for name, prompt_format in PROMPT_FORMATS.items():
+            with self.subTest(name):
+                parser = prompt_format.parser()
+                items = [item for character in prompt_format.encode(values) for item in parser.feed(character)]
+                self.assertEqual(items + parser.finish(), values)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            get_prompt_format("yaml")
+
+    def test_incomplete_format(self):
+        class NoParserFormat(PromptFormat):
+            def encode_item(self, index: int, value: str) -> str:
+                return value
+
+        with self.assertRaises(TypeError):
+            NoParserFormat()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import threading
+import time
+from dataclasses import dataclass
+
+from xcstrings import XCStrings, XCStringKeyPath
+
+@dataclass
+class ModelTier:
+    model: str
+    max_chars: int | None = None
+    concurrency: int = 4
+    requests_per_minute: float | None = None
+    comments: bool = True
+
+    @staticmethod
+    def from_spec(spec: str) -> 'ModelTier':
+        """
+        Parses 'model[:option=value,...]', e.g. 'gpt-4o-mini:max_chars=40,concurrency=8,rpm=500,comments=no'.
+        """
+        model, _, options = spec.partition(":")
+        if model == "":
+            raise ValueError(f'Model tier must start with a model name: {spec}')
+
+        tier = ModelTier(model)
+        for option in options.split(",") if options != "" else []:
+            name, _, value = option.partition("=")
+            name = name.strip()
+            value = value.strip()
+            try:
+                if name == "max_chars":
+                    tier.max_chars = int(value)
+                elif name == "concurrency":
+                    tier.concurrency = int(value)
+                elif name == "rpm":
+                    tier.requests_per_minute = float(value)
+                elif name == "comments":
+                    if value not in ["yes", "no"]:
+                        raise ValueError(value)
+                    tier.comments = value == "yes"
+                else:
+                    raise ValueError(f'Unknown model tier option: {name}')
+            except ValueError as e:
+                raise ValueError(f'Invalid model tier option {option} in {spec}: {e}')
+
+        if tier.concurrency < 1:
+            raise ValueError(f'Model tier concurrency must be positive: {spec}')
+
+        return tier
+
+class RateLimiter:
+    """
+    Token bucket shared by the workers of one tier. A minute's worth of requests may burst.
+    """
+    requests_per_minute: float
+
+    def __init__(self, requests_per_minute: float):
+        self.requests_per_minute = requests_per_minute
+        self._tokens = requests_per_minute
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            wait = self._take()
+            if wait == 0:
+                return
+            time.sleep(wait)
+
+    def try_acquire(self) -> bool:
+        return self._take() == 0
+
+    def _take(self) -> float:
+        """
+        Takes a token and returns 0, or returns the seconds until the next token is available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.requests_per_minute, self._tokens + (now - self._updated_at) * self.requests_per_minute / 60)
+            self._updated_at = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) * 60 / self.requests_per_minute
+
+class ModelRouter:
+    """
+    Sends each key to the cheapest tier that fits it and escalates it one tier per failed attempt.
+    Tiers are ordered from the cheapest to the strongest model.
+    """
+    tiers: list[ModelTier]
+    rate_limiters: list[RateLimiter | None]
+    escalation_failure_rate: float | None
+    min_samples: int
+
+    def __init__(self, tiers: list[ModelTier], escalation_failure_rate: float | None = 0.5, min_samples: int = 20):
+        if len(tiers) == 0:
+            raise ValueError('At least one model tier is required')
+
+        self.tiers = tiers
+        self.rate_limiters = [RateLimiter(tier.requests_per_minute) if tier.requests_per_minute is not None else None for tier in tiers]
+        self.escalation_failure_rate = escalation_failure_rate
+        self.min_samples = min_samples
+
+        self._succeeded = [0] * len(tiers)
+        self._failed = [0] * len(tiers)
+        self._lock = threading.Lock()
+
+    def route(self, xcstrings: XCStrings, key: XCStringKeyPath, attempt: int = 0) -> int:
+        length = self._length(xcstrings, key)
+        entry = xcstrings.strings.get(key.key, None)
+        has_comment = entry is not None and entry.comment is not None and entry.comment.strip() != ""
+
+        tier_index = len(self.tiers) - 1
+        for index, tier in enumerate(self.tiers):
+            if tier.max_chars is not None and length > tier.max_chars:
+                continue
+            if has_comment and not tier.comments:
+                continue
+            if self._is_failing(index):
+                continue
+            tier_index = index
+            break
+
+        return min(tier_index + attempt, len(self.tiers) - 1)
+
+    def record(self, tier_index: int, succeeded: int, failed: int) -> None:
+        with self._lock:
+            self._succeeded[tier_index] += succeeded
+            self._failed[tier_index] += failed
+
+    def failure_rate(self, tier_index: int) -> float | None:
+        with self._lock:
+            total = self._succeeded[tier_index] + self._failed[tier_index]
+            if total < self.min_samples:
+                return None
+            return self._failed[tier_index] / total
+
+    def _length(self, xcstrings: XCStrings, key: XCStringKeyPath) -> int:
+        if key.device is None and key.plural is None:
+            return len(xcstrings.get(key) or "")
+        if key.key not in xcstrings.strings:
+            return 0
+        # Variants of one key are routed by the longest, so that siblings travel in the same request
+        return max((len(xcstrings.get(variant) or "") for variant in xcstrings.list_keys(key=key.key, locale=key.locale)), default=0)
+
+    def _is_failing(self, tier_index: int) -> bool:
+        # The strongest tier takes everything that is left
+        if self.escalation_failure_rate is None or tier_index == len(self.tiers) - 1:
+            return False
+        failure_rate = self.failure_rate(tier_index)
+        return failure_rate is not None and failure_rate > self.escalation_failure_rate
@@ -0,0 +1,62 @@
+import unittest
+
+from routing import ModelTier, ModelRouter
+from xcstrings import XCStrings, XCStringKeyPath
+
+class TestModelRouter(unittest.TestCase):
+    def setUp(self):
+        self.xcstrings = XCStrings.from_dict({
+            "sourceLanguage": "en",
+            "version": "1.0",
+            "strings": {
+                "ok": { "localizations": { "en": { "stringUnit": { "state": "translated", "value": "OK" } } } },
+                "long": { "localizations": { "en": { "stringUnit": { "state": "translated", "value": "This sentence is too long for the small model" } } } },
+                "commented": { "comment": "Verb, not noun", "localizations": { "en": { "stringUnit": { "state": "translated", "value": "Record" } } } },
+                "items": { "localizations": { "en": { "variations": { "plural": {
+                    "one": { "stringUnit": { "state": "translated", "value": "One item" } },
+                    "other": { "stringUnit": { "state": "translated", "value": "%d items are waiting for review" } }
+                } } } } }
+            }
+        })
+        self.tiers = [
+            ModelTier.from_spec("small:max_chars=20,concurrency=8,rpm=500,comments=no"),
+            ModelTier.from_spec("large")
+        ]
+
+    def test_from_spec(self):
+        self.assertEqual(self.tiers[0], ModelTier("small", max_chars=20, concurrency=8, requests_per_minute=500, comments=False))
+        self.assertEqual(self.tiers[1], ModelTier("large"))
+
+        with self.assertRaises(ValueError):
+            ModelTier.from_spec("small:speed=fast")
+
+    def test_route_by_length_and_comment(self):
+        router = ModelRouter(self.tiers)
+
+        self.assertEqual(router.route(self.xcstrings, XCStringKeyPath("ok", "en")), 0)
+        self.assertEqual(router.route(self.xcstrings, XCStringKeyPath("long", "en")), 1)
+        self.assertEqual(router.route(self.xcstrings, XCStringKeyPath("commented", "en")), 1)
+
+    def test_route_variants_together(self):
+        router = ModelRouter(self.tiers)
+
+        # The short form goes with its long sibling
+        self.assertEqual(router.route(self.xcstrings, XCStringKeyPath("items", "en", plural="one")), 1)
+        self.assertEqual(router.route(self.xcstrings, XCStringKeyPath("items", "en", plural="few")), 1)
+        self.assertEqual(router.route(self.xcstrings, XCStringKeyPath("items", "en", plural="other")), 1)
+
+    def test_escalation(self):
+        router = ModelRouter(self.tiers, escalation_failure_rate=0.5, min_samples=10)
+        key = XCStringKeyPath("ok", "en")
+
+        self.assertEqual(router.route(self.xcstrings, key, attempt=1), 1)
+        self.assertEqual(router.route(self.xcstrings, key, attempt=5), 1)
+
+        router.record(0, succeeded=3, failed=4)
+        self.assertEqual(router.route(self.xcstrings, key), 0)
+
+        router.record(0, succeeded=0, failed=3)
+        self.assertEqual(router.route(self.xcstrings, key), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import zlib
+from dataclasses import dataclass, field
+from os import PathLike
+
+from prompt_builder import PromptBuilder, PromptBuilderConfig, StalePolicy
+from xcstrings import XCStrings, XCStringKeyPath
+
+SHARD_FORMAT_VERSION = 1
+
+def shard_index(key: str, count: int) -> int:
+    """
+    Stable across processes and machines, unlike hash(). All variants of a key land in the same shard.
+    """
+    return zlib.crc32(key.encode("utf-8")) % count
+
+def catalog_fingerprint(xcstrings: XCStrings) -> str:
+    return hashlib.sha256(xcstrings.to_json().encode("utf-8")).hexdigest()
+
+def pending_keys(xcstrings: XCStrings, source_locale: str, target_locale: str, stale_policy: StalePolicy = 'skip') -> list[XCStringKeyPath]:
+    """
+    Lists the source keys a translation run would send, in priority order.
+    """
+    prompt_builder = PromptBuilder(
+        xcstrings=xcstrings,
+        config=PromptBuilderConfig(
+            system_prompt="",
+            source_locale=source_locale,
+            source_device=None,
+            target_locale=target_locale,
+            batch_char_limit=0,
+            separator="\n",
+            stale_policy=stale_policy
+        )
+    )
+    return prompt_builder.keys
+
+@dataclass
+class Shard:
+    """
+    One unit of work: the source keys to translate and, once a worker is done, their translations.
+    """
+    index: int
+    count: int
+    source_locale: str
+    target_locale: str
+    catalog: str
+    keys: list[XCStringKeyPath]
+    translations: dict[XCStringKeyPath, str] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "version": SHARD_FORMAT_VERSION,
+            "shard": self.index,
+            "shards": self.count,
+            "sourceLocale": self.source_locale,
+            "targetLocale": self.target_locale,
+            "catalog": self.catalog,
+            "keys": [key.to_dict() for key in self.keys],
+            "translations": [{ **keypath.to_dict(), "translation": translation } for keypath, translation in self.translations.items()]
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def from_dict(data: dict) -> 'Shard':
+        if data.get("version", None) != SHARD_FORMAT_VERSION:
+            raise ValueError(f'Unsupported shard format version: {data.get("version", None)}')
+
+        index = data.get("shard", None)
+        count = data.get("shards", None)
+        if not isinstance(index, int) or not isinstance(count, int) or not 0 <= index < count:
+            raise ValueError('Shard must have a valid shard index and count')
+
+        source_locale = data.get("sourceLocale", None)
+        target_locale = data.get("targetLocale", None)
+        catalog = data.get("catalog", None)
+        if not isinstance(source_locale, str) or not isinstance(target_locale, str) or not isinstance(catalog, str):
+            raise ValueError('Shard must have source and target locales and a catalog fingerprint')
+
+        keys = [XCStringKeyPath.from_dict(key) for key in data.get("keys", [])]
+
+        translations: dict[XCStringKeyPath, str] = {}
+        for item in data.get("translations", []):
+            translation = item.get("translation", None)
+            if not isinstance(translation, str):
+                raise ValueError(f'Translation of {item.get("key", None)} must be a string')
+            translations[XCStringKeyPath.from_dict(item)] = translation
+
+        return Shard(index, count, source_locale, target_locale, catalog, keys, translations)
+
+    @staticmethod
+    def from_path(path: PathLike) -> 'Shard':
+        with open(path, 'r', encoding='utf-8') as f:
+            return Shard.from_dict(json.load(f))
+
+def plan_shards(xcstrings: XCStrings, keys: list[XCStringKeyPath], count: int, source_locale: str, target_locale: str) -> list[Shard]:
+    if count < 1:
+        raise ValueError('Shard count must be a positive integer')
+
+    catalog = catalog_fingerprint(xcstrings)
+    shards = [Shard(index, count, source_locale, target_locale, catalog, []) for index in range(count)]
+    for key in keys:
+        shards[shard_index(key.key, count)].keys.append(key)
+
+    return shards
+
+def merge_shards(xcstrings: XCStrings, shards: list[Shard]) -> int:
+    """
+    Applies the translations of all shards to the catalog they were planned from and returns their number.
+    Translations are applied in catalog order, so the result does not depend on the order the shards are given in.
+    """
+    if len(shards) == 0:
+        raise ValueError('No shard results to merge')
+
+    count = shards[0].count
+    catalog = catalog_fingerprint(xcstrings)
+    by_index: dict[int, Shard] = {}
+
+    for shard in shards:
+        if shard.count != count:
+            raise ValueError(f'Shard {shard.index} belongs to a split into {shard.count} shards, expected {count}')
+        if shard.catalog != catalog:
+            raise ValueError(f'Shard {shard.index} was planned from a different version of the catalog')
+        if (shard.source_locale, shard.target_locale) != (shards[0].source_locale, shards[0].target_locale):
+            raise ValueError(f'Shard {shard.index} translates {shard.source_locale} to {shard.target_locale}, expected {shards[0].source_locale} to {shards[0].target_locale}')
+        if shard.index in by_index:
+            raise ValueError(f'Shard {shard.index} is given more than once')
+        by_index[shard.index] = shard
+
+    missing = [str(index) for index in range(count) if index not in by_index]
+    if len(missing) > 0:
+        raise ValueError(f'Missing shard result(s): {", ".join(missing)}')
+
+    translations: dict[XCStringKeyPath, str] = {}
+    for shard in by_index.values():
+        for keypath, translation in shard.translations.items():
+            if shard_index(keypath.key, count) != shard.index:
+                raise ValueError(f'Shard {shard.index} contains {keypath.key}, which belongs to shard {shard_index(keypath.key, count)}')
+            translations[keypath] = translation
+
+    key_order = { key: position for position, key in enumerate(xcstrings.strings.keys()) }
+    ordered = sorted(translations.items(), key=lambda item: (
+        key_order.get(item[0].key, len(key_order)),
+        item[0].key,
+        item[0].device or "",
+        item[0].plural or ""
+    ))
+
+    for keypath, translation in ordered:
+        xcstrings.set(keypath, translation)
+
+    return len(ordered)
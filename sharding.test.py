@@ -0,0 +1,64 @@
+import itertools
+import unittest
+
+from sharding import Shard, merge_shards, pending_keys, plan_shards, shard_index
+from xcstrings import XCStrings
+
+def sample_catalog() -> XCStrings:
+    strings = {
+        f"key{i}": { "localizations": { "en": { "stringUnit": { "state": "translated", "value": f"Value {i}" } } } }
+        for i in range(20)
+    }
+    strings["items"] = { "localizations": { "en": { "variations": { "plural": {
+        "one": { "stringUnit": { "state": "translated", "value": "%lld item" } },
+        "other": { "stringUnit": { "state": "translated", "value": "%lld items" } }
+    } } } } }
+    return XCStrings.from_dict({ "sourceLanguage": "en", "version": "1.0", "strings": strings })
+
+def translate(shard: Shard) -> Shard:
+    result = Shard.from_dict(shard.to_dict())
+    result.translations = { key.with_locale(shard.target_locale): f"[{key.key}/{key.plural}]" for key in shard.keys }
+    return result
+
+class TestSharding(unittest.TestCase):
+    def test_plan_shards(self):
+        xcstrings = sample_catalog()
+        keys = pending_keys(xcstrings, "en", "ja")
+        shards = plan_shards(xcstrings, keys, 3, "en", "ja")
+
+        self.assertCountEqual([key for shard in shards for key in shard.keys], keys)
+        for shard in shards:
+            for key in shard.keys:
+                self.assertEqual(shard_index(key.key, 3), shard.index)
+
+        # Round trip through the file format
+        self.assertEqual(Shard.from_dict(shards[0].to_dict()), shards[0])
+
+    def test_merge_is_independent_of_order(self):
+        base = sample_catalog()
+        shards = [translate(shard) for shard in plan_shards(base, pending_keys(base, "en", "ja"), 3, "en", "ja")]
+
+        outputs = set()
+        for order in itertools.permutations(shards):
+            xcstrings = sample_catalog()
+            self.assertEqual(merge_shards(xcstrings, list(order)), 21)
+            outputs.add(xcstrings.to_json())
+
+        self.assertEqual(len(outputs), 1)
+
+    def test_merge_rejects_incomplete_or_stale_results(self):
+        base = sample_catalog()
+        shards = [translate(shard) for shard in plan_shards(base, pending_keys(base, "en", "ja"), 3, "en", "ja")]
+
+        with self.assertRaises(ValueError):
+            merge_shards(sample_catalog(), shards[:2])
+        with self.assertRaises(ValueError):
+            merge_shards(sample_catalog(), shards + [shards[0]])
+
+        changed = sample_catalog()
+        changed.strings.pop("key0")
+        with self.assertRaises(ValueError):
+            merge_shards(changed, shards)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+import json
+import re
+from json.decoder import scanstring
+
+class BulletStreamParser:
+    """
+    Incremental parser of the bullet point protocol ("- item" lines).
+    An item is complete once the next bullet starts, so completed items can be used
+    while the rest of the response is still streaming in.
+    """
+    separator: str
+
+    def __init__(self, separator: str = "\n- "):
+        self.separator = separator
+        self._buffer = ""
+        self._started = False
+
+    def feed(self, chunk: str) -> list[str]:
+        """
+        Adds a chunk of the response and returns the items completed by it.
+        """
+        self._buffer += chunk
+
+        if not self._started and not self._start():
+            return []
+
+        parts = self._buffer.split(self.separator)
+        self._buffer = parts[-1]
+        return [part.strip() for part in parts[:-1] if part.strip() != ""]
+
+    def finish(self) -> list[str]:
+        """
+        Returns the last item once the response is complete.
+        """
+        if not self._started:
+            self._start(final=True)
+
+        items = [part.strip() for part in self._buffer.split(self.separator)]
+        self._buffer = ""
+
+        if len(items) > 0 and items[-1].endswith("```"):
+            items[-1] = items[-1][:-3].strip()
+
+        return [item for item in items if item != ""]
+
+    def _start(self, final: bool = False) -> bool:
+        head = self._buffer.lstrip()
+
+        if not final and len(head) < 3 and "```".startswith(head):
+            # Might still become a code fence
+            return False
+
+        if head.startswith("```"):
+            if "\n" not in head:
+                if not final:
+                    return False
+                head = head[3:]
+            else:
+                # Drop the fence line, including a language tag
+                head = head[head.index("\n") + 1:]
+
+        self._buffer = "\n" + head.lstrip()
+        self._started = True
+        return True
+
+NUMBERED_LINE = re.compile(r"(\d+)[.)](?: |$)(.*)")
+
+class NumberedStreamParser:
+    """
+    Incremental parser of numbered lines ("1. item"). An item is complete once the next number starts;
+    lines in between continue it. Text before the first item is ignored, numbers out of order raise ValueError.
+    """
+    def __init__(self):
+        self._buffer = ""
+        self._current: list[str] | None = None
+        self._expected = 1
+
+    def feed(self, chunk: str) -> list[str]:
+        self._buffer += chunk
+        lines = self._buffer.split("\n")
+        self._buffer = lines[-1]
+
+        items: list[str] = []
+        for line in lines[:-1]:
+            items += self._line(line)
+        return items
+
+    def finish(self) -> list[str]:
+        items = self._line(self._buffer) if self._buffer != "" else []
+        self._buffer = ""
+
+        if self._current is not None:
+            while len(self._current) > 1 and self._current[-1].strip() in ["", "```"]:
+                self._current.pop()
+            items += self._complete()
+        return items
+
+    def _line(self, line: str) -> list[str]:
+        line = line.rstrip("\r")
+        match = NUMBERED_LINE.fullmatch(line.lstrip())
+        if match is not None:
+            number = int(match.group(1))
+            if number != self._expected:
+                raise ValueError(f"Item {number} where item {self._expected} was expected")
+            items = self._complete()
+            self._current = [match.group(2)]
+            self._expected += 1
+            return items
+
+        if self._current is not None:
+            self._current.append(line)
+        return []
+
+    def _complete(self) -> list[str]:
+        if self._current is None:
+            return []
+        item = "\n".join(self._current).strip()
+        self._current = None
+        return [item]
+
+class JSONArrayStreamParser:
+    """
+    Incremental parser of a JSON array of strings. Each string is complete as soon as its closing quote arrives.
+    Text around the array (e.g. a code fence) is ignored; anything else inside it raises ValueError.
+    """
+    def __init__(self):
+        self._buffer = ""
+        self._position = 0
+        self._started = False
+        self._finished = False
+
+    def feed(self, chunk: str) -> list[str]:
+        self._buffer += chunk
+        return self._scan(final=False)
+
+    def finish(self) -> list[str]:
+        items = self._scan(final=True)
+        if not self._finished:
+            raise ValueError("The JSON array is not closed")
+        return items
+
+    def _scan(self, final: bool) -> list[str]:
+        items: list[str] = []
+
+        if not self._started:
+            start = self._buffer.find("[")
+            if start < 0:
+                return items
+            self._position = start + 1
+            self._started = True
+
+        while not self._finished:
+            while self._position < len(self._buffer) and self._buffer[self._position] in " \t\r\n,":
+                self._position += 1
+            if self._position >= len(self._buffer):
+                break
+
+            char = self._buffer[self._position]
+            if char == "]":
+                self._finished = True
+            elif char == '"':
+                try:
+                    # Lenient about raw line breaks inside strings, which models do write
+                    item, end = scanstring(self._buffer, self._position + 1, False)
+                except json.JSONDecodeError:
+                    if final:
+                        raise ValueError("Unterminated string in the JSON array")
+                    break
+                items.append(item)
+                self._position = end
+            else:
+                raise ValueError(f"Unexpected {char!r} in the JSON array")
+
+        # Drop what has been consumed
+        self._buffer = self._buffer[self._position:]
+        self._position = 0
+        return items
+
+XML_ITEM = re.compile(r'<s i="(\d+)">(.*?)</s>', re.DOTALL)
+
+class XMLStreamParser:
+    """
+    Incremental parser of `<s i="1">item</s>` elements. An item is complete once its closing tag arrives.
+    Text between elements is ignored, indices out of order raise ValueError. Items are returned still escaped.
+    """
+    def __init__(self):
+        self._buffer = ""
+        self._expected = 1
+
+    def feed(self, chunk: str) -> list[str]:
+        self._buffer += chunk
+
+        items: list[str] = []
+        while (match := XML_ITEM.search(self._buffer)) is not None:
+            index = int(match.group(1))
+            if index != self._expected:
+                raise ValueError(f"Item {index} where item {self._expected} was expected")
+            items.append(match.group(2))
+            self._expected += 1
+            self._buffer = self._buffer[match.end():]
+        return items
+
+    def finish(self) -> list[str]:
+        items = self.feed("")
+        if "<s " in self._buffer:
+            raise ValueError("Unterminated item")
+        self._buffer = ""
+        return items
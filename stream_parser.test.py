@@ -0,0 +1,78 @@
+import unittest
+
+from stream_parser import BulletStreamParser, JSONArrayStreamParser, NumberedStreamParser, XMLStreamParser
+
+class TestBulletStreamParser(unittest.TestCase):
+    def parse_chunked(self, content: str, size: int) -> list[str]:
+        parser = BulletStreamParser()
+        items: list[str] = []
+        for i in range(0, len(content), size):
+            items += parser.feed(content[i:i + size])
+        return items + parser.finish()
+
+    def test_items_complete_when_next_bullet_starts(self):
+        parser = BulletStreamParser()
+
+        self.assertEqual(parser.feed("- アプリへ"), [])
+        self.assertEqual(parser.feed("ようこそ\n"), [])
+        self.assertEqual(parser.feed("- すべて"), ["アプリへようこそ"])
+        self.assertEqual(parser.finish(), ["すべて"])
+
+    def test_chunking_does_not_matter(self):
+        content = "```markdown\n- One\n- Two\nlines\n- Three\n```"
+        for size in [1, 2, 3, 7, len(content)]:
+            self.assertEqual(self.parse_chunked(content, size), ["One", "Two\nlines", "Three"])
+
+    def test_without_bullets(self):
+        self.assertEqual(self.parse_chunked("Only text", 2), ["Only text"])
+        self.assertEqual(self.parse_chunked("", 1), [])
+
+def parse_chunked(parser, content: str, size: int) -> list[str]:
+    items: list[str] = []
+    for i in range(0, len(content), size):
+        items += parser.feed(content[i:i + size])
+    return items + parser.finish()
+
+class TestNumberedStreamParser(unittest.TestCase):
+    def test_chunking_does_not_matter(self):
+        content = "Here you go:\n```\n1. One\n2. Two\nlines\n\n3. 3. Three\n```"
+        for size in [1, 2, 5, len(content)]:
+            self.assertEqual(parse_chunked(NumberedStreamParser(), content, size), ["One", "Two\nlines", "3. Three"])
+
+    def test_out_of_order(self):
+        with self.assertRaises(ValueError):
+            parse_chunked(NumberedStreamParser(), "1. One\n3. Three", 4)
+
+class TestJSONArrayStreamParser(unittest.TestCase):
+    def test_items_complete_when_string_closes(self):
+        parser = JSONArrayStreamParser()
+        self.assertEqual(parser.feed('```json\n["On'), [])
+        self.assertEqual(parser.feed('e", "T\\u00e9'), ["One"])
+        self.assertEqual(parser.feed('", "Line\nbreak"]\n```'), ["Té", "Line\nbreak"])
+        self.assertEqual(parser.finish(), [])
+
+    def test_chunking_does_not_matter(self):
+        content = '[\n"One",\n"Quote \\" and \\\\",\n"Three"\n]'
+        for size in [1, 2, 5, len(content)]:
+            self.assertEqual(parse_chunked(JSONArrayStreamParser(), content, size), ["One", 'Quote " and \\', "Three"])
+
+    def test_malformed(self):
+        with self.assertRaises(ValueError):
+            parse_chunked(JSONArrayStreamParser(), '["One", Two]', 3)
+        with self.assertRaises(ValueError):
+            parse_chunked(JSONArrayStreamParser(), '["One", "Tw', 3)
+
+class TestXMLStreamParser(unittest.TestCase):
+    def test_chunking_does_not_matter(self):
+        content = '<s i="1">One</s>\n<s i="2">&lt;b&gt;Two&lt;/b&gt;\nlines</s>'
+        for size in [1, 3, len(content)]:
+            self.assertEqual(parse_chunked(XMLStreamParser(), content, size), ["One", "&lt;b&gt;Two&lt;/b&gt;\nlines"])
+
+    def test_malformed(self):
+        with self.assertRaises(ValueError):
+            parse_chunked(XMLStreamParser(), '<s i="2">Two</s>', 3)
+        with self.assertRaises(ValueError):
+            parse_chunked(XMLStreamParser(), '<s i="1">One', 3)
+
+if __name__ == '__main__':
+    unittest.main()
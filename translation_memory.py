@@ -0,0 +1,45 @@
+from xcstrings import XCStrings, XCStringUnit
+
+class TranslationMemory:
+    entries: dict[tuple[str, str, str], str]
+
+    def __init__(self):
+        self.entries = {}
+
+    def lookup(self, source_locale: str, target_locale: str, source: str) -> str | None:
+        return self.entries.get((source_locale, target_locale, source), None)
+
+    def insert(self, source_locale: str, target_locale: str, source: str, target: str) -> None:
+        self.entries[(source_locale, target_locale, source)] = target
+
+    def remove(self, source_locale: str, target_locale: str, source: str) -> None:
+        self.entries.pop((source_locale, target_locale, source), None)
+
+    def prefetch(self, source_locale: str, target_locale: str, sources: list[str]) -> None:
+        """
+        Called with every source string of a run before it is planned; a shared memory fetches them in one go.
+        """
+        pass
+
+    def flush(self) -> None:
+        """
+        Called after each batch; a shared memory sends the translations added since.
+        """
+        pass
+
+    def seed(self, xcstrings: XCStrings, source_locale: str, target_locale: str) -> None:
+        """
+        Registers every translated plain string unit of the catalog, so that identical
+        source strings elsewhere are reused instead of being sent to the model again.
+        """
+        for entry in xcstrings.strings.values():
+            source = entry.localizations.get(source_locale, None)
+            target = entry.localizations.get(target_locale, None)
+            if not isinstance(source, XCStringUnit) or not isinstance(target, XCStringUnit):
+                continue
+            if target.state != 'translated':
+                continue
+            self.insert(source_locale, target_locale, source.value, target.value)
+
+    def __len__(self) -> int:
+        return len(self.entries)
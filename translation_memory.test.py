@@ -0,0 +1,45 @@
+import unittest
+
+from translation_memory import TranslationMemory
+from xcstrings import XCStrings
+
+def unit(value: str, state: str = "translated") -> dict:
+    return { "stringUnit": { "state": state, "value": value } }
+
+class TestTranslationMemory(unittest.TestCase):
+    def test_insert_lookup_remove(self):
+        memory = TranslationMemory()
+        memory.insert("en", "ja", "Hello", "こんにちは")
+
+        self.assertEqual(memory.lookup("en", "ja", "Hello"), "こんにちは")
+        self.assertIsNone(memory.lookup("en", "de", "Hello"))
+        self.assertIsNone(memory.lookup("en", "ja", "hello"))
+
+        memory.insert("en", "ja", "Hello", "やあ")
+        self.assertEqual(memory.lookup("en", "ja", "Hello"), "やあ")
+        self.assertEqual(len(memory), 1)
+
+        memory.remove("en", "ja", "Hello")
+        memory.remove("en", "ja", "Missing")
+        self.assertIsNone(memory.lookup("en", "ja", "Hello"))
+        self.assertEqual(len(memory), 0)
+
+    def test_seed(self):
+        xcstrings = XCStrings.from_dict({ "sourceLanguage": "en", "version": "1.0", "strings": {
+            "hello": { "localizations": { "en": unit("Hello"), "ja": unit("こんにちは") } },
+            "review": { "localizations": { "en": unit("Review"), "ja": unit("レビュー", "needs_review") } },
+            "items": { "localizations": {
+                "en": { "variations": { "plural": { "other": unit("%lld items") } } },
+                "ja": { "variations": { "plural": { "other": unit("%lld 個") } } }
+            } },
+            "untranslated": { "localizations": { "en": unit("Untranslated") } }
+        } })
+
+        memory = TranslationMemory()
+        memory.seed(xcstrings, "en", "ja")
+
+        # Only translated plain string units
+        self.assertEqual(memory.entries, { ("en", "ja", "Hello"): "こんにちは" })
+
+if __name__ == '__main__':
+    unittest.main()
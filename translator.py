@@ -1,12 +1,30 @@
 import openai
-from dataclasses import dataclass
+import httpx
+import threading
+import textwrap
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
 from xcstrings import XCStrings, XCStringKeyPath
-from prompt_builder import PromptBuilderConfig, PromptBuilder, PromptBulderIterator
+from prompt_builder import PromptBuilderConfig, PromptBuilder, PromptBulderIterator, PromptBatch, StalePolicy
+from pathlib import Path
+from client import ClientConfig, create_client
+from locale_registry import LocaleRegistry
+from translation_memory import TranslationMemory
+from fuzzy_memory import FuzzyIndex
+from glossary import Glossary
+from journal import TranslationJournal
+from stream_parser import BulletStreamParser
+from prompt_format import PromptFormat, get_prompt_format
+from routing import ModelTier, ModelRouter
+from hedging import LatencyTracker
+from validation import mask_placeholders, restore_placeholders, validate_translation
+from budget import Budget, ModelPrice, estimate_tokens
 from util.logger import Logger
-import pandas as pd
-import json
 from tqdm import tqdm
 
+SAMPLE_SOURCES = ["Welcome to App", "Select All"]
+
 @dataclass
 class TranslatorConfig:
     api_key: str
@@ -15,6 +33,25 @@ class TranslatorConfig:
     target_locale: str
     batch_char_limit: int
     retry_limit: int = 3
+    concurrency: int = 4
+    client: ClientConfig = field(default_factory=ClientConfig)
+    locale_support_directories: list[Path] = field(default_factory=list)
+    fuzzy_hint_limit: int = 3
+    fuzzy_hint_threshold: float = 0.6
+    fuzzy_reuse_threshold: float | None = None
+    validate: bool = True
+    mask_placeholders: bool = True
+    stale_policy: StalePolicy = 'skip'
+    stream: bool = True
+    stall_timeout: float = 30.0
+    tiers: list[ModelTier] = field(default_factory=list)
+    escalation_failure_rate: float | None = 0.5
+    hedge_percentile: float | None = None
+    hedge_min_samples: int = 5
+    prompt_format: str = 'bullets'
+    max_tokens_total: int | None = None
+    max_cost: float | None = None
+    prices: dict[str, ModelPrice] = field(default_factory=dict)
 
 @dataclass
 class TranslationResult:
@@ -22,19 +59,92 @@ class TranslationResult:
     target_keypath: XCStringKeyPath
     translation: str
 
+@dataclass
+class BatchOutcome:
+    translations: list[TranslationResult]
+    failed_keys: list[XCStringKeyPath]
+    # The translations were journaled as they arrived
+    journaled: bool = False
+
+class TranslationStats:
+    requests: int
+    translated: int
+    reused: int
+    hedged: int
+    hedges_won: int
+    # Keys never sent because the budget ran out
+    unsent: int
+
+    def __init__(self):
+        self.requests = 0
+        self.translated = 0
+        self.reused = 0
+        self.hedged = 0
+        self.hedges_won = 0
+        self.unsent = 0
+        self._lock = threading.Lock()
+
+    def add(self, **counts: int):
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    def summary(self) -> str:
+        summary = f"Translated {self.translated} string(s) with {self.requests} request(s), reused {self.reused}."
+        if self.hedged > 0:
+            summary += f" Hedged {self.hedged} slow request(s), {self.hedges_won} won by the duplicate."
+        return summary
+
 class Translator:
     config: TranslatorConfig
     logger: Logger
+    memory: TranslationMemory
+    client: openai.OpenAI
+    locale_registry: LocaleRegistry
+    glossary: Glossary | None
+    journal: TranslationJournal | None
+    router: ModelRouter
+    prompt_format: PromptFormat
+    budget: Budget
 
-    def __init__(self, config: TranslatorConfig, logger: Logger):
+    def __init__(self, config: TranslatorConfig, logger: Logger, memory: TranslationMemory | None = None, client: openai.OpenAI | None = None, locale_registry: LocaleRegistry | None = None, glossary: Glossary | None = None, journal: TranslationJournal | None = None):
         self.config = config
         self.logger = logger
+        self.glossary = glossary
+        self.journal = journal
+        self.memory = memory if memory is not None else TranslationMemory()
+        self.locale_registry = locale_registry if locale_registry is not None else LocaleRegistry.shared(config.locale_support_directories)
+        self.prompt_format = get_prompt_format(config.prompt_format)
+        self._system_prompts: dict[str, str] = {}
 
-        openai.OpenAI(
-            api_key=config.api_key
-        )
+        # Without tiers every batch goes to the single model
+        tiers = config.tiers if len(config.tiers) > 0 else [ModelTier(config.model, concurrency=config.concurrency)]
+        self.router = ModelRouter(tiers, escalation_failure_rate=config.escalation_failure_rate)
+
+        self._latencies: list[LatencyTracker] | None = None
+        if config.hedge_percentile is not None:
+            self._latencies = [LatencyTracker(config.hedge_percentile, config.hedge_min_samples) for _ in tiers]
+        self.stats = TranslationStats()
+
+        # The budget covers the translator's lifetime, e.g. every pass of watch mode
+        self.budget = Budget(config.max_tokens_total, config.max_cost, config.prices)
+        self.budget.check_models([tier.model for tier in tiers])
+
+        # A client passed in is shared with other translators and owned by the caller
+        self._owns_client = client is None
+        self.client = client if client is not None else create_client(config.api_key, config.client)
+
+    def close(self):
+        if self._owns_client:
+            self.client.close()
+
+    def __enter__(self) -> 'Translator':
+        return self
 
-    def translate(self, xcstrings: XCStrings):
+    def __exit__(self, *args):
+        self.close()
+
+    def translate(self, xcstrings: XCStrings, keys: list[XCStringKeyPath] | None = None):
         prompt_builder = PromptBuilder(
             xcstrings=xcstrings,
             config=PromptBuilderConfig(
@@ -43,68 +153,428 @@ class Translator:
                 source_device=None,
                 target_locale=self.config.target_locale,
                 batch_char_limit=self.config.batch_char_limit,
-                separator="\n",
-                prefix="- "
-            )
+                separator=self.prompt_format.separator,
+                value_transform=self._mask_value if self.config.mask_placeholders else None,
+                stale_policy=self.config.stale_policy,
+                prompt_format=self.prompt_format
+            ),
+            keys=keys
         )
 
-        translations: list[TranslationResult] = []
+        self.stats = TranslationStats()
+        sources = [xcstrings.get(key) for key in prompt_builder.keys if key.plural is None]
+        self.memory.prefetch(self.config.source_locale, self.config.target_locale, [source for source in sources if source is not None])
+        fuzzy_index = self._build_fuzzy_index(xcstrings)
+        translations = self._translate_from_memory(xcstrings, prompt_builder, fuzzy_index)
+        self.stats.add(reused=len(translations))
+
+        attempts: dict[XCStringKeyPath, int] = {}
+        failed_keys: list[XCStringKeyPath] = []
+
+        tier_keys: list[list[XCStringKeyPath]] = [[] for _ in self.router.tiers]
+        for key in prompt_builder.keys:
+            tier_keys[self.router.route(xcstrings, key)].append(key)
 
         with tqdm(total=len(prompt_builder.keys)) as pbar:
-            for message_batch in prompt_builder:
-                # print([key.key for key in message_batch.keys])
-                
-                successed = False
-                for i in range(self.config.retry_limit):
-                    response = openai.chat.completions.create(
-                        model=self.config.model,
-                        messages=message_batch.messages
-                    )
-                    content = response.choices[0].message.content
-                    if content is None:
-                        continue
+            queues = [PromptBulderIterator(xcstrings, keys, prompt_builder.config) for keys in tier_keys]
+            in_flight: dict[Future[BatchOutcome], int] = {}
+            in_flight_counts = [0] * len(self.router.tiers)
+
+            workers = sum(tier.concurrency for tier in self.router.tiers)
+            with ThreadPoolExecutor(max_workers=workers) as executor, ThreadPoolExecutor(max_workers=workers * 2) as hedge_executor:
+                self._hedge_executor = hedge_executor
+                while True:
+                    # Once the budget is used up no new batch starts, the ones in flight finish
+                    exhausted = self.budget.exhausted()
+                    for tier_index, tier in enumerate(self.router.tiers):
+                        while not exhausted and in_flight_counts[tier_index] < tier.concurrency:
+                            message_batch = next(queues[tier_index], None)
+                            if message_batch is None:
+                                break
+                            self._add_fuzzy_hints(xcstrings, message_batch, fuzzy_index)
+                            self._add_glossary_terms(xcstrings, message_batch)
+                            in_flight[executor.submit(self._translate_batch, xcstrings, message_batch, tier_index)] = tier_index
+                            in_flight_counts[tier_index] += 1
+
+                    if len(in_flight) == 0:
+                        break
+
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        tier_index = in_flight.pop(future)
+                        in_flight_counts[tier_index] -= 1
+                        outcome = future.result()
+                        # Only the translations of accepted batches reach a shared memory, sent from this thread
+                        self._commit(xcstrings, outcome)
+                        self.memory.flush()
+                        translations.extend(outcome.translations)
+                        self.stats.add(translated=len(outcome.translations))
+                        pbar.update(len(outcome.translations))
+                        self.router.record(tier_index, len(outcome.translations), len(outcome.failed_keys))
+
+                        # Only the broken items go back into the queue, one tier up; they are picked up by the next batch
+                        for key in outcome.failed_keys:
+                            attempts[key] = attempts.get(key, 0) + 1
+                            if attempts[key] < self.config.retry_limit:
+                                queues[self.router.route(xcstrings, key, attempts[key])].keys.append(key)
+                            else:
+                                failed_keys.append(key)
+                                pbar.update(1)
+
+            self.stats.add(unsent=sum(len(queue.keys) for queue in queues))
+
+        self.memory.flush()
+
+        if self.stats.unsent > 0:
+            self.logger.warn(f"Budget exhausted, stopped with {self.stats.unsent} key(s) not translated.")
+
+        if len(failed_keys) > 0:
+            self.logger.error(f"Failed to translate {len(failed_keys)} key(s) after {self.config.retry_limit} attempts: {', '.join(key.key for key in failed_keys)}")
+
+        self.logger.info(self.stats.summary())
+        self.logger.info(self.budget.report())
+
+        return translations
+
+    def _translate_batch(self, xcstrings: XCStrings, message_batch: PromptBatch, tier_index: int) -> BatchOutcome:
+        rate_limiter = self.router.rate_limiters[tier_index]
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+
+        latency = self._latencies[tier_index] if self._latencies is not None else None
+        threshold = latency.threshold() if latency is not None else None
+        if threshold is None:
+            return self._timed_attempt(xcstrings, message_batch, tier_index, journal=True)
+
+        return self._translate_batch_hedged(xcstrings, message_batch, tier_index, threshold)
+
+    def _translate_batch_hedged(self, xcstrings: XCStrings, message_batch: PromptBatch, tier_index: int, threshold: float) -> BatchOutcome:
+        """
+        Sends a duplicate of a batch that is slower than the latency percentile,
+        takes the first response that translated anything and cancels the other.
+        """
+        cancels = [threading.Event(), threading.Event()]
+        primary = self._hedge_executor.submit(self._timed_attempt, xcstrings, message_batch, tier_index, cancels[0])
+
+        done, _ = wait([primary], timeout=threshold)
+        if len(done) > 0:
+            return primary.result()
+
+        # The duplicate counts against the tier's rate limit, and is skipped if the budget is used up
+        if self.budget.exhausted():
+            return primary.result()
+        rate_limiter = self.router.rate_limiters[tier_index]
+        if rate_limiter is not None and not rate_limiter.try_acquire():
+            return primary.result()
+
+        self.stats.add(hedged=1)
+        hedge = self._hedge_executor.submit(self._timed_attempt, xcstrings, message_batch, tier_index, cancels[1])
+        attempts = { primary: 0, hedge: 1 }
+
+        pending: set[Future[BatchOutcome]] = set(attempts)
+        fallback: BatchOutcome | None = None
+        error: Exception | None = None
+
+        while len(pending) > 0:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+
+                if len(outcome.translations) == 0:
+                    fallback = outcome
+                    continue
+
+                for other, index in attempts.items():
+                    if other is not future:
+                        cancels[index].set()
+                if attempts[future] == 1:
+                    self.stats.add(hedges_won=1)
+                return outcome
+
+        if fallback is not None:
+            return fallback
+        raise error if error is not None else Exception("Hedged request failed.")
+
+    def _timed_attempt(self, xcstrings: XCStrings, message_batch: PromptBatch, tier_index: int, cancel: threading.Event | None = None, journal: bool = False) -> BatchOutcome:
+        started_at = time.monotonic()
+        outcome = self._attempt(xcstrings, message_batch, self.router.tiers[tier_index].model, cancel, journal)
+
+        cancelled = cancel is not None and cancel.is_set()
+        if self._latencies is not None and not cancelled and len(outcome.translations) > 0:
+            self._latencies[tier_index].record(time.monotonic() - started_at)
+
+        return outcome
+
+    def _attempt(self, xcstrings: XCStrings, message_batch: PromptBatch, model: str, cancel: threading.Event | None = None, journal: bool = False) -> BatchOutcome:
+        self.stats.add(requests=1)
+
+        if self.config.stream:
+            return self._translate_batch_streaming(xcstrings, message_batch, model, cancel, journal)
 
-                    contents = self.parse_translation_content(content)
-                    
-                    if not len(contents) == len(message_batch.keys):
-                        self.logger.warn(f"Number of translations does not match the number of keys. Retrying... (Attempt {i+1}/{self.config.retry_limit})")
+        try:
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=message_batch.messages
+            )
+        except openai.APIError as e:
+            self.logger.warn(f"Request failed ({e}). Re-queueing {len(message_batch.keys)} keys...")
+            return BatchOutcome([], list(message_batch.keys))
+        content = response.choices[0].message.content
+        self._record_usage(model, message_batch, response.usage, content or "")
+        if content is None:
+            self.logger.warn(f"Empty response. Re-queueing {len(message_batch.keys)} keys...")
+            return BatchOutcome([], list(message_batch.keys))
+
+        try:
+            contents = self.parse_translation_content(content)
+        except ValueError as e:
+            self.logger.warn(f"Could not parse the response ({e}). Re-queueing {len(message_batch.keys)} keys...")
+            return BatchOutcome([], list(message_batch.keys))
+
+        if not len(contents) == len(message_batch.keys):
+            self.logger.warn(f"Number of translations does not match the number of keys. Re-queueing {len(message_batch.keys)} keys...")
+            return BatchOutcome([], list(message_batch.keys))
+
+        outcome = BatchOutcome([], [])
+        for source_key, translation in zip(message_batch.keys, contents):
+            self._accept_translation(xcstrings, source_key, translation, outcome)
+
+        return outcome
+
+    def _translate_batch_streaming(self, xcstrings: XCStrings, message_batch: PromptBatch, model: str, cancel: threading.Event | None = None, journal: bool = False) -> BatchOutcome:
+        """
+        Accepts each item as soon as the next bullet starts. After a stall only
+        the unfinished remainder of the batch is re-queued. A cancelled stream stops
+        at the next chunk and returns what it has.
+
+        With `journal`, accepted items are journaled right away, and withdrawn again
+        if the stream turns out to be misaligned. Hedged attempts leave it to the winner.
+        """
+        keys = message_batch.keys
+        parser = self.prompt_format.parser()
+        journal = journal and self.journal is not None
+        outcome = BatchOutcome([], [], journaled=journal)
+        received = 0
+        # The usage comes with the last chunk; a stream cut short is estimated from what arrived
+        usage = None
+        streamed: list[str] = []
+
+        def accept(items: list[str]) -> bool:
+            nonlocal received
+            for item in items:
+                if received >= len(keys):
+                    return False
+                accepted = len(outcome.translations)
+                self._accept_translation(xcstrings, keys[received], item, outcome)
+                if journal and len(outcome.translations) > accepted:
+                    result = outcome.translations[-1]
+                    self.journal.record(result.target_keypath, result.translation) # type: ignore
+                received += 1
+            return True
+
+        aligned = True
+        try:
+            stream = self.client.chat.completions.create(
+                model=model,
+                messages=message_batch.messages,
+                stream=True,
+                stream_options={ "include_usage": True },
+                timeout=httpx.Timeout(self.config.client.timeout, read=self.config.stall_timeout, connect=self.config.client.connect_timeout)
+            )
+            try:
+                for chunk in stream:
+                    if cancel is not None and cancel.is_set():
+                        outcome.failed_keys.extend(keys[received:])
+                        return outcome
+                    if chunk.usage is not None:
+                        usage = chunk.usage
+                    if len(chunk.choices) == 0 or chunk.choices[0].delta.content is None:
                         continue
-                    
-                    for source_key, translation in zip(message_batch.keys, contents):
-                        target_key = source_key.with_locale(self.config.target_locale)
-                        translations.append(TranslationResult(
-                            source_keypath=source_key,
-                            target_keypath=target_key,
-                            translation=translation
-                        ))
-                        successed = True
-                    
-                    if successed:
+                    streamed.append(chunk.choices[0].delta.content)
+                    aligned = accept(parser.feed(chunk.choices[0].delta.content))
+                    if not aligned:
                         break
-                
-                if not successed:
-                    raise Exception("Failed to translate keys after retrying.")
-                
-                pbar.update(len(message_batch.keys))
+            finally:
+                stream.close()
+                self._record_usage(model, message_batch, usage, "".join(streamed))
+
+            if aligned:
+                aligned = accept(parser.finish())
+        except ValueError as e:
+            self.logger.debug(f"Could not parse the response: {e}")
+            aligned = False
+        except openai.APIError as e:
+            # A stall, a dropped connection or an error status mid-stream
+            self.logger.warn(f"Stream failed after {received}/{len(keys)} items ({e}). Re-queueing the rest...")
+            outcome.failed_keys.extend(keys[received:])
+            return outcome
+
+        if not aligned or received != len(keys):
+            # The items cannot be matched to the keys, none of them is kept
+            self.logger.warn(f"Number of translations does not match the number of keys. Re-queueing {len(keys)} keys...")
+            if journal:
+                self.journal.discard([result.target_keypath for result in outcome.translations]) # type: ignore
+            return BatchOutcome([], list(keys))
+
+        return outcome
+
+    def _record_usage(self, model: str, message_batch: PromptBatch, usage, content: str):
+        if usage is not None:
+            self.budget.record(model, usage.prompt_tokens, usage.completion_tokens)
+            return
+        prompt = "".join(str(message["content"]) for message in message_batch.messages)
+        self.budget.record(model, estimate_tokens(prompt), estimate_tokens(content), estimated=True)
+
+    def _accept_translation(self, xcstrings: XCStrings, source_key: XCStringKeyPath, translation: str, outcome: BatchOutcome):
+        source = xcstrings.get(source_key)
+        if source is not None:
+            checked = self._check_translation(source_key, source, translation)
+            if checked is None:
+                outcome.failed_keys.append(source_key)
+                return
+            translation = checked
+            self._check_glossary(source_key, source, translation)
+
+        outcome.translations.append(TranslationResult(
+            source_keypath=source_key,
+            target_keypath=source_key.with_locale(self.config.target_locale),
+            translation=translation
+        ))
+
+    def _commit(self, xcstrings: XCStrings, outcome: BatchOutcome):
+        """
+        Stores the translations of a finished batch. Attempts only fill their own outcome,
+        so the loser of a hedge race or a misaligned stream leaves nothing behind.
+        """
+        for result in outcome.translations:
+            source = xcstrings.get(result.source_keypath)
+            if source is not None and result.source_keypath.plural is None:
+                self.memory.insert(self.config.source_locale, self.config.target_locale, source, result.translation)
+            if self.journal is not None and not outcome.journaled:
+                self.journal.record(result.target_keypath, result.translation)
+
+    def _mask_value(self, value: str) -> str:
+        masked, _ = mask_placeholders(value)
+        return masked
 
+    def _check_translation(self, source_key: XCStringKeyPath, source: str, translation: str) -> str | None:
+        """
+        Restores the masked placeholders and validates the translation against its source.
+        Returns None when the item has to be translated again.
+        """
+        if self.config.mask_placeholders:
+            _, placeholders = mask_placeholders(source)
+            restored = restore_placeholders(translation, placeholders)
+            if restored is None:
+                self.logger.warn(f"Placeholders lost in '{source_key.key}': {translation}")
+                return None
+            translation = restored
+
+        if self.config.validate:
+            errors = validate_translation(source, translation)
+            if len(errors) > 0:
+                self.logger.warn(f"Invalid translation of '{source_key.key}' ({'; '.join(errors)}): {translation}")
+                return None
+
+        return translation
+
+    def _translate_from_memory(self, xcstrings: XCStrings, prompt_builder: PromptBuilder, fuzzy_index: FuzzyIndex) -> list[TranslationResult]:
+        translations: list[TranslationResult] = []
+        remaining_keys: list[XCStringKeyPath] = []
+
+        for source_key in prompt_builder.keys:
+            source = xcstrings.get(source_key)
+            translation = self.journal.entries.get(source_key.with_locale(self.config.target_locale), None) if self.journal is not None else None
+            # The text of a plural form alone does not tell which category its translation is for
+            reusable = source is not None and source_key.plural is None
+            if translation is None and reusable:
+                translation = self.memory.lookup(self.config.source_locale, self.config.target_locale, source) # type: ignore
+            if translation is None and reusable and self.config.fuzzy_reuse_threshold is not None:
+                matches = fuzzy_index.search(source, limit=1, threshold=self.config.fuzzy_reuse_threshold)
+                if len(matches) > 0:
+                    # The match translates another string, e.g. with other format specifiers
+                    errors = validate_translation(source, matches[0].target) # type: ignore
+                    if len(errors) == 0:
+                        translation = matches[0].target
+                    else:
+                        self.logger.debug(f"Not reusing the translation of '{matches[0].source}' for '{source_key.key}' ({'; '.join(errors)}).")
+            if translation is None:
+                remaining_keys.append(source_key)
+                continue
+            translations.append(TranslationResult(
+                source_keypath=source_key,
+                target_keypath=source_key.with_locale(self.config.target_locale),
+                translation=translation
+            ))
+
+        if len(translations) > 0:
+            self.logger.debug(f"Reused {len(translations)} translations from memory.")
+
+        prompt_builder.keys = remaining_keys
         return translations
 
+    def _build_fuzzy_index(self, xcstrings: XCStrings) -> FuzzyIndex:
+        fuzzy_index = FuzzyIndex()
+        if self.config.fuzzy_hint_limit <= 0 and self.config.fuzzy_reuse_threshold is None:
+            return fuzzy_index
 
-    def parse_translation_content(self, content: str) -> list[str]:
-        if content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
+        fuzzy_index.add_catalog(xcstrings, self.config.source_locale, self.config.target_locale)
+        fuzzy_index.add_memory(self.memory, self.config.source_locale, self.config.target_locale)
+        return fuzzy_index
 
-        content = content.strip()
-        content = "\n" + content + "\n"
+    def _add_fuzzy_hints(self, xcstrings: XCStrings, message_batch: PromptBatch, fuzzy_index: FuzzyIndex):
+        if self.config.fuzzy_hint_limit <= 0 or len(fuzzy_index) == 0:
+            return
 
-        translations = content.split("\n- ")
-        
-        return [translation.strip() for translation in translations if translation.strip() != ""]
+        hints: dict[str, str] = {}
+        for key in message_batch.keys:
+            source = xcstrings.get(key)
+            if source is None:
+                continue
+            for match in fuzzy_index.search(source, limit=self.config.fuzzy_hint_limit, threshold=self.config.fuzzy_hint_threshold):
+                hints[match.source] = match.target
+
+        if len(hints) == 0:
+            return
+
+        content = "Existing translations of similar strings. Keep the wording consistent with them.\n"
+        content += "\n".join(f"- {source} => {target}" for source, target in hints.items())
+        message_batch.messages.insert(1, { "role": "system", "content": content })
 
+    def _add_glossary_terms(self, xcstrings: XCStrings, message_batch: PromptBatch):
+        if self.glossary is None:
+            return
+
+        sources = [source for source in (xcstrings.get(key) for key in message_batch.keys) if source is not None]
+        terms = self.glossary.find_targets(sources, self.config.target_locale)
+        if len(terms) == 0:
+            return
+
+        content = "Always translate these terms as follows.\n"
+        content += "\n".join(f"- {source} => {target}" for source, target in terms.items())
+        message_batch.messages.insert(1, { "role": "system", "content": content })
+
+    def _check_glossary(self, source_key: XCStringKeyPath, source: str, translation: str):
+        if self.glossary is None:
+            return
+
+        for term in self.glossary.missing_targets(source, translation, self.config.target_locale):
+            self.logger.warn(f"Glossary term '{term.source}' is not translated as '{term.targets[self.config.target_locale]}' in '{source_key.key}'.")
+
+    def parse_translation_content(self, content: str) -> list[str]:
+        return self.prompt_format.decode(content)
 
     def _build_system_prompt(self, target_locale: str) -> str:
+        if target_locale not in self._system_prompts:
+            # The indentation of the templates would only cost tokens
+            self._system_prompts[target_locale] = textwrap.dedent(self._build_locale_prompt(target_locale)).strip()
+        return self._system_prompts[target_locale]
+
+    def _build_locale_prompt(self, target_locale: str) -> str:
         locale_support = self._get_locale_support(target_locale)
         if locale_support is None:
             return self._build_generic_prompt(target_locale)
@@ -112,50 +582,48 @@ class Translator:
         language_name, sample_translation = locale_support
         
         return f"""
-        Translate the following app strings into '{language_name}'. The input will be given in bullet point format.
+        Translate the following app strings into '{language_name}'. {self.prompt_format.description}
 
         ```
-        - Welcome to App
-        - Select All
+        {self._sample(SAMPLE_SOURCES)}
         ```
 
-        The output should be in bullet point format. Do not output anything other than the translated text. 
+        Do not output anything other than the translated text. 
 
         ```
-        {sample_translation}
+        {self._sample(self._sample_items(sample_translation))}
         ```
         """
     
     def _build_generic_prompt(self, target_locale: str):
         return f"""
-        Translate the following app strings into locale code '{target_locale}'. The input will be given in bullet point format.
+        Translate the following app strings into locale code '{target_locale}'. {self.prompt_format.description}
 
         ```
-        - Welcome to App
-        - Select All
+        {self._sample(SAMPLE_SOURCES)}
         ```
 
-        The output should be in bullet point format. Do not output anything other than the translated text. 
+        Do not output anything other than the translated text. 
         For example, for a translation into Japanese, the result will be as follows.
 
         ```
-        - アプリへようこそ
-        - すべてを選択
+        {self._sample(["アプリへようこそ", "すべてを選択"])}
         ```
         """
+
+    def _sample(self, values: list[str]) -> str:
+        return self.prompt_format.encode(values).replace("\n", "\n        ")
+
+    def _sample_items(self, sample_translation: str) -> list[str]:
+        # Locale samples are written as bullet points
+        parser = BulletStreamParser()
+        return parser.feed(sample_translation) + parser.finish()
         
     
     def _get_locale_support(self, locale: str) -> tuple[str, str] | None:
-        try:
-            language_name: str
-            sample_translation: str
-            with open(f'locale_support/{locale}.json', 'r') as f:
-                json_data = json.load(f)
-                language_name = json_data['language']
-                sample_translation = json_data['sample']
-            
-            return language_name, sample_translation
-        except:
+        locale_support = self.locale_registry.get(locale)
+        if locale_support is None:
+            self.logger.warn(f"No locale support for '{locale}', using the generic prompt.")
             return None
 
-
+        return locale_support.language, locale_support.sample
@@ -0,0 +1,200 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable
+
+import httpx
+import openai
+
+from journal import TranslationJournal
+from prompt_format import get_prompt_format
+from translator import Translator, TranslatorConfig
+from util.logger import Logger
+from xcstrings import XCStrings
+
+FORMAT = get_prompt_format("bullets")
+
+def api_error() -> openai.APIError:
+    return openai.APIError("boom", request=httpx.Request("POST", "http://test"), body=None)
+
+class FakeStream:
+    def __init__(self, chunks: list[str], delay: float, on_chunk: Callable[[], None] | None = None, fail_after: int | None = None):
+        self.chunks = chunks
+        self.delay = delay
+        self.on_chunk = on_chunk
+        self.fail_after = fail_after
+
+    def __iter__(self):
+        for index, chunk in enumerate(self.chunks):
+            if index == self.fail_after:
+                raise api_error()
+            time.sleep(self.delay)
+            if self.on_chunk is not None:
+                self.on_chunk()
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=chunk))], usage=None)
+
+    def close(self):
+        pass
+
+class FakeCompletions:
+    """
+    Answers each request with the response of its number: a prefix for the translations,
+    the delay before each item, and whether an extra item is appended. A request listed in
+    `failures` raises an API error after that many chunks.
+    """
+    def __init__(self, responses: list[tuple[str, float, bool]]):
+        self.responses = responses
+        self.calls = 0
+        self.on_request: Callable[[], None] | None = None
+        self.on_chunk: Callable[[], None] | None = None
+        self.failures: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def create(self, model: str, messages: list[dict], stream: bool = False, **kwargs):
+        with self._lock:
+            prefix, delay, extra = self.responses[min(self.calls, len(self.responses) - 1)]
+            fail_after = self.failures.get(self.calls, None)
+            self.calls += 1
+        if self.on_request is not None:
+            self.on_request()
+
+        items = [f"{prefix} {source}" for source in FORMAT.decode(messages[-1]["content"])]
+        if extra:
+            items.append(f"{prefix} extra")
+        if stream:
+            # Each bullet is a chunk of its own; the last line break completes the last item
+            return FakeStream([FORMAT.encode_item(index + 1, item) + FORMAT.separator for index, item in enumerate(items)], delay, self.on_chunk, fail_after)
+
+        if fail_after is not None:
+            raise api_error()
+        time.sleep(delay * len(items))
+        content = FORMAT.encode(items)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+class TestTranslator(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.journal = TranslationJournal(Path(self._directory.name) / "journal.jsonl")
+        self.xcstrings = XCStrings.from_dict({
+            "sourceLanguage": "en",
+            "version": "1.0",
+            "strings": { f"key{index}": { "localizations": { "en": { "stringUnit": { "state": "translated", "value": f"String {index}" } } } } for index in range(3) }
+        })
+
+    def tearDown(self):
+        self.journal.close()
+        self._directory.cleanup()
+
+    def translator(self, responses: list[tuple[str, float, bool]], stream: bool, hedge: bool = False, **options) -> Translator:
+        options.setdefault("retry_limit", 1)
+        config = TranslatorConfig(
+            api_key="test",
+            model="gpt-4o-mini",
+            source_locale="en",
+            target_locale="ja",
+            batch_char_limit=10000,
+            stream=stream,
+            hedge_percentile=0.5 if hedge else None,
+            hedge_min_samples=1,
+            **options
+        )
+        client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(responses)))
+        translator = Translator(config, Logger(logging_level="fatal"), client=client, journal=self.journal) # type: ignore
+        if hedge and translator._latencies is not None:
+            # Requests slower than 50ms are hedged
+            translator._latencies[0].record(0.05)
+        return translator
+
+    def assertStored(self, translator: Translator, prefix: str):
+        for index in range(3):
+            self.assertEqual(translator.memory.lookup("en", "ja", f"String {index}"), f"{prefix} String {index}")
+        self.assertEqual(sorted(self.journal.entries.values()), [f"{prefix} String {index}" for index in range(3)])
+
+    def test_hedge_loser_is_not_stored(self):
+        # The primary answers last, after the duplicate has won
+        translator = self.translator([("slow", 0.2, False), ("fast", 0, False)], stream=False, hedge=True)
+        translations = translator.translate(self.xcstrings)
+
+        self.assertEqual(sorted(result.translation for result in translations), [f"fast String {index}" for index in range(3)])
+        self.assertEqual((translator.stats.hedged, translator.stats.hedges_won), (1, 1))
+        self.assertStored(translator, "fast")
+
+    def test_cancelled_stream_is_not_journaled(self):
+        # The primary has streamed part of its misaligned response when the duplicate wins
+        translator = self.translator([("slow", 0.1, True), ("fast", 0.1, False)], stream=True, hedge=True)
+        translator.translate(self.xcstrings)
+
+        self.assertEqual(translator.stats.hedges_won, 1)
+        self.assertStored(translator, "fast")
+        self.assertNotIn("slow", self.journal.path.read_text())
+
+    def test_no_hedge_once_budget_is_used_up(self):
+        translator = self.translator([("slow", 0.2, False), ("fast", 0, False)], stream=False, hedge=True, max_tokens_total=100)
+        completions = translator.client.chat.completions
+        # The budget runs out while the primary request is in flight
+        completions.on_request = lambda: translator.budget.record("gpt-4o-mini", 100, 0)
+        translator.translate(self.xcstrings)
+
+        self.assertEqual((completions.calls, translator.stats.hedged), (1, 0))
+        self.assertStored(translator, "slow")
+
+    def test_fuzzy_reuse_is_validated(self):
+        xcstrings = XCStrings.from_dict({ "sourceLanguage": "en", "version": "1.0", "strings": {
+            "delete": { "localizations": { "en": { "stringUnit": { "state": "translated", "value": "Delete %@ selected items" } } } },
+            "remove": { "localizations": { "en": { "stringUnit": { "state": "translated", "value": "Remove %@ selected items" } } } }
+        } })
+        translator = self.translator([("ja", 0, False)], stream=False, fuzzy_reuse_threshold=0.8)
+        translator.memory.insert("en", "ja", "Delete %lld selected items", "選択した%lld項目を削除")
+        translator.memory.insert("en", "ja", "Remove %@ selected item", "選択した%@項目を除去")
+
+        translations = { result.source_keypath.key: result.translation for result in translator.translate(xcstrings) }
+
+        # The near match with another specifier goes to the model, the one with the same specifier is reused
+        self.assertEqual(translations, { "delete": "ja Delete %@ selected items", "remove": "選択した%@項目を除去" })
+        self.assertEqual(translator.client.chat.completions.calls, 1)
+
+    def test_streamed_items_are_journaled_right_away(self):
+        translator = self.translator([("ja", 0, False)], stream=True)
+        journaled: list[int] = []
+        translator.client.chat.completions.on_chunk = lambda: journaled.append(len(self.journal.entries))
+        translator.translate(self.xcstrings)
+
+        # An item is complete once the next one starts, and journaled before the one after it arrives
+        self.assertEqual(journaled, [0, 0, 1])
+        self.assertStored(translator, "ja")
+
+    def test_failed_stream_is_resumed(self):
+        translator = self.translator([("first", 0, False), ("second", 0, False)], stream=True, retry_limit=2)
+        completions = translator.client.chat.completions
+        # The first request fails after two bullets, which completes only the first item
+        completions.failures = { 0: 2 }
+        translations = translator.translate(self.xcstrings)
+
+        self.assertEqual(sorted(result.translation for result in translations), ["first String 0", "second String 1", "second String 2"])
+        self.assertEqual(completions.calls, 2)
+
+    def test_failed_request_is_retried(self):
+        translator = self.translator([("ja", 0, False)], stream=False, retry_limit=2)
+        completions = translator.client.chat.completions
+        completions.failures = { 0: 0 }
+        translations = translator.translate(self.xcstrings)
+
+        self.assertEqual(len(translations), 3)
+        self.assertEqual(completions.calls, 2)
+        self.assertStored(translator, "ja")
+
+    def test_misaligned_stream(self):
+        translator = self.translator([("ja", 0, True)], stream=True)
+        translations = translator.translate(self.xcstrings)
+
+        self.assertEqual(translations, [])
+        self.assertEqual(len(translator.memory), 0)
+        self.assertEqual(self.journal.entries, {})
+        # The items journaled before the extra one arrived are withdrawn
+        self.assertEqual(TranslationJournal.load(self.journal.path), {})
+
+if __name__ == '__main__':
+    unittest.main()
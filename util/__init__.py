@@ -2,5 +2,7 @@ from .error import *
 
 from .logger import *
 from .filemanager import *
+from .atomic_write import *
 
 from .natural_sort import *
+from .aho_corasick import *
@@ -0,0 +1,61 @@
+from collections import deque
+from typing import Generator, Iterable
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher. Finds every occurrence of every pattern in one pass over the text.
+    """
+    patterns: list[str]
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = list(patterns)
+
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[list[int]] = [[]]
+
+        for index, pattern in enumerate(self.patterns):
+            if pattern != "":
+                self._insert(pattern, index)
+
+        self._build()
+
+    def find(self, text: str) -> Generator[tuple[int, int], None, None]:
+        """
+        Yields (start, pattern index) for every match, ordered by end position.
+        """
+        state = 0
+        for position, char in enumerate(text):
+            while state != 0 and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+
+            for index in self._output[state]:
+                yield position - len(self.patterns[index]) + 1, index
+
+    def _insert(self, pattern: str, index: int):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char, None)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state].append(index)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+
+        while len(queue) > 0:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fail = self._fail[state]
+                while fail != 0 and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
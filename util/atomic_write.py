@@ -0,0 +1,22 @@
+import os
+import tempfile
+from pathlib import Path
+
+def atomic_write_text(path: Path, content: str) -> None:
+    """
+    Writes the content to a temporary file next to the path and renames it into place,
+    so readers (e.g. Xcode) never observe a half written file.
+    """
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            os.chmod(tmp_path, path.stat().st_mode & 0o777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from atomic_write import atomic_write_text
+
+class TestAtomicWrite(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = Path(self._directory.name)
+        self.path = self.directory / "Localizable.xcstrings"
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_write(self):
+        atomic_write_text(self.path, "first")
+        os.chmod(self.path, 0o640)
+        atomic_write_text(self.path, "こんにちは")
+
+        self.assertEqual(self.path.read_text(encoding="utf-8"), "こんにちは")
+        self.assertEqual(self.path.stat().st_mode & 0o777, 0o640)
+        self.assertEqual(os.listdir(self.directory), [self.path.name])
+
+    def test_failed_write(self):
+        atomic_write_text(self.path, "first")
+
+        # A lone surrogate cannot be encoded, so the write fails
+        with self.assertRaises(UnicodeEncodeError):
+            atomic_write_text(self.path, "second \ud800")
+
+        self.assertEqual(self.path.read_text(encoding="utf-8"), "first")
+        self.assertEqual(os.listdir(self.directory), [self.path.name])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -76,7 +76,7 @@ class FileManager:
         """
         Optionなど永続してほしいデータを保存するディレクトリ
         """
-        return self.root / f"{self.command_name}({os.getpid()}))"
+        return self.root / self.command_name
 
     @property
     def __tmp_path(self) -> Path:
@@ -1,6 +1,13 @@
 
 
-from typing import TypeAlias, Literal, Callable
+from typing import TypeAlias, Literal, Callable, TextIO
+from datetime import datetime, timezone
+from pathlib import Path
+import atexit
+import json
+import queue
+import sys
+import threading
 import traceback
 
 
@@ -8,13 +15,13 @@ LoggingLevel: TypeAlias = Literal['debug', 'info', 'warn', 'error', 'fatal']
 
 LoggingOutput: TypeAlias = Callable[[str], None]
 
+_LEVELS: dict[str, int] = { 'debug': 0, 'info': 1, 'warn': 2, 'error': 3, 'fatal': 4 }
+
 def _log_level_to_int(level: LoggingLevel) -> int:
-    if level == 'debug': return 0
-    if level == 'info': return 1
-    if level == 'warn': return 2
-    if level == 'error': return 3
-    if level == 'fatal': return 4
-    raise ValueError(f"Invalid logging level: {level}")
+    value = _LEVELS.get(level, None)
+    if value is None:
+        raise ValueError(f"Invalid logging level: {level}")
+    return value
 
 def cast_logging_level(level: str) -> LoggingLevel | None:
     if level == 'debug': return 'debug'
@@ -24,6 +31,95 @@ def cast_logging_level(level: str) -> LoggingLevel | None:
     if level == 'fatal': return 'fatal'
     return None
 
+class LogWriter:
+    """
+    Writes whole lines to a stream from a background thread. Callers on any thread (or event loop)
+    only put the line on a queue; the writer joins what has queued up into one write, so lines
+    of different workers never interleave and a slow terminal does not hold them up.
+    """
+    def __init__(self, stream: TextIO | None = None, owns_stream: bool = False):
+        # Without a stream, lines go to the sys.stdout of the moment they are written
+        self._stream = stream
+        self._owns_stream = owns_stream
+        self._queue: queue.SimpleQueue[str | threading.Event | None] = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @staticmethod
+    def open(path: Path) -> 'LogWriter':
+        return LogWriter(open(path, 'a', encoding='utf-8'), owns_stream=True)
+
+    def write(self, line: str):
+        if self._closed:
+            # Late messages, e.g. of other exit handlers
+            self._write([line])
+            return
+        if self._thread is None:
+            self._start()
+        self._queue.put(line)
+
+    def flush(self):
+        """
+        Blocks until every line written so far is written to the stream.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return
+        flushed = threading.Event()
+        self._queue.put(flushed)
+        flushed.wait()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._owns_stream and self._stream is not None:
+            self._stream.close()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="LogWriter", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            # Everything that queued up in the meantime goes out in one write
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._write([item for item in items if isinstance(item, str)])
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if None in items:
+                return
+
+    def _write(self, lines: list[str]):
+        if len(lines) == 0:
+            return
+        stream = self._stream if self._stream is not None else sys.stdout
+        try:
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+        except (OSError, ValueError):
+            # The stream went away (closed pipe, shutdown); the lines are dropped
+            pass
+
+console = LogWriter()
+
+_COLORS: dict[str, str] = { 'debug': "0;32", 'info': "0;34", 'warn': "0;33", 'error': "0;31", 'fatal': "0;31" }
+
 class Logger:
     prefix: str | None
     logging_level: LoggingLevel
@@ -32,61 +128,87 @@ class Logger:
     subloggers: list['Logger']
 
     def append_sublogger(self, sublogger: 'Logger'):
-        self.subloggers.append(sublogger)
+        # The list is replaced rather than changed, so threads logging meanwhile iterate a consistent copy
+        with self._lock:
+            self.subloggers = self.subloggers + [sublogger]
 
     def remove_sublogger(self, sublogger: 'Logger'):
-        self.subloggers.remove(sublogger)
+        with self._lock:
+            subloggers = list(self.subloggers)
+            subloggers.remove(sublogger)
+            self.subloggers = subloggers
 
     def __init__(
-        self, 
+        self,
         prefix: str | None = None,
-        logging_level: LoggingLevel = "info", 
-        logging_output: LoggingOutput = print
+        logging_level: LoggingLevel = "info",
+        logging_output: LoggingOutput | None = None
     ):
         self.prefix = prefix
         self.logging_level = logging_level
-        self.logging_output = logging_output
+        self.logging_output = logging_output if logging_output is not None else console.write
         self.subloggers = []
+        self._lock = threading.Lock()
 
-    def debug(self, message: str):
-        if self.__should_log('debug'):
-            self.logging_output(f"\033[0;32m{self.__prefix()}{message}\033[0m")
+    def is_enabled(self, level: LoggingLevel) -> bool:
+        """
+        Whether this logger or a sublogger writes messages of the level, to skip building expensive ones.
+        """
+        return self._should_log(level) or any(sublogger.is_enabled(level) for sublogger in self.subloggers)
 
-        for sublogger in self.subloggers: sublogger.debug(message)
+    def debug(self, message: str):
+        self._log('debug', message)
 
     def info(self, message: str):
-        if self.__should_log('info'):
-            self.logging_output(f"\033[0;34m{self.__prefix()}\033[0m{message}")
-
-        for sublogger in self.subloggers: sublogger.info(message)
+        self._log('info', message)
 
     def warn(self, message: str):
-        if self.__should_log('warn'):
-            self.logging_output(f"\033[0;33m{self.__prefix()}{message}\033[0m")
-
-        for sublogger in self.subloggers: sublogger.warn(message)
+        self._log('warn', message)
 
     def error(self, message: str):
-        if self.__should_log('error'):
-            self.logging_output(f"\033[0;31m{self.__prefix()}{message}\033[0m")
-
-        for sublogger in self.subloggers: sublogger.error(message)
+        self._log('error', message)
 
     def exception(self, error: Exception):
-        if self.__should_log('error'):
-            self.logging_output(f"\033[0;31m{self.__prefix()}{str(error)}\033[0m")
-            self.logging_output(traceback.format_exc())
+        if self.is_enabled('error'):
+            self._log('error', str(error), traceback.format_exc())
 
-        for sublogger in self.subloggers: sublogger.exception(error)
-        
     def fatal(self, message: str):
-        if self.__should_log('fatal'):
-            self.logging_output(f"\033[0;31m{self.__prefix()}{message}\033[0m")
+        self._log('fatal', message)
+
+    def _log(self, level: LoggingLevel, message: str, details: str | None = None):
+        if self._should_log(level):
+            self._emit(level, message, details)
+
+        for sublogger in self.subloggers: sublogger._log(level, message, details)
 
-        for sublogger in self.subloggers: sublogger.fatal(message)
+    def _emit(self, level: LoggingLevel, message: str, details: str | None):
+        color = _COLORS[level]
+        if level == 'info':
+            line = f"\033[{color}m{self.__prefix()}\033[0m{message}"
+        else:
+            line = f"\033[{color}m{self.__prefix()}{message}\033[0m"
+        # One output call, so that a traceback stays with its message
+        self.logging_output(line if details is None else f"{line}\n{details.rstrip()}")
 
     def __prefix(self) -> str:
         return f"[{self.prefix}] " if self.prefix is not None else ""
 
-    def __should_log(self, level: LoggingLevel) -> bool:
-        return _log_level_to_int(level) >= _log_level_to_int(self.logging_level)
\ No newline at end of file
+    def _should_log(self, level: LoggingLevel) -> bool:
+        return _log_level_to_int(level) >= _log_level_to_int(self.logging_level)
+
+class JSONLogger(Logger):
+    """
+    Writes each message as one JSON object per line, e.g. as a sublogger next to the colored console.
+    """
+    def _emit(self, level: LoggingLevel, message: str, details: str | None):
+        record: dict[str, str] = {
+            "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "level": level,
+            "message": message,
+            "thread": threading.current_thread().name
+        }
+        if self.prefix is not None:
+            record["logger"] = self.prefix
+        if details is not None:
+            record["traceback"] = details.rstrip()
+        self.logging_output(json.dumps(record, ensure_ascii=False))
@@ -0,0 +1,80 @@
+import io
+import json
+import threading
+import unittest
+
+from logger import JSONLogger, Logger, LogWriter
+
+class TestLogger(unittest.TestCase):
+    def test_levels(self):
+        lines: list[str] = []
+        logger = Logger(prefix="test", logging_output=lines.append)
+        logger.debug("hidden")
+        logger.info("shown")
+        logger.error("failed")
+
+        self.assertEqual(lines, ["\033[0;34m[test] \033[0mshown", "\033[0;31m[test] failed\033[0m"])
+        self.assertFalse(logger.is_enabled("debug"))
+
+    def test_subloggers(self):
+        lines: list[str] = []
+        records: list[str] = []
+        logger = Logger(logging_level="error", logging_output=lines.append)
+        sublogger = JSONLogger(prefix="json", logging_level="debug", logging_output=records.append)
+        logger.append_sublogger(sublogger)
+
+        logger.debug("details")
+        self.assertEqual(lines, [])
+        self.assertTrue(logger.is_enabled("debug"))
+
+        record = json.loads(records[0])
+        self.assertEqual((record["level"], record["message"], record["logger"]), ("debug", "details", "json"))
+
+        logger.remove_sublogger(sublogger)
+        logger.debug("details")
+        self.assertEqual(len(records), 1)
+
+    def test_exception(self):
+        lines: list[str] = []
+        logger = Logger(logging_output=lines.append)
+        try:
+            raise ValueError("broken")
+        except ValueError as e:
+            logger.exception(e)
+
+        # The traceback is written with its message
+        self.assertEqual(len(lines), 1)
+        self.assertIn("broken", lines[0])
+        self.assertIn("Traceback", lines[0])
+
+    def test_writer_keeps_lines_whole(self):
+        stream = io.StringIO()
+        writer = LogWriter(stream)
+        logger = Logger(logging_output=writer.write)
+        extra = Logger(logging_output=lambda line: None)
+
+        def work(index: int):
+            for count in range(500):
+                logger.warn(f"worker {index} " + "x" * 200 + f" {count}")
+                if count % 100 == 0:
+                    logger.append_sublogger(extra)
+                    logger.remove_sublogger(extra)
+
+        threads = [threading.Thread(target=work, args=(index,)) for index in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer.flush()
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 8 * 500)
+        self.assertTrue(all(line.startswith("\033[0;33mworker ") and line.endswith("\033[0m") for line in lines))
+
+        writer.close()
+        # Written directly once the writer is closed
+        writer.write("late")
+        self.assertTrue(stream.getvalue().endswith("late\n"))
+
+if __name__ == '__main__':
+    unittest.main()
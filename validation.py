@@ -0,0 +1,115 @@
+import re
+from functools import lru_cache
+
+# printf / String(format:) specifiers as Xcode writes them: %@, %lld, %1$@, %.2f, %%.
+# A letter conversion directly followed by another letter ("50%off") is treated as plain text.
+FORMAT_SPECIFIER = re.compile(r"%(?:(\d+)\$)?[-+#0']*(?:\d+|\*)?(?:\.(?:\d+|\*))?((?:hh|h|ll|l|q|L|z|t|j)?(?:@|%|[dDiuUxXoOfFeEgGaAcCsSp](?![A-Za-z])))")
+MARKUP_TAG = re.compile(r"</?([A-Za-z][A-Za-z0-9]*)\b[^<>]*>")
+MARKDOWN_LINK_TARGET = re.compile(r"\]\(([^()\s]+)\)")
+PLACEHOLDER_TOKEN = re.compile(r"\{(\d+)\}")
+
+FormatSignature = tuple[tuple[int, str], ...]
+
+@lru_cache(maxsize=65536)
+def format_signature(text: str) -> FormatSignature:
+    """
+    Returns the (argument index, length + conversion) pairs of the format specifiers, sorted by argument.
+    Flags, width and precision may differ between languages and are ignored.
+    """
+    if "%" not in text:
+        return ()
+
+    signature: list[tuple[int, str]] = []
+    sequential = 0
+    for match in FORMAT_SPECIFIER.finditer(text):
+        position, conversion = match.group(1), match.group(2)
+        if conversion == "%":
+            continue
+        if position is not None:
+            signature.append((int(position), conversion))
+        else:
+            sequential += 1
+            signature.append((sequential, conversion))
+
+    return tuple(sorted(signature))
+
+def mask_placeholders(text: str) -> tuple[str, list[str]]:
+    """
+    Replaces each format specifier by a numbered token ({1}, {2}, ...) the model keeps verbatim.
+    Returns the text unchanged and no placeholders when it already contains such tokens.
+    """
+    if "%" not in text or PLACEHOLDER_TOKEN.search(text) is not None:
+        return text, []
+
+    placeholders: list[str] = []
+
+    def replace(match: re.Match) -> str:
+        if match.group(2) == "%":
+            return match.group(0)
+        placeholders.append(match.group(0))
+        return f"{{{len(placeholders)}}}"
+
+    return FORMAT_SPECIFIER.sub(replace, text), placeholders
+
+def restore_placeholders(text: str, placeholders: list[str]) -> str | None:
+    """
+    Puts the specifiers back in place of their tokens. When the translation reorders
+    sequential specifiers they are made positional, so arguments still line up.
+    Returns None when a token is missing, duplicated or unknown.
+    """
+    if len(placeholders) == 0:
+        return text
+
+    tokens = [int(match.group(1)) for match in PLACEHOLDER_TOKEN.finditer(text)]
+    if sorted(tokens) != list(range(1, len(placeholders) + 1)):
+        return None
+
+    reordered = tokens != sorted(tokens)
+    all_sequential = all(FORMAT_SPECIFIER.fullmatch(placeholder).group(1) is None for placeholder in placeholders) # type: ignore
+
+    def replace(match: re.Match) -> str:
+        index = int(match.group(1))
+        placeholder = placeholders[index - 1]
+        if reordered and all_sequential:
+            return f"%{index}${placeholder[1:]}"
+        return placeholder
+
+    return PLACEHOLDER_TOKEN.sub(replace, text)
+
+def validate_translation(source: str, translation: str) -> list[str]:
+    """
+    Returns the problems of the translation, empty when it is valid.
+    """
+    errors: list[str] = []
+
+    source_signature = format_signature(source)
+    translation_signature = format_signature(translation)
+    if source_signature != translation_signature:
+        errors.append(f"format specifiers {_describe(source_signature)} became {_describe(translation_signature)}")
+
+    source_lines = source.count("\n")
+    translation_lines = translation.count("\n")
+    if source_lines != translation_lines:
+        errors.append(f"{source_lines} line break(s) became {translation_lines}")
+
+    if "<" in source or "<" in translation:
+        source_tags = _markup_tags(source)
+        translation_tags = _markup_tags(translation)
+        if source_tags != translation_tags:
+            errors.append(f"markup {source_tags} became {translation_tags}")
+
+    if "](" in source:
+        source_links = sorted(MARKDOWN_LINK_TARGET.findall(source))
+        translation_links = sorted(MARKDOWN_LINK_TARGET.findall(translation))
+        if source_links != translation_links:
+            errors.append(f"link targets {source_links} became {translation_links}")
+
+    return errors
+
+def _markup_tags(text: str) -> list[str]:
+    return sorted(("/" if match.group(0).startswith("</") else "") + match.group(1).lower() for match in MARKUP_TAG.finditer(text))
+
+def _describe(signature: FormatSignature) -> str:
+    if len(signature) == 0:
+        return "(none)"
+    return ", ".join(f"%{index}${conversion}" for index, conversion in signature)
@@ -0,0 +1,35 @@
+import unittest
+
+from validation import format_signature, mask_placeholders, restore_placeholders, validate_translation
+
+class TestValidation(unittest.TestCase):
+    def test_format_signature(self):
+        self.assertEqual(format_signature("%@ of %lld"), ((1, "@"), (2, "lld")))
+        self.assertEqual(format_signature("%2$lld の %1$@"), ((1, "@"), (2, "lld")))
+        self.assertEqual(format_signature("%.2f%% done"), ((1, "f"),))
+        self.assertEqual(format_signature("50%off today"), ())
+        self.assertEqual(format_signature("No specifiers"), ())
+
+    def test_mask_and_restore(self):
+        masked, placeholders = mask_placeholders("%@ of %lld (100%%)")
+        self.assertEqual(masked, "{1} of {2} (100%%)")
+        self.assertEqual(placeholders, ["%@", "%lld"])
+
+        self.assertEqual(restore_placeholders("{1} / {2}", placeholders), "%@ / %lld")
+        self.assertEqual(restore_placeholders("{2} の {1}", placeholders), "%2$lld の %1$@")
+        self.assertIsNone(restore_placeholders("{1} の {1}", placeholders))
+        self.assertIsNone(restore_placeholders("{1}", placeholders))
+
+    def test_mask_skips_existing_tokens(self):
+        self.assertEqual(mask_placeholders("{1} and %@"), ("{1} and %@", []))
+
+    def test_validate_translation(self):
+        self.assertEqual(validate_translation("%@ of %lld", "%2$lld の %1$@"), [])
+        self.assertEqual(len(validate_translation("%lld items", "%@ 個")), 1)
+        self.assertEqual(len(validate_translation("Line 1\nLine 2", "1行目 2行目")), 1)
+        self.assertEqual(len(validate_translation("<b>Bold</b>", "<b>太字")), 1)
+        self.assertEqual(validate_translation("See [docs](https://example.com)", "[ドキュメント](https://example.com)を参照"), [])
+        self.assertEqual(len(validate_translation("See [docs](https://example.com)", "ドキュメントを参照")), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,241 @@
+import os
+import time
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from merge import merge_translations
+from prompt_builder import list_source_keys
+from translator import TranslationResult, Translator
+from xcstrings import XCStrings, XCStringKeyPath
+from util.logger import Logger
+from util.atomic_write import atomic_write_text
+
+try:
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
+@dataclass
+class WatcherConfig:
+    paths: list[Path]
+    debounce: float = 1.0
+    poll_interval: float = 1.0
+    use_polling: bool = False
+
+@dataclass(frozen=True)
+class FileFingerprint:
+    size: int
+    mtime_ns: int
+
+    @staticmethod
+    def of(path: Path) -> 'FileFingerprint | None':
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return FileFingerprint(stat.st_size, stat.st_mtime_ns)
+
+class _WatchdogHandler:
+    watcher: 'CatalogWatcher'
+
+    def __init__(self, watcher: 'CatalogWatcher'):
+        self.watcher = watcher
+
+    def dispatch(self, event):
+        # Xcode saves by renaming a temporary file over the catalog, so the destination matters too
+        for attr in ("src_path", "dest_path"):
+            path = getattr(event, attr, None)
+            if path:
+                self.watcher.notify(Path(os.fsdecode(path)))
+
+class CatalogWatcher:
+    config: WatcherConfig
+    translator: Translator
+    logger: Logger
+
+    def __init__(self, config: WatcherConfig, translator: Translator, logger: Logger):
+        self.config = config
+        self.translator = translator
+        self.logger = logger
+
+        self._paths = [path.resolve() for path in config.paths]
+        self._lock = threading.Lock()
+        self._pending: dict[Path, float] = {}
+        self._seen: dict[Path, FileFingerprint | None] = {}
+        self._written: dict[Path, FileFingerprint] = {}
+        self._sources: dict[Path, dict[XCStringKeyPath, str]] = {}
+        self._stopped = threading.Event()
+
+    def notify(self, path: Path):
+        path = path.resolve()
+        if path not in self._paths:
+            return
+        with self._lock:
+            self._pending[path] = time.monotonic()
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        for path in self._paths:
+            self._seen[path] = FileFingerprint.of(path)
+            self._process(path)
+
+        observer = self._start_observer()
+        if observer is None:
+            self.logger.info(f"Watching {len(self._paths)} file(s) by polling every {self.config.poll_interval}s.")
+        else:
+            self.logger.info(f"Watching {len(self._paths)} file(s).")
+
+        try:
+            while not self._stopped.is_set():
+                self._stopped.wait(min(self.config.poll_interval, self.config.debounce))
+                if observer is None:
+                    self._poll()
+                for path in self._settled_paths():
+                    self._process(path)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+    def _start_observer(self):
+        if self.config.use_polling or Observer is None:
+            return None
+
+        observer = Observer()
+        handler = _WatchdogHandler(self)
+        for directory in set(path.parent for path in self._paths):
+            observer.schedule(handler, str(directory), recursive=False)
+        observer.start()
+        return observer
+
+    def _poll(self):
+        for path in self._paths:
+            fingerprint = FileFingerprint.of(path)
+            if fingerprint != self._seen.get(path, None):
+                self._seen[path] = fingerprint
+                self.notify(path)
+
+    def _settled_paths(self) -> list[Path]:
+        now = time.monotonic()
+        with self._lock:
+            settled = [path for path, changed_at in self._pending.items() if now - changed_at >= self.config.debounce]
+            for path in settled:
+                del self._pending[path]
+        return settled
+
+    def _process(self, path: Path):
+        fingerprint = FileFingerprint.of(path)
+        if fingerprint is None:
+            return
+        if fingerprint == self._written.get(path, None):
+            # The change is our own write
+            return
+
+        try:
+            xcstrings = XCStrings.from_path(path, logger=self.logger)
+        except Exception as e:
+            # Most likely a save in progress; the settled write will notify again
+            self.logger.warn(f"Could not load {path.name}: {e}")
+            return
+
+        sources = self._source_values(xcstrings)
+        keys, changed = self._changed_keys(path, xcstrings, sources)
+        self._seed_memory(xcstrings, changed)
+
+        if len(keys) == 0:
+            self._sources[path] = sources
+            self.logger.debug(f"{path.name}: nothing to translate.")
+            return
+
+        self.logger.info(f"{path.name}: translating {len(keys)} new or changed key(s).")
+        try:
+            results = self.translator.translate(xcstrings, keys=keys)
+        except Exception as e:
+            # The keys are still unknown to _sources, so they are retried once the path settles again
+            self.logger.error(f"Could not translate {path.name}: {e}")
+            self.notify(path)
+            return
+
+        if FileFingerprint.of(path) != fingerprint:
+            # Xcode saved while we were translating. Merge into its version, then look at it again
+            # once it settles for keys that were added or changed in the meantime.
+            merged = self._merge_edits(path, xcstrings, results)
+            if merged is not None:
+                atomic_write_text(path, merged.to_json())
+                self._sources[path] = sources
+            self.notify(path)
+            return
+
+        for result in results:
+            xcstrings.set(result.target_keypath, result.translation)
+
+        atomic_write_text(path, xcstrings.to_json())
+
+        written = FileFingerprint.of(path)
+        if written is not None:
+            self._written[path] = written
+            self._seen[path] = written
+        self._sources[path] = sources
+        self.logger.info(f"{path.name}: wrote {len(results)} translation(s).")
+
+    def _merge_edits(self, path: Path, snapshot: XCStrings, results: list[TranslationResult]) -> XCStrings | None:
+        try:
+            current = XCStrings.from_path(path, logger=self.logger)
+        except Exception as e:
+            self.logger.info(f"{path.name} changed during translation and cannot be loaded yet ({e}), retrying after it settles.")
+            return None
+
+        merge = merge_translations(snapshot, [(result.target_keypath, result.translation) for result in results], current, self.translator.config.source_locale)
+        self.logger.info(f"{path.name} changed during translation. Merged {len(merge.applied)} translation(s) into it.")
+        for conflict in merge.conflicts:
+            self.logger.warn(f"Kept the file's version of {conflict.describe()}")
+
+        return merge.merged
+
+    def _source_values(self, xcstrings: XCStrings) -> dict[XCStringKeyPath, str]:
+        """
+        The value of every source keypath the translator would send, including device and plural variations.
+        """
+        config = self.translator.config
+        sources: dict[XCStringKeyPath, str] = {}
+
+        for keypath in list_source_keys(xcstrings, config.source_locale, config.target_locale):
+            value = xcstrings.get(keypath)
+            if value is not None:
+                sources[keypath] = value
+
+        return sources
+
+    def _changed_keys(self, path: Path, xcstrings: XCStrings, sources: dict[XCStringKeyPath, str]) -> tuple[list[XCStringKeyPath], set[str]]:
+        target_locale = self.translator.config.target_locale
+        previous = self._sources.get(path, None)
+
+        keys: list[XCStringKeyPath] = []
+        changed: set[str] = set()
+
+        for keypath, source in sources.items():
+            if not xcstrings.has_entry(keypath.with_locale(target_locale)):
+                keys.append(keypath)
+            elif previous is not None and keypath in previous and previous[keypath] != source:
+                keys.append(keypath)
+                changed.add(keypath.key)
+
+        return keys, changed
+
+    def _seed_memory(self, xcstrings: XCStrings, changed: set[str]):
+        # Existing targets of changed keys belong to the old source text and must not be reused
+        if len(changed) == 0:
+            self.translator.memory.seed(xcstrings, self.translator.config.source_locale, self.translator.config.target_locale)
+            return
+
+        unchanged = XCStrings(
+            source_language=xcstrings.source_language,
+            strings={key: entry for key, entry in xcstrings.strings.items() if key not in changed},
+            version=xcstrings.version
+        )
+        self.translator.memory.seed(unchanged, self.translator.config.source_locale, self.translator.config.target_locale)
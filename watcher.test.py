@@ -0,0 +1,131 @@
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from translation_memory import TranslationMemory
+from translator import TranslationResult
+from watcher import CatalogWatcher, WatcherConfig
+from xcstrings import XCStrings, XCStringKeyPath
+from util.logger import Logger
+
+def unit(value: str) -> dict:
+    return { "stringUnit": { "state": "translated", "value": value } }
+
+class FakeTranslator:
+    """
+    Translates every key it is given by prefixing its source value, and remembers the keys.
+    """
+    def __init__(self):
+        self.config = SimpleNamespace(source_locale="en", target_locale="ja")
+        self.memory = TranslationMemory()
+        self.requests: list[list[XCStringKeyPath]] = []
+        self.failures = 0
+
+    def translate(self, xcstrings: XCStrings, keys: list[XCStringKeyPath]) -> list[TranslationResult]:
+        self.requests.append(keys)
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("API unavailable")
+        return [TranslationResult(key, key.with_locale("ja"), f"ja {xcstrings.get(key)}") for key in keys]
+
+class TestCatalogWatcher(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = (Path(self._directory.name) / "Localizable.xcstrings").resolve()
+        self.translator = FakeTranslator()
+        self.watcher = CatalogWatcher(WatcherConfig(paths=[self.path]), self.translator, Logger(logging_level="fatal")) # type: ignore
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def write(self, strings: dict):
+        self.path.write_text(json.dumps({ "sourceLanguage": "en", "version": "1.0", "strings": strings }))
+
+    def edit(self, key: str, localization: dict):
+        data = json.loads(self.path.read_text())
+        data["strings"][key]["localizations"]["en"] = localization
+        self.path.write_text(json.dumps(data))
+
+    def test_debounce(self):
+        watcher = CatalogWatcher(WatcherConfig(paths=[self.path], debounce=0.2), self.translator, Logger(logging_level="fatal")) # type: ignore
+        watcher.notify(self.path)
+        watcher.notify(self.path.parent / "Other.xcstrings")
+        self.assertEqual(watcher._settled_paths(), [])
+
+        # Each change restarts the wait
+        time.sleep(0.1)
+        watcher.notify(self.path)
+        time.sleep(0.1)
+        self.assertEqual(watcher._settled_paths(), [])
+
+        time.sleep(0.15)
+        self.assertEqual(watcher._settled_paths(), [self.path])
+        self.assertEqual(watcher._settled_paths(), [])
+
+    def test_changed_keys(self):
+        self.write({
+            "hello": { "localizations": { "en": unit("Hello"), "ja": unit("こんにちは") } },
+            "bye": { "localizations": { "en": unit("Bye") } }
+        })
+        self.watcher._process(self.path)
+        self.assertEqual(self.translator.requests, [[XCStringKeyPath("bye", "en")]])
+        self.assertEqual(self.translator.memory.lookup("en", "ja", "Hello"), "こんにちは")
+
+        # Our own write is not a change
+        self.watcher._process(self.path)
+        self.assertEqual(len(self.translator.requests), 1)
+
+        # A changed source is translated again, and its old translation is not reused
+        self.edit("hello", unit("Hello there"))
+        keys, changed = self.watcher._changed_keys(self.path, XCStrings.from_path(self.path), self.watcher._source_values(XCStrings.from_path(self.path)))
+        self.assertEqual((keys, changed), ([XCStringKeyPath("hello", "en")], { "hello" }))
+
+        self.translator.memory = TranslationMemory()
+        self.watcher._process(self.path)
+        self.assertEqual(self.translator.requests[-1], [XCStringKeyPath("hello", "en")])
+        self.assertIsNone(self.translator.memory.lookup("en", "ja", "Hello there"))
+        self.assertEqual(XCStrings.from_path(self.path).get(XCStringKeyPath("hello", "ja")), "ja Hello there")
+
+    def test_failed_translation_is_retried(self):
+        self.write({ "hello": { "localizations": { "en": unit("Hello") } } })
+        self.translator.failures = 1
+        self.watcher._process(self.path)
+        self.assertIn(self.path, self.watcher._pending)
+        self.assertIsNone(XCStrings.from_path(self.path).get(XCStringKeyPath("hello", "ja")))
+
+        self.watcher._process(self.path)
+        self.assertEqual(self.translator.requests, [[XCStringKeyPath("hello", "en")]] * 2)
+        self.assertEqual(XCStrings.from_path(self.path).get(XCStringKeyPath("hello", "ja")), "ja Hello")
+
+    def test_variations(self):
+        items = { "variations": { "plural": { "one": unit("%d item"), "other": unit("%d items") } } }
+        tap = { "variations": { "device": { "iphone": unit("Tap"), "mac": unit("Click") } } }
+        self.write({ "items": { "localizations": { "en": items } }, "tap": { "localizations": { "en": tap } } })
+
+        self.watcher._process(self.path)
+        self.assertEqual(set(self.translator.requests[-1]), {
+            XCStringKeyPath("items", "en", plural="other"),
+            XCStringKeyPath("tap", "en", "iphone"),
+            XCStringKeyPath("tap", "en", "mac")
+        })
+        xcstrings = XCStrings.from_path(self.path)
+        self.assertEqual(xcstrings.get(XCStringKeyPath("items", "ja", plural="other")), "ja %d items")
+        self.assertEqual(xcstrings.get(XCStringKeyPath("tap", "ja", "mac")), "ja Click")
+
+        # Only the variant that changed is translated again
+        items["variations"]["plural"]["other"] = unit("%d things")
+        self.edit("items", items)
+        self.watcher._process(self.path)
+        self.assertEqual(self.translator.requests[-1], [XCStringKeyPath("items", "en", plural="other")])
+
+        tap["variations"]["device"]["ipad"] = unit("Tap")
+        self.edit("tap", tap)
+        self.watcher._process(self.path)
+        self.assertEqual(self.translator.requests[-1], [XCStringKeyPath("tap", "en", "ipad")])
+        self.assertEqual(len(self.translator.requests), 3)
+
+if __name__ == '__main__':
+    unittest.main()
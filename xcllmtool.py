@@ -2,25 +2,73 @@ import sys
 from argparse import ArgumentParser
 from pathlib import Path
 
-from util.logger import Logger, cast_logging_level
+from util.logger import JSONLogger, Logger, LogWriter, cast_logging_level
 
-from translator import Translator, TranslatorConfig
+from budget import load_prices
+from client import ClientConfig
+from fingerprint_cache import CheckTool
+from glossary import Glossary
+from journal import TranslationJournal
+from memory_server import MemoryClient, RemoteTranslationMemory, parse_address
+from merge import merge_translations
+from prompt_builder import cast_StalePolicy
+from prompt_format import PROMPT_FORMATS
+from routing import ModelTier
+from sharding import Shard, catalog_fingerprint, merge_shards, pending_keys, plan_shards
+from translator import TranslationResult, Translator, TranslatorConfig
+from watcher import CatalogWatcher, FileFingerprint, WatcherConfig
 from xcstrings import XCStrings
+from util.atomic_write import atomic_write_text
 
 class XCLLMTool:
     def __init__(self):
         parser = ArgumentParser(description="Xcode Localization Management Tool")
 
         parser.add_argument("input", type=str, help="Source file")
-        parser.add_argument("--api-key", required=True, type=str, help="OpenAI API Key")
+        parser.add_argument("--api-key", default=None, type=str, help="OpenAI API Key (required unless splitting or merging shards)")
         parser.add_argument("-s", "--source", required=True, type=str, help="Source locale")
         parser.add_argument("-t", "--target", required=True, type=str, help="Target locale")
         parser.add_argument("-m", "--model", default="gpt-4-turbo", type=str, help="GPT model")
         parser.add_argument("-b", "--batch-size", default=1000, type=int, help="Batch character limit")
         parser.add_argument("-r", "--retry", default=3, type=int, help="Retry limit")
+        parser.add_argument("-c", "--concurrency", default=4, type=int, help="Number of batches translated concurrently")
+        parser.add_argument("--timeout", default=120.0, type=float, help="Request timeout in seconds")
+        parser.add_argument("--connect-timeout", default=10.0, type=float, help="Connection timeout in seconds")
+        parser.add_argument("--max-connections", default=None, type=int, help="Connection pool size (default: concurrency)")
+        parser.add_argument("--keepalive-expiry", default=60.0, type=float, help="Seconds an idle keep-alive connection is kept open")
+        parser.add_argument("--http2", default=False, action="store_true", help="Use HTTP/2 (requires the h2 package)")
+        parser.add_argument("--locale-support", default=[], action="append", type=str, help="Directory of locale support JSON files overriding the bundled ones (repeatable)")
+        parser.add_argument("--fuzzy-hints", default=3, type=int, help="Similar existing translations sent as hints per string (0 to disable)")
+        parser.add_argument("--fuzzy-hint-threshold", default=0.6, type=float, help="Minimum similarity (0-1) of a hint")
+        parser.add_argument("--fuzzy-reuse-threshold", default=None, type=float, help="Reuse an existing translation directly when its source is at least this similar (0-1)")
+        parser.add_argument("-g", "--glossary", default=None, type=str, help="Glossary file (.json or .csv) of required term translations")
+        parser.add_argument("--no-validate", default=False, action="store_true", help="Do not check format specifiers, line breaks and markup of translations")
+        parser.add_argument("--no-mask", default=False, action="store_true", help="Send format specifiers as they are instead of numbered tokens")
+        parser.add_argument("--stale", default="skip", choices=["skip", "defer", "include"], help="Stale keys (no longer in code): skip them, translate them last, or treat them like other keys")
+        parser.add_argument("--no-stream", default=False, action="store_true", help="Wait for complete responses instead of streaming them")
+        parser.add_argument("--stall-timeout", default=30.0, type=float, help="Seconds without streamed data before the rest of a batch is re-queued")
+        parser.add_argument("-j", "--journal", default=None, type=str, help="Journal file of finished translations; an interrupted run resumes from it")
+        parser.add_argument("--tier", default=[], action="append", type=str, help="Model tier 'model[:max_chars=N,concurrency=N,rpm=N,comments=yes|no]', cheapest first (repeatable; replaces --model)")
+        parser.add_argument("--escalation-failure-rate", default=0.5, type=float, help="Failure rate above which a tier's strings go to the next tier")
+        parser.add_argument("--hedge-percentile", default=None, type=float, help="Send a duplicate of a request slower than this latency percentile of the run (e.g. 0.9)")
+        parser.add_argument("--memory-server", default=None, type=str, help="Share translations with other jobs through this memory server (unix:/path/to.sock or host:port)")
+        parser.add_argument("--prompt-format", default="bullets", choices=list(PROMPT_FORMATS.keys()), help="How strings are written into prompts and read back from responses")
+        parser.add_argument("--max-tokens-total", default=None, type=int, help="Stop sending batches once this many prompt and completion tokens are used")
+        parser.add_argument("--max-cost", default=None, type=float, help="Stop sending batches once requests cost this much (USD)")
+        parser.add_argument("--prices", default=None, type=str, help="JSON file of model prices in USD per million tokens, added to the built-in ones")
         parser.add_argument("-l", "--log", default="info", type=str, help="Log level")
+        parser.add_argument("--log-json", default=None, type=str, help="Also append the log to this file as JSON lines")
         parser.add_argument("--override", default=False, action="store_true", help="Override existing translations")
         parser.add_argument("-o", "--output", default=None, type=str, help="Output file (default: [source].translated.xcstrings)")
+        parser.add_argument("-w", "--watch", default=False, action="store_true", help="Watch the source file (or every .xcstrings in a directory) and translate new or changed keys in place")
+        parser.add_argument("--debounce", default=1.0, type=float, help="Seconds a watched file must stay unchanged before it is translated")
+        parser.add_argument("--poll-interval", default=1.0, type=float, help="Polling interval in seconds for watch mode")
+        parser.add_argument("--poll", default=False, action="store_true", help="Always poll in watch mode, even if watchdog is installed")
+        parser.add_argument("--shard", default=None, type=int, help="Split the pending keys into this many shard files (written to the output directory) instead of translating")
+        parser.add_argument("--worker", default=None, type=str, help="Translate only the keys of this shard file and write its result (default: [shard].result.json)")
+        parser.add_argument("--merge", default=None, nargs="+", type=str, help="Apply these shard results to the source file instead of translating")
+        parser.add_argument("--check", default=False, action="store_true", help="Only check whether keys need translating: exit with status 3 if they do, 0 otherwise")
+        parser.add_argument("--cache-dir", default=None, type=str, help="Directory of the fingerprint cache used by --check (default: $XDG_CACHE_HOME or ~/.cache)")
 
         self.parser = parser
 
@@ -35,15 +83,14 @@ class XCLLMTool:
                 raise ValueError("Log level must be a string")
             
             logger.logging_level = log
+
+            if args.log_json is not None:
+                logger.append_sublogger(JSONLogger(prefix="xcllmtool", logging_level=log, logging_output=LogWriter.open(Path(args.log_json)).write))
             
             source_path = Path(args.input)
             if not source_path.exists():
                 raise FileNotFoundError(f"File not found: {source_path}")
             
-            api_key = args.api_key
-            if api_key is None or not isinstance(api_key, str):
-                raise ValueError("API Key must be a string")
-            
             source_locale = args.source
             if source_locale is None or not isinstance(source_locale, str):
                 raise ValueError("Source locale must be a string")
@@ -51,6 +98,27 @@ class XCLLMTool:
             target_locale = args.target
             if target_locale is None or not isinstance(target_locale, str):
                 raise ValueError("Target locale must be a string")
+
+            if len([mode for mode in [args.shard, args.worker, args.merge] if mode is not None]) + len([mode for mode in [args.watch, args.check] if mode]) > 1:
+                raise ValueError("Only one of --shard, --worker, --merge, --watch and --check can be used")
+
+            if args.journal is not None and args.watch:
+                raise ValueError("--journal cannot be used with --watch")
+
+            if args.check:
+                sys.exit(CheckTool().run(varg))
+
+            if args.shard is not None:
+                self._shard(source_path, args, logger)
+                return
+
+            if args.merge is not None:
+                self._merge(source_path, args, logger)
+                return
+
+            api_key = args.api_key
+            if api_key is None or not isinstance(api_key, str):
+                raise ValueError("API Key must be a string")
             
             model = args.model
             if model is None or not isinstance(model, str):
@@ -64,6 +132,19 @@ class XCLLMTool:
             if retry is None or not isinstance(retry, int):
                 raise ValueError("Retry limit must be an integer")
             
+            concurrency = args.concurrency
+            if concurrency is None or not isinstance(concurrency, int) or concurrency < 1:
+                raise ValueError("Concurrency must be a positive integer")
+
+            tiers = [ModelTier.from_spec(spec) for spec in args.tier]
+
+            total_concurrency = sum(tier.concurrency for tier in tiers) if len(tiers) > 0 else concurrency
+            # Each batch in flight may have a hedge duplicate next to it
+            default_connections = total_concurrency * 2 if args.hedge_percentile is not None else total_concurrency
+            max_connections = args.max_connections if args.max_connections is not None else default_connections
+            if max_connections < 1:
+                raise ValueError("Max connections must be a positive integer")
+
             override = args.override or False
             output = Path(args.output) if args.output is not None else None
             if override:
@@ -78,26 +159,161 @@ class XCLLMTool:
                 source_locale=source_locale,
                 target_locale=target_locale,
                 batch_char_limit=batch_size,
-                retry_limit=retry
+                retry_limit=retry,
+                concurrency=concurrency,
+                locale_support_directories=[Path(directory) for directory in args.locale_support],
+                fuzzy_hint_limit=args.fuzzy_hints,
+                fuzzy_hint_threshold=args.fuzzy_hint_threshold,
+                fuzzy_reuse_threshold=args.fuzzy_reuse_threshold,
+                validate=not args.no_validate,
+                mask_placeholders=not args.no_mask,
+                stale_policy=cast_StalePolicy(args.stale),
+                stream=not args.no_stream,
+                stall_timeout=args.stall_timeout,
+                tiers=tiers,
+                escalation_failure_rate=args.escalation_failure_rate,
+                hedge_percentile=args.hedge_percentile,
+                prompt_format=args.prompt_format,
+                max_tokens_total=args.max_tokens_total,
+                max_cost=args.max_cost,
+                prices=load_prices(Path(args.prices)) if args.prices is not None else {},
+                client=ClientConfig(
+                    timeout=args.timeout,
+                    connect_timeout=args.connect_timeout,
+                    max_connections=max_connections,
+                    keepalive_expiry=args.keepalive_expiry,
+                    http2=args.http2
+                )
             )
 
-            translator = Translator(config=config, logger=logger)
-            xcstrings = XCStrings.from_path(source_path, logger=logger)
-            results = translator.translate(xcstrings)
+            glossary = None
+            if args.glossary is not None:
+                glossary = Glossary.from_path(Path(args.glossary))
+                logger.debug(f"Loaded {len(glossary)} glossary terms.")
+
+            shard = None
+            if args.worker is not None:
+                shard = Shard.from_path(Path(args.worker))
+                if (shard.source_locale, shard.target_locale) != (source_locale, target_locale):
+                    raise ValueError(f"Shard translates {shard.source_locale} to {shard.target_locale}, not {source_locale} to {target_locale}")
+                output = Path(args.output) if args.output is not None else Path(args.worker).with_suffix(".result.json")
 
-            for result in results:
-                xcstrings.set(result.target_keypath, result.translation)
+            journal = None
+            if args.journal is not None:
+                journal = TranslationJournal(Path(args.journal))
+                if len(journal.entries) > 0:
+                    logger.info(f"Resuming with {len(journal.entries)} journaled translations.")
 
-            self._write_results(xcstrings, output, logger)
+            memory = None
+            if args.memory_server is not None:
+                memory = RemoteTranslationMemory(MemoryClient(parse_address(args.memory_server)), logger)
+
+            try:
+                with Translator(config=config, logger=logger, memory=memory, glossary=glossary, journal=journal) as translator:
+                    if args.watch:
+                        self._watch(source_path, translator, args, logger)
+                        return
+
+                    fingerprint = FileFingerprint.of(source_path)
+                    xcstrings = XCStrings.from_path(source_path, logger=logger)
+                    if shard is not None and shard.catalog != catalog_fingerprint(xcstrings):
+                        raise ValueError(f"{source_path} changed since shard {shard.index} was planned")
+
+                    try:
+                        results = translator.translate(xcstrings, keys=shard.keys if shard is not None else None)
+                    finally:
+                        if journal is not None:
+                            journal.close()
+            finally:
+                # Also when watch mode ends
+                if memory is not None:
+                    memory.client.close()
+
+            if shard is not None:
+                shard.translations = { result.target_keypath: result.translation for result in results }
+                atomic_write_text(output, shard.to_json())
+                logger.info(f"Translated {len(shard.translations)}/{len(shard.keys)} key(s) of shard {shard.index}.")
+            elif FileFingerprint.of(source_path) != fingerprint:
+                # The file was edited during the run, keep those edits
+                self._write_results(self._merge_edits(source_path, xcstrings, results, source_locale, logger), output, logger)
+            else:
+                for result in results:
+                    xcstrings.set(result.target_keypath, result.translation)
+
+                self._write_results(xcstrings, output, logger)
+
+            # Everything journaled is in the output now
+            if journal is not None:
+                journal.close(remove=True)
+
+            # The results of a run stopped by its budget are written, running it again translates the rest
+            if translator.stats.unsent > 0:
+                sys.exit(2)
 
         except Exception as e:
             logger.exception(e)
             sys.exit(1)
 
+    def _merge_edits(self, source_path: Path, snapshot: XCStrings, results: list[TranslationResult], source_locale: str, logger: Logger) -> XCStrings:
+        current = XCStrings.from_path(source_path, logger=logger)
+        merge = merge_translations(snapshot, [(result.target_keypath, result.translation) for result in results], current, source_locale)
+
+        logger.info(f"{source_path.name} changed during translation. Merged {len(merge.applied)} translation(s) into it.")
+        for conflict in merge.conflicts:
+            logger.warn(f"Kept the file's version of {conflict.describe()}")
+
+        return merge.merged
+
+    def _shard(self, source_path: Path, args, logger: Logger):
+        xcstrings = XCStrings.from_path(source_path, logger=logger)
+        keys = pending_keys(xcstrings, args.source, args.target, cast_StalePolicy(args.stale))
+        shards = plan_shards(xcstrings, keys, args.shard, args.source, args.target)
+
+        directory = Path(args.output) if args.output is not None else source_path.parent
+        directory.mkdir(parents=True, exist_ok=True)
+        for shard in shards:
+            path = directory / f"{source_path.stem}.{args.target}.shard-{shard.index + 1}-of-{shard.count}.json"
+            atomic_write_text(path, shard.to_json())
+            logger.info(f"Wrote {len(shard.keys)} key(s) to {path}")
+
+    def _merge(self, source_path: Path, args, logger: Logger):
+        xcstrings = XCStrings.from_path(source_path, logger=logger)
+        shards = [Shard.from_path(Path(path)) for path in args.merge]
+        count = merge_shards(xcstrings, shards)
+        logger.info(f"Merged {count} translation(s) from {len(shards)} shard(s).")
+
+        if args.override:
+            output = source_path
+        elif args.output is not None:
+            output = Path(args.output)
+        else:
+            output = source_path.with_suffix(".translated.xcstrings")
+        self._write_results(xcstrings, output, logger)
+
+    def _watch(self, source_path: Path, translator: Translator, args, logger: Logger):
+        if source_path.is_dir():
+            paths = sorted(path for path in source_path.rglob("*.xcstrings") if not path.name.endswith(".translated.xcstrings"))
+        else:
+            paths = [source_path]
+
+        if len(paths) == 0:
+            raise FileNotFoundError(f"No .xcstrings files found in {source_path}")
+
+        watcher = CatalogWatcher(
+            config=WatcherConfig(
+                paths=paths,
+                debounce=args.debounce,
+                poll_interval=args.poll_interval,
+                use_polling=args.poll
+            ),
+            translator=translator,
+            logger=logger
+        )
+        watcher.run()
+
     def _write_results(self, xcstrings: XCStrings, output: Path, logger: Logger):
         try:
-            with open(output, "w") as f:
-                f.write(xcstrings.to_json())
+            atomic_write_text(output, xcstrings.to_json())
         except Exception as e:
             logger.error(str(e))
             sys.exit(1)
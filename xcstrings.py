@@ -71,9 +71,68 @@ class XCStringUnit:
         
         return XCStringUnit(value_data, state)
 
+@dataclass
+class XCStringPluralVariation:
+    plurals: dict[str, XCStringUnit]
+
+    def to_dict(self) -> dict:
+        return {
+            "variations": {
+                "plural": {
+                    category: unit.to_dict() for category, unit in self.plurals.items()
+                }
+            }
+        }
+
+    def get(self, category: str) -> XCStringUnit | None:
+        """
+        Returns the unit of the category, falling back to 'other' like the runtime does.
+        """
+        unit = self.plurals.get(category, None)
+        if unit is None:
+            unit = self.plurals.get("other", None)
+        return unit
+
+    @staticmethod
+    def can_from_dict(data: dict) -> bool:
+        if "variations" not in data:
+            return False
+        
+        variations_data = data["variations"]
+        if not isinstance(variations_data, dict):
+            return False
+        
+        if "plural" not in variations_data:
+            return False
+        
+        return True
+
+    @staticmethod
+    def from_dict(data: dict) -> 'XCStringPluralVariation':
+        if "variations" not in data:
+            raise ValueError('variations is required')
+        
+        variations_data = data["variations"]
+        if not isinstance(variations_data, dict):
+            raise ValueError('variations must be a dictionary')
+        
+        plural_data = variations_data.get("plural", None)
+        if not isinstance(plural_data, dict):
+            raise ValueError('plural must be a dictionary')
+        
+        plurals: dict[str, XCStringUnit] = {}
+
+        for category, unit_data in plural_data.items():
+            if not isinstance(unit_data, dict):
+                raise ValueError('plural variation must be a dictionary')
+            
+            plurals[category] = XCStringUnit.from_dict(unit_data)
+
+        return XCStringPluralVariation(plurals)
+
 @dataclass
 class XCStringDeviceVariation:
-    devices: dict[str, XCStringUnit]
+    devices: dict[str, XCStringUnit | XCStringPluralVariation]
 
     def to_dict(self) -> dict:
         return {
@@ -111,19 +170,24 @@ class XCStringDeviceVariation:
         if not isinstance(device_data, dict):
             raise ValueError('device must be a dictionary')
         
-        device: dict[str, XCStringUnit] = {}
+        device: dict[str, XCStringUnit | XCStringPluralVariation] = {}
 
         for device_name, variation_data in device_data.items():
             if not isinstance(variation_data, dict):
                 raise ValueError('variation must be a dictionary')
             
-            device[device_name] = XCStringUnit.from_dict(variation_data)
+            if XCStringPluralVariation.can_from_dict(variation_data):
+                device[device_name] = XCStringPluralVariation.from_dict(variation_data)
+            else:
+                device[device_name] = XCStringUnit.from_dict(variation_data)
 
         return XCStringDeviceVariation(device)
 
+XCStringLocalization: TypeAlias = XCStringUnit | XCStringDeviceVariation | XCStringPluralVariation
+
 @dataclass
 class XCStringEntry:
-    localizations: dict[str, XCStringUnit | XCStringDeviceVariation]
+    localizations: dict[str, XCStringLocalization]
     extraction_state: XCStringExtractionState | None = None
     comment: str | None = None
 
@@ -151,7 +215,7 @@ class XCStringEntry:
         if comment_data is not None and not isinstance(comment_data, str):
             raise ValueError('comment must be a string or null')
     
-        localizations: dict[str, XCStringUnit | XCStringDeviceVariation] = {}
+        localizations: dict[str, XCStringLocalization] = {}
 
         for locale, value in localizations_data.items():
             if not isinstance(value, dict):
@@ -161,20 +225,39 @@ class XCStringEntry:
                 localizations[locale] = XCStringUnit.from_dict(value)
             elif XCStringDeviceVariation.can_from_dict(value):
                 localizations[locale] = XCStringDeviceVariation.from_dict(value)
+            elif XCStringPluralVariation.can_from_dict(value):
+                localizations[locale] = XCStringPluralVariation.from_dict(value)
             else:
                 if logger is not None:
                     logger.warn(f'Unknown localization type for {locale}')
 
         return XCStringEntry(localizations=localizations, extraction_state=extraction_state, comment=comment_data)
     
-@dataclass
+@dataclass(frozen=True)
 class XCStringKeyPath:
     key: str
     locale: str
     device: str | None = None
+    plural: str | None = None
 
     def with_locale(self, locale: str) -> 'XCStringKeyPath':
-        return XCStringKeyPath(self.key, locale, self.device)
+        return XCStringKeyPath(self.key, locale, self.device, self.plural)
+
+    def to_dict(self) -> dict:
+        return {
+            "key": self.key,
+            "locale": self.locale,
+            "device": self.device,
+            "plural": self.plural
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> 'XCStringKeyPath':
+        key = data.get("key", None)
+        locale = data.get("locale", None)
+        if not isinstance(key, str) or not isinstance(locale, str):
+            raise ValueError('Key path must have a key and a locale')
+        return XCStringKeyPath(key, locale, data.get("device", None), data.get("plural", None))
     
 @dataclass
 class XCStrings:
@@ -183,19 +266,30 @@ class XCStrings:
     version: str
 
     def list_keys(self, key: str | None = None, locale: str | None = None, device: str | None = None) -> Generator[XCStringKeyPath, None, None]:
+        """
+        Yields the keypath of every string unit, optionally only of one key, locale or device.
+        """
         keys = [key] if key is not None else self.strings.keys()
 
-        for key in keys:
-            entry = self.strings[key]
+        for entry_key in keys:
+            entry = self.strings[entry_key]
             locales = [locale] if locale is not None else entry.localizations.keys()
-            for locale in locales:
-                localization = entry.localizations[locale]
+            for entry_locale in locales:
+                localization = entry.localizations.get(entry_locale, None)
                 if isinstance(localization, XCStringUnit):
-                    yield XCStringKeyPath(key, locale)
+                    yield XCStringKeyPath(entry_key, entry_locale)
+                elif isinstance(localization, XCStringPluralVariation):
+                    for category in localization.plurals.keys():
+                        yield XCStringKeyPath(entry_key, entry_locale, plural=category)
                 elif isinstance(localization, XCStringDeviceVariation):
                     devices = [device] if device is not None else localization.devices.keys()
-                    for device in devices:
-                        yield XCStringKeyPath(key, locale, device)
+                    for entry_device in devices:
+                        variation = localization.devices.get(entry_device, None)
+                        if isinstance(variation, XCStringPluralVariation):
+                            for category in variation.plurals.keys():
+                                yield XCStringKeyPath(entry_key, entry_locale, entry_device, category)
+                        elif variation is not None:
+                            yield XCStringKeyPath(entry_key, entry_locale, entry_device)
 
     def remove_locale(self, locale: str) -> None:
         for _, entry in self.strings.items():
@@ -209,12 +303,43 @@ class XCStrings:
         if keypath.locale not in self.strings[keypath.key].localizations:
             return False
         
-        if keypath.device is None:
-            return True
-        else:
-            return keypath.device in self.strings[keypath.key].localizations[keypath.locale].variations # type: ignore
+        localization: XCStringLocalization = self.strings[keypath.key].localizations[keypath.locale]
+        if keypath.device is not None:
+            if not isinstance(localization, XCStringDeviceVariation) or keypath.device not in localization.devices:
+                return False
+            localization = localization.devices[keypath.device]
+
+        if keypath.plural is not None:
+            return isinstance(localization, XCStringPluralVariation) and keypath.plural in localization.plurals
+
+        return True
+
+    def get_unit(self, keypath: XCStringKeyPath) -> XCStringUnit | None:
+        """
+        Returns the string unit stored at exactly the keypath, without the plural fallback of get.
+        """
+        entry = self.strings.get(keypath.key, None)
+        if entry is None:
+            return None
+
+        localization = entry.localizations.get(keypath.locale, None)
+        if keypath.device is not None:
+            if not isinstance(localization, XCStringDeviceVariation):
+                return None
+            localization = localization.devices.get(keypath.device, None)
+
+        if keypath.plural is not None:
+            if not isinstance(localization, XCStringPluralVariation):
+                return None
+            localization = localization.plurals.get(keypath.plural, None)
+
+        return localization if isinstance(localization, XCStringUnit) else None
 
     def get(self, keypath: XCStringKeyPath) -> str | None:
+        """
+        Returns the value at the keypath. A plural category missing from a plural variation
+        falls back to 'other', like the runtime does.
+        """
         if keypath.key not in self.strings:
             return None
         
@@ -223,51 +348,86 @@ class XCStrings:
         
         localization = self.strings[keypath.key].localizations[keypath.locale]
         if keypath.device is None:
-            if not isinstance(localization, XCStringUnit):
-                raise ValueError('No device variation must be get from a string unit')
-            return localization.value
+            variation = localization
         else:
             if not isinstance(localization, XCStringDeviceVariation):
                 raise ValueError('Device variation cannot be get from a string unit')
             if keypath.device not in localization.devices:
                 return None
-            return localization.devices[keypath.device].value
+            variation = localization.devices[keypath.device]
+
+        if keypath.plural is None:
+            if not isinstance(variation, XCStringUnit):
+                raise ValueError('No device variation must be get from a string unit')
+            return variation.value
+        else:
+            if not isinstance(variation, XCStringPluralVariation):
+                raise ValueError('Plural variation cannot be get from a string unit')
+            unit = variation.get(keypath.plural)
+            return unit.value if unit is not None else None
 
     def set(self, keypath: XCStringKeyPath, value: str | None = None, state: XCStringUnitState | None = None) -> None:
+        """
+        Sets the string unit at the keypath. A localization of another shape, e.g. a plain unit where
+        the keypath has a plural category, is replaced, so that a target follows the shape of its source.
+        """
         # If the key doesn't exist, create it
         if keypath.key not in self.strings:
             self.strings[keypath.key] = XCStringEntry({
-                keypath.locale: XCStringUnit(value or '', state or 'needs_review')
+                keypath.locale: self._new_localization(keypath, value, state)
             })
-        
+            return
+
+        localizations = self.strings[keypath.key].localizations
+        localization = localizations.get(keypath.locale, None)
+
         # If the locale doesn't exist, create it
-        elif keypath.locale not in self.strings[keypath.key].localizations:
-            self.strings[keypath.key].localizations[keypath.locale] = XCStringUnit(value or '', state or 'needs_review')
-        
-        # set the value and state
+        if localization is None:
+            localizations[keypath.locale] = self._new_localization(keypath, value, state)
+
+        # set the value and state of a string unit or a plural variation
         elif keypath.device is None:
-            localization = self.strings[keypath.key].localizations[keypath.locale]
-            if not isinstance(localization, XCStringUnit):
-                raise ValueError('Device variation must be set on a string unit')
-            
-            if value is not None:
-                localization.value = value
-            if state is not None:
-                localization.state = state
-        
+            localizations[keypath.locale] = self._set_variation(localization, keypath, value, state)
+
         # set the value and state for a device variation
-        elif keypath.device is not None:
-            localization = self.strings[keypath.key].localizations[keypath.locale]
+        else:
             if not isinstance(localization, XCStringDeviceVariation):
-                raise ValueError('Device variation cannot be set on a string unit')
-            
-            if keypath.device not in localization.devices:
-                localization.devices[keypath.device] = XCStringUnit(value or '', state or 'needs_review')
-            else:
-                if value is not None:
-                    localization.devices[keypath.device].value = value
-                if state is not None:
-                    localization.devices[keypath.device].state = state
+                localization = XCStringDeviceVariation({})
+                localizations[keypath.locale] = localization
+
+            localization.devices[keypath.device] = self._set_variation(localization.devices.get(keypath.device, None), keypath, value, state)
+
+    def _new_localization(self, keypath: XCStringKeyPath, value: str | None, state: XCStringUnitState | None) -> XCStringLocalization:
+        localization: XCStringLocalization = XCStringUnit(value or '', state or 'needs_review')
+        if keypath.plural is not None:
+            localization = XCStringPluralVariation({ keypath.plural: localization })
+        if keypath.device is not None:
+            localization = XCStringDeviceVariation({ keypath.device: localization })
+        return localization
+
+    def _set_variation(self, variation: XCStringLocalization | None, keypath: XCStringKeyPath, value: str | None, state: XCStringUnitState | None) -> XCStringUnit | XCStringPluralVariation:
+        if keypath.plural is None:
+            if isinstance(variation, XCStringUnit):
+                self._update_unit(variation, value, state)
+                return variation
+            return XCStringUnit(value or '', state or 'needs_review')
+
+        if not isinstance(variation, XCStringPluralVariation):
+            variation = XCStringPluralVariation({})
+        self._set_plural(variation, keypath, value, state)
+        return variation
+
+    def _set_plural(self, variation: XCStringPluralVariation, keypath: XCStringKeyPath, value: str | None, state: XCStringUnitState | None) -> None:
+        if keypath.plural not in variation.plurals:
+            variation.plurals[keypath.plural] = XCStringUnit(value or '', state or 'needs_review') # type: ignore
+        else:
+            self._update_unit(variation.plurals[keypath.plural], value, state) # type: ignore
+
+    def _update_unit(self, unit: XCStringUnit, value: str | None, state: XCStringUnitState | None) -> None:
+        if value is not None:
+            unit.value = value
+        if state is not None:
+            unit.state = state
 
     def to_json(self) -> str:
         return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
@@ -2,7 +2,7 @@ import unittest
 import json
 from typing import cast
 
-from xcstrings import XCStrings, XCStringUnit, XCStringDeviceVariation, XCStringEntry
+from xcstrings import XCStrings, XCStringUnit, XCStringDeviceVariation, XCStringPluralVariation, XCStringEntry, XCStringKeyPath
 from util.logger import Logger
 
 class TestXCStrings(unittest.TestCase):
@@ -148,6 +148,100 @@ class TestXCStrings(unittest.TestCase):
         self.assertEqual(other_unit.state, "needs_review")
         self.assertEqual(other_unit.value, "KURURI KI")
 
+
+    def test_plural_variation(self):
+        sample_json = """
+        {
+            "sourceLanguage": "en",
+            "version": "1.0",
+            "strings" : {
+                "items" : {
+                    "localizations" : {
+                        "en" : { "variations" : { "plural" : {
+                            "one" : { "stringUnit" : { "state" : "translated", "value" : "%lld item" } },
+                            "other" : { "stringUnit" : { "state" : "translated", "value" : "%lld items" } }
+                        }}},
+                        "ja" : { "variations" : { "device" : {
+                            "iphone" : { "variations" : { "plural" : {
+                                "other" : { "stringUnit" : { "state" : "translated", "value" : "%lld 個" } }
+                            }}}
+                        }}}
+                    }
+                }
+            }
+        }
+        """
+
+        xcstrings = XCStrings.from_json(sample_json)
+
+        en = xcstrings.strings["items"].localizations["en"]
+        self.assertTrue(isinstance(en, XCStringPluralVariation))
+
+        self.assertEqual(list(xcstrings.list_keys()), [
+            XCStringKeyPath("items", "en", plural="one"),
+            XCStringKeyPath("items", "en", plural="other"),
+            XCStringKeyPath("items", "ja", "iphone", "other")
+        ])
+
+        self.assertEqual(xcstrings.get(XCStringKeyPath("items", "en", plural="one")), "%lld item")
+        # Missing categories fall back to 'other'
+        self.assertEqual(xcstrings.get(XCStringKeyPath("items", "en", plural="few")), "%lld items")
+        self.assertTrue(xcstrings.has_entry(XCStringKeyPath("items", "ja", "iphone", "other")))
+        self.assertFalse(xcstrings.has_entry(XCStringKeyPath("items", "ja", "iphone", "one")))
+        self.assertFalse(xcstrings.has_entry(XCStringKeyPath("items", "ja", "ipad", "other")))
+
+        xcstrings.set(XCStringKeyPath("items", "ja", "ipad", "other"), "%lld 項目")
+        xcstrings.set(XCStringKeyPath("items", "fr", plural="many"), "%lld éléments")
+
+        self.assertEqual(xcstrings.get(XCStringKeyPath("items", "ja", "ipad", "other")), "%lld 項目")
+        self.assertEqual(xcstrings.to_dict()["strings"]["items"]["localizations"]["fr"], {
+            "variations": { "plural": { "many": { "stringUnit": { "value": "%lld éléments", "state": "needs_review" } } } }
+        })
+
+    def test_set_replaces_other_shape(self):
+        xcstrings = XCStrings.from_dict({
+            "sourceLanguage": "en",
+            "version": "1.0",
+            "strings": {
+                "items": { "localizations": { "ja": { "stringUnit": { "state": "translated", "value": "項目" } } } },
+                "tap": { "localizations": { "ja": { "variations": { "device": { "iphone": { "stringUnit": { "state": "translated", "value": "タップ" } } } } } } },
+                "count": { "localizations": { "ja": { "variations": { "device": { "mac": { "stringUnit": { "state": "translated", "value": "数" } } } } } } }
+            }
+        })
+
+        # The source became a plural, a device variation, a plain unit
+        xcstrings.set(XCStringKeyPath("items", "ja", plural="other"), "%lld 項目", "translated")
+        xcstrings.set(XCStringKeyPath("tap", "ja"), "タップ", "translated")
+        xcstrings.set(XCStringKeyPath("count", "ja", "mac", "other"), "%lld 個", "translated")
+
+        self.assertEqual(xcstrings.get(XCStringKeyPath("items", "ja", plural="other")), "%lld 項目")
+        self.assertEqual(xcstrings.to_dict()["strings"]["tap"]["localizations"]["ja"], { "stringUnit": { "value": "タップ", "state": "translated" } })
+        self.assertEqual(xcstrings.get(XCStringKeyPath("count", "ja", "mac", "other")), "%lld 個")
+        self.assertEqual(list(xcstrings.list_keys(key="count")), [XCStringKeyPath("count", "ja", "mac", "other")])
+
+
+    def test_list_keys_across_entries(self):
+        xcstrings = XCStrings.from_dict({
+            "sourceLanguage": "en",
+            "version": "1.0",
+            "strings": {
+                "a": { "localizations": {
+                    "en": { "stringUnit": { "state": "translated", "value": "A" } },
+                    "ja": { "stringUnit": { "state": "translated", "value": "エー" } }
+                } },
+                "b": { "localizations": {
+                    "en": { "stringUnit": { "state": "translated", "value": "B" } },
+                    "fr": { "stringUnit": { "state": "translated", "value": "Bé" } }
+                } }
+            }
+        })
+
+        self.assertEqual(list(xcstrings.list_keys()), [
+            XCStringKeyPath("a", "en"), XCStringKeyPath("a", "ja"),
+            XCStringKeyPath("b", "en"), XCStringKeyPath("b", "fr")
+        ])
+        # Entries without the locale are skipped
+        self.assertEqual(list(xcstrings.list_keys(locale="ja")), [XCStringKeyPath("a", "ja")])
         
         
 if __name__ == '__main__':